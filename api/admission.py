@@ -0,0 +1,313 @@
+import asyncio
+import collections
+import contextvars
+import json
+import time
+
+from fastapi import HTTPException
+
+from src.utils.instrumentation import instrumentation
+
+# Giới hạn mặc định của từng nhóm endpoint (ghi đè trong api.admission của config.yaml)
+DEFAULT_CLASSES = {
+    # Luồng trực tuyến (một khách hàng): ưu tiên độ trễ
+    'online': {'max_concurrency': 64, 'max_queue': 256, 'queue_timeout_ms': 250,
+               'max_body_bytes': 64 * 1024, 'max_batch_size': 1, 'retry_after_s': 1},
+    # Chấm điểm theo lô qua JSON
+    'batch': {'max_concurrency': 4, 'max_queue': 16, 'queue_timeout_ms': 2000,
+              'max_body_bytes': 16 * 1024 * 1024, 'max_batch_size': 10000, 'retry_after_s': 5},
+    # Tải tệp lên /bulk/: chạy lâu, chiếm nhiều CPU
+    'bulk': {'max_concurrency': 1, 'max_queue': 2, 'queue_timeout_ms': 30000,
+             'max_body_bytes': 1024 * 1024 * 1024, 'max_batch_size': None, 'retry_after_s': 30},
+}
+
+# Đường dẫn (tiền tố) -> nhóm; tiền tố dài nhất được chọn
+DEFAULT_ROUTES = {
+    '/application-score/': 'online',
+    '/behavior-score/': 'online',
+    '/customer-360/': 'online',
+    '/collections-prioritize/': 'batch',
+    '/desertion-strategy/': 'batch',
+    '/batch/': 'batch',
+    '/columnar/': 'batch',
+    '/score-by-id/': 'batch',
+    '/bulk/': 'bulk',
+}
+
+# Nhóm endpoint của request hiện tại (do AdmissionMiddleware đặt)
+current_endpoint_class = contextvars.ContextVar('current_endpoint_class', default=None)
+
+class AdmissionRejected(Exception):
+    """
+    Yêu cầu bị từ chối bởi kiểm soát nạp (kèm mã HTTP và thời gian nên thử lại)
+    """
+    def __init__(self, status_code, reason, detail, retry_after=None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+class ConcurrencyLimiter:
+    """
+    Giới hạn số yêu cầu xử lý đồng thời của một nhóm endpoint, kèm hàng đợi có giới hạn
+
+    Khi đủ max_concurrency yêu cầu đang chạy, yêu cầu mới vào hàng đợi (FIFO);
+    hàng đợi đầy thì bị từ chối ngay (429), chờ quá queue_timeout_ms thì bị từ
+    chối (503). Chạy trong event loop nên không cần khóa.
+    """
+    def __init__(self, name, max_concurrency, max_queue, queue_timeout_ms, retry_after_s):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000.0 if queue_timeout_ms else 0.0
+        self.retry_after_s = retry_after_s
+
+        self.in_flight = 0
+        self._waiters = collections.deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = collections.Counter()
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue or self.queue_timeout <= 0:
+            self.rejected['queue_full'] += 1
+            raise AdmissionRejected(429, 'queue_full',
+                                    f"Quá nhiều yêu cầu {self.name} đang chờ xử lý", self.retry_after_s)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Được nhận chỗ đúng lúc hết thời gian chờ: trả lại chỗ cho yêu cầu sau
+                self.release()
+            else:
+                waiter.cancel()
+            self.rejected['queue_timeout'] += 1
+            raise AdmissionRejected(503, 'queue_timeout',
+                                    f"Hệ thống đang quá tải ({self.name}), vui lòng thử lại sau",
+                                    self.retry_after_s)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            instrumentation.observe('admission_queue_wait_seconds', time.perf_counter() - started,
+                                    endpoint_class=self.name)
+        self.admitted += 1
+
+    def release(self):
+        # Chuyển chỗ trực tiếp cho yêu cầu đầu hàng đợi (in_flight giữ nguyên)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self):
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'queue_timeout_ms': self.queue_timeout * 1000,
+            'in_flight': self.in_flight,
+            'queue_depth': self.queue_depth,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': dict(self.rejected),
+        }
+
+class AdmissionController:
+    """
+    Kiểm soát nạp yêu cầu theo nhóm endpoint (online, batch, bulk)
+
+    Mỗi nhóm có giới hạn đồng thời, hàng đợi, kích thước body và số khách hàng
+    mỗi lô riêng, nên các lô lớn hay tệp bulk không chiếm hết tài nguyên của
+    luồng trực tuyến. Giới hạn áp dụng cho từng tiến trình worker.
+    """
+    def __init__(self, config=None):
+        """
+        Parameters:
+        -----------
+        config : dict, optional
+            Mục api.admission trong config.yaml
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+
+        self.classes = {}
+        for name, defaults in DEFAULT_CLASSES.items():
+            self.classes[name] = dict(defaults, **(config.get('classes', {}) or {}).get(name, {}))
+        for name, overrides in (config.get('classes', {}) or {}).items():
+            if name not in self.classes:
+                self.classes[name] = dict(DEFAULT_CLASSES['batch'], **overrides)
+
+        routes = dict(DEFAULT_ROUTES, **(config.get('routes', {}) or {}))
+        # Tiền tố dài nhất được kiểm tra trước
+        self.routes = sorted(routes.items(), key=lambda item: len(item[0]), reverse=True)
+
+        self.limiters = {
+            name: ConcurrencyLimiter(name, limits['max_concurrency'], limits['max_queue'],
+                                     limits['queue_timeout_ms'], limits['retry_after_s'])
+            for name, limits in self.classes.items()
+        }
+        self.rejected_body = collections.Counter()
+        self.rejected_batch = collections.Counter()
+
+    def classify(self, path):
+        """
+        Nhóm endpoint của một đường dẫn (None nếu không giới hạn)
+        """
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return name
+        return None
+
+    def check_batch_size(self, n_items):
+        """
+        Từ chối (413) lô vượt quá max_batch_size của nhóm endpoint của request hiện tại
+
+        Gọi ở đầu handler, ngoài khối try/except chuyển lỗi thành 500.
+        """
+        endpoint_class = current_endpoint_class.get()
+        limit = self.classes.get(endpoint_class, {}).get('max_batch_size')
+        if self.enabled and limit and n_items > limit:
+            self.rejected_batch[endpoint_class] += 1
+            raise HTTPException(status_code=413,
+                                detail=f"Lô có {n_items} khách hàng, tối đa {limit}; hãy chia nhỏ hoặc dùng /bulk/")
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'classes': {
+                name: dict(limiter.stats(),
+                           max_body_bytes=self.classes[name]['max_body_bytes'],
+                           max_batch_size=self.classes[name]['max_batch_size'],
+                           rejected_body_too_large=self.rejected_body[name],
+                           rejected_batch_too_large=self.rejected_batch[name])
+                for name, limiter in self.limiters.items()
+            },
+        }
+
+    def collect_metrics(self):
+        """
+        Metric cho /metrics (xem Instrumentation.add_collector)
+        """
+        limiters = self.limiters.items()
+        rejected = []
+        for name, limiter in limiters:
+            for reason in ('queue_full', 'queue_timeout'):
+                rejected.append(({'endpoint_class': name, 'reason': reason}, limiter.rejected[reason]))
+            rejected.append(({'endpoint_class': name, 'reason': 'body_too_large'}, self.rejected_body[name]))
+            rejected.append(({'endpoint_class': name, 'reason': 'batch_too_large'}, self.rejected_batch[name]))
+
+        return [
+            ('admission_in_flight', 'gauge', 'Số yêu cầu đang xử lý theo nhóm endpoint',
+             [({'endpoint_class': name}, limiter.in_flight) for name, limiter in limiters]),
+            ('admission_queue_depth', 'gauge', 'Số yêu cầu đang chờ trong hàng đợi',
+             [({'endpoint_class': name}, limiter.queue_depth) for name, limiter in limiters]),
+            ('admission_max_concurrency', 'gauge', 'Giới hạn số yêu cầu đồng thời',
+             [({'endpoint_class': name}, limiter.max_concurrency) for name, limiter in limiters]),
+            ('admission_max_queue', 'gauge', 'Giới hạn độ dài hàng đợi',
+             [({'endpoint_class': name}, limiter.max_queue) for name, limiter in limiters]),
+            ('admission_admitted_total', 'counter', 'Số yêu cầu được nhận xử lý',
+             [({'endpoint_class': name}, limiter.admitted) for name, limiter in limiters]),
+            ('admission_rejected_total', 'counter', 'Số yêu cầu bị từ chối theo lý do',
+             rejected),
+        ]
+
+def rejection_response(rejection):
+    """
+    Response JSON (status, headers, body) cho một yêu cầu bị từ chối
+    """
+    headers = [(b'content-type', b'application/json')]
+    if rejection.retry_after is not None:
+        headers.append((b'retry-after', str(int(rejection.retry_after)).encode()))
+    body = json.dumps({'detail': rejection.detail}, ensure_ascii=False).encode('utf-8')
+    headers.append((b'content-length', str(len(body)).encode()))
+    return rejection.status_code, headers, body
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware áp dụng AdmissionController trước khi đọc body và parse JSON
+
+    Body vượt max_body_bytes bị từ chối (413) dựa trên Content-Length, hoặc khi
+    số byte đã nhận vượt giới hạn nếu client không gửi Content-Length. Nếu ứng
+    dụng đã bắt đầu gửi response trước khi body vượt giới hạn thì response đó
+    được giữ nguyên (không thể gửi thêm một http.response.start).
+    """
+    def __init__(self, app, controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controller
+        endpoint_class = controller.classify(scope['path']) if scope['type'] == 'http' else None
+        if endpoint_class is None or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        max_body_bytes = controller.classes[endpoint_class]['max_body_bytes']
+        body_too_large = AdmissionRejected(413, 'body_too_large',
+                                           f"Body vượt quá {max_body_bytes} byte cho nhóm {endpoint_class}")
+        received = [0]
+        overflow = [False]
+        started = [False]
+
+        async def receive_wrapper():
+            message = await receive()
+            if message['type'] == 'http.request' and max_body_bytes:
+                received[0] += len(message.get('body', b''))
+                if received[0] > max_body_bytes:
+                    # Ngừng đọc body; response của ứng dụng (nếu có) được thay bằng 413
+                    overflow[0] = True
+                    return {'type': 'http.disconnect'}
+            return message
+
+        async def send_wrapper(message):
+            if overflow[0] and not started[0]:
+                # Response chưa bắt đầu: được thay bằng 413 sau khi ứng dụng trả về
+                return
+            if message['type'] == 'http.response.start':
+                started[0] = True
+            await send(message)
+
+        try:
+            content_length = dict(scope['headers']).get(b'content-length')
+            if max_body_bytes and content_length is not None and int(content_length) > max_body_bytes:
+                raise body_too_large
+
+            limiter = controller.limiters[endpoint_class]
+            await limiter.acquire()
+            token = current_endpoint_class.set(endpoint_class)
+            try:
+                await self.app(scope, receive_wrapper, send_wrapper)
+            finally:
+                current_endpoint_class.reset(token)
+                limiter.release()
+            if overflow[0] and not started[0]:
+                raise body_too_large
+        except AdmissionRejected as rejection:
+            if rejection.reason == 'body_too_large':
+                controller.rejected_body[endpoint_class] += 1
+            status, headers, body = rejection_response(rejection)
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': body})
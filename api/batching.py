@@ -0,0 +1,168 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+class MicroBatcher:
+    """
+    Gom các yêu cầu chấm điểm đồng thời của một mô hình thành một lô
+
+    Khi batcher rảnh (không có lô đang chạy hay yêu cầu đang chờ), yêu cầu được
+    gửi đi ngay. Trong lúc một lô đang chạy, các yêu cầu mới được ghép lại và gửi
+    khi lô đó xong, khi đủ max_batch_size dòng hoặc muộn nhất sau max_wait_ms;
+    lô được chấm điểm một lần trên thread pool, sau đó kết quả được tách và trả
+    về cho từng yêu cầu đang chờ.
+    """
+    def __init__(self, name, score_fn, max_batch_size=256, max_wait_ms=2.0,
+                 executor=None, enabled=True):
+        """
+        Parameters:
+        -----------
+        name : str
+            Tên mô hình (dùng cho thống kê)
+        score_fn : callable
+            Hàm nhận danh sách bản ghi (dict) và trả về ScoringResult cùng độ dài
+        max_batch_size : int
+            Số dòng tối đa của một lô; đủ số dòng này lô được gửi đi ngay
+        max_wait_ms : float
+            Thời gian tối đa (mili giây) một yêu cầu chờ để được ghép lô
+        executor : Executor, optional
+            Thread pool chạy score_fn; mặc định dùng pool riêng của batcher
+        enabled : bool
+            Nếu False, mỗi yêu cầu được chấm điểm riêng (không ghép lô)
+        """
+        self.name = name
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.enabled = enabled
+
+        # Các yêu cầu đang chờ: (records, future, thời điểm gửi)
+        self._pending = []
+        self._pending_rows = 0
+        self._flush_handle = None
+
+        # Thống kê
+        self._in_flight = 0
+        self._batches = 0
+        self._requests = 0
+        self._rows = 0
+        self._max_batch_rows = 0
+        self._max_queue_depth = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._batch_size_counts = {}
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f'score-{self.name}')
+        return self.executor
+
+    async def submit(self, records):
+        """
+        Gửi một hoặc nhiều bản ghi để chấm điểm
+
+        Parameters:
+        -----------
+        records : list
+            Danh sách dict đặc trưng của khách hàng
+
+        Returns:
+        --------
+        ScoringResult
+            Kết quả tương ứng với records, đúng thứ tự
+        """
+        loop = asyncio.get_running_loop()
+        self._requests += 1
+
+        if not self.enabled:
+            self._record_batch(len(records), [0.0])
+            return await loop.run_in_executor(self._get_executor(), self.score_fn, records)
+
+        future = loop.create_future()
+        self._pending.append((records, future, time.perf_counter()))
+        self._pending_rows += len(records)
+        self._max_queue_depth = max(self._max_queue_depth, self._pending_rows)
+
+        if self._pending_rows >= self.max_batch_size or (len(self._pending) == 1 and not self._in_flight):
+            # Đủ lô, hoặc batcher đang rảnh: không có gì để ghép nên không chờ
+            self._flush(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop):
+        """
+        Gửi toàn bộ yêu cầu đang chờ thành một lô
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        pending, self._pending, self._pending_rows = self._pending, [], 0
+
+        now = time.perf_counter()
+        combined = [record for records, _, _ in pending for record in records]
+        self._record_batch(len(combined), [now - submitted for _, _, submitted in pending])
+
+        self._in_flight += 1
+        task = loop.run_in_executor(self._get_executor(), self.score_fn, combined)
+        task.add_done_callback(lambda done: self._dispatch(done, pending, loop))
+
+    def _dispatch(self, done, pending, loop):
+        """
+        Tách kết quả của lô và trả về cho từng yêu cầu
+        """
+        self._in_flight -= 1
+
+        offset = 0
+        for records, future, _ in pending:
+            if not future.cancelled():
+                if done.cancelled():
+                    future.cancel()
+                elif done.exception() is not None:
+                    future.set_exception(done.exception())
+                else:
+                    future.set_result(done.result()[offset:offset + len(records)])
+            offset += len(records)
+
+        # Các yêu cầu đã gom trong lúc lô này chạy được gửi ngay, không đợi hết max_wait_ms
+        if self._pending and not self._in_flight:
+            self._flush(loop)
+
+    def _record_batch(self, n_rows, waits):
+        self._batches += 1
+        self._rows += n_rows
+        self._max_batch_rows = max(self._max_batch_rows, n_rows)
+        self._total_wait += sum(waits)
+        self._max_wait = max(self._max_wait, max(waits))
+
+        # Phân phối kích thước lô theo lũy thừa của 2 (1, 2, 4, ...)
+        bucket = 1 << int(np.ceil(np.log2(max(n_rows, 1))))
+        self._batch_size_counts[bucket] = self._batch_size_counts.get(bucket, 0) + 1
+
+    def stats(self):
+        """
+        Thống kê hàng đợi, kích thước lô và thời gian chờ
+        """
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'queue_depth': self._pending_rows,
+            'max_queue_depth': self._max_queue_depth,
+            'in_flight_batches': self._in_flight,
+            'requests': self._requests,
+            'batches': self._batches,
+            'rows': self._rows,
+            'mean_batch_size': self._rows / self._batches if self._batches else 0.0,
+            'max_batch_size_seen': self._max_batch_rows,
+            'mean_wait_ms': self._total_wait / self._requests * 1000 if self._requests else 0.0,
+            'max_wait_ms_seen': self._max_wait * 1000,
+            'batch_size_histogram': {str(k): v for k, v in sorted(self._batch_size_counts.items())}
+        }
@@ -0,0 +1,194 @@
+import gzip
+import itertools
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# Định dạng đầu vào hỗ trợ, suy ra từ phần mở rộng của tệp
+INPUT_FORMATS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+OUTPUT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def infer_input_format(filename, input_format=None):
+    """
+    Xác định định dạng đầu vào từ tham số hoặc phần mở rộng tệp
+    """
+    if input_format:
+        if input_format not in set(INPUT_FORMATS.values()):
+            raise ValueError(f"Không hỗ trợ định dạng đầu vào: {input_format}")
+        return input_format
+
+    name = (filename or '').lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    for extension, fmt in INPUT_FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    raise ValueError(f"Không xác định được định dạng của tệp {filename}; dùng tham số input_format")
+
+def open_upload(file, filename):
+    """
+    Mở tệp tải lên, tự giải nén nếu tên tệp kết thúc bằng .gz
+    """
+    if (filename or '').lower().endswith('.gz'):
+        return gzip.GzipFile(fileobj=file, mode='rb')
+    return file
+
+def iter_chunks(file, input_format, chunk_size):
+    """
+    Đọc tệp thành từng DataFrame có tối đa chunk_size dòng
+
+    Parameters:
+    -----------
+    file : file-like
+        Tệp đã tải lên (đọc tuần tự, không nạp toàn bộ vào bộ nhớ)
+    input_format : str
+        'csv', 'parquet' hoặc 'ndjson'
+    chunk_size : int
+        Số dòng mỗi chunk
+
+    Yields:
+    -------
+    DataFrame
+    """
+    if input_format == 'csv':
+        yield from pd.read_csv(file, chunksize=chunk_size)
+    elif input_format == 'ndjson':
+        yield from pd.read_json(file, lines=True, chunksize=chunk_size)
+    elif input_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Đọc Parquet cần cài đặt thư viện pyarrow")
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Không hỗ trợ định dạng đầu vào: {input_format}")
+
+def score_chunk(model, chunk, feature_names, use_cache=False):
+    """
+    Chấm điểm một chunk và trả về DataFrame kết quả
+
+    Parameters:
+    -----------
+    model : BaseXGBoostModel
+        Mô hình đã tải
+    chunk : DataFrame
+        Dữ liệu đầu vào (có thể có customer_id và các cột thừa)
+    feature_names : list
+        Danh sách đặc trưng của mô hình
+    use_cache : bool
+        Dùng bộ nhớ đệm dự đoán; mặc định tắt để tệp lớn không đẩy các
+        hồ sơ đang được gửi lại ra khỏi cache
+
+    Returns:
+    --------
+    DataFrame
+        customer_id (nếu có), probability, log_odds, credit_score, risk_tier
+    """
+    missing = [name for name in feature_names if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Thiếu cột bắt buộc: {missing}")
+
+    scoring = model.score(chunk[feature_names], use_cache=use_cache)
+
+    result = pd.DataFrame({
+        'probability': scoring.probability.astype(np.float64),
+        'log_odds': scoring.log_odds,
+        'credit_score': scoring.score,
+        'risk_tier': scoring.tier
+    })
+    if 'customer_id' in chunk.columns:
+        result.insert(0, 'customer_id', chunk['customer_id'].to_numpy())
+
+    return result
+
+def encode_chunk(frame, output_format, include_header):
+    """
+    Mã hóa DataFrame kết quả thành bytes theo định dạng đầu ra
+    """
+    if output_format == 'csv':
+        return frame.to_csv(index=False, header=include_header).encode('utf-8')
+    if output_format == 'ndjson':
+        text = frame.to_json(orient='records', lines=True)
+        return (text if text.endswith('\n') else text + '\n').encode('utf-8')
+    raise ValueError(f"Không hỗ trợ định dạng đầu ra: {output_format}")
+
+def stream_scores(model, chunks, output_format='ndjson', compress=False):
+    """
+    Chấm điểm lần lượt từng chunk và sinh ra bytes để trả về dạng stream
+
+    Bộ nhớ sử dụng chỉ phụ thuộc kích thước chunk, không phụ thuộc kích thước tệp.
+
+    Parameters:
+    -----------
+    model : BaseXGBoostModel
+        Mô hình đã tải
+    chunks : iterable
+        Các DataFrame đầu vào (xem iter_chunks)
+    output_format : str
+        'ndjson' hoặc 'csv'
+    compress : bool
+        Nén gzip đầu ra
+
+    Yields:
+    -------
+    bytes
+    """
+    feature_names = list(model.model.feature_names)
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def emit(data):
+        return compressor.compress(data) if compressor is not None else data
+
+    first = True
+    try:
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            data = emit(encode_chunk(score_chunk(model, chunk, feature_names), output_format,
+                                     include_header=first))
+            first = False
+            if data:
+                yield data
+    except Exception as e:
+        # Header HTTP đã được gửi nên chỉ có thể báo lỗi trong nội dung
+        print(f"Error while streaming bulk scores: {e}")
+        yield emit(error_line(str(e), output_format))
+
+    if compressor is not None:
+        yield compressor.flush()
+
+def peek_chunks(chunks):
+    """
+    Đọc trước chunk đầu tiên để kiểm tra lỗi trước khi bắt đầu stream
+
+    Returns:
+    --------
+    tuple
+        (chunk đầu tiên hoặc None, iterator chứa lại toàn bộ các chunk)
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return None, iter(())
+    return first, itertools.chain([first], chunks)
+
+def error_line(message, output_format):
+    """
+    Dòng báo lỗi khi lỗi xảy ra giữa chừng (sau khi đã gửi header HTTP)
+    """
+    if output_format == 'ndjson':
+        return (json.dumps({'error': message}, ensure_ascii=False) + '\n').encode('utf-8')
+    return f"# error: {message}\n".encode('utf-8')
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+# Số lỗi tối đa trả về trong một response (tổng số lỗi vẫn được đếm đủ)
+DEFAULT_MAX_ERRORS = 100
+
+# Ràng buộc khoảng giá trị của pydantic: (thuộc tính, hàm kiểm tra vi phạm, thông điệp, mã lỗi)
+RANGE_CHECKS = (
+    ('ge', np.less, 'ensure this value is greater than or equal to {}', 'value_error.number.not_ge'),
+    ('gt', np.less_equal, 'ensure this value is greater than {}', 'value_error.number.not_gt'),
+    ('le', np.greater, 'ensure this value is less than or equal to {}', 'value_error.number.not_le'),
+    ('lt', np.greater_equal, 'ensure this value is less than {}', 'value_error.number.not_lt'),
+)
+
+class ColumnarValidationError(ValueError):
+    """
+    Lỗi cấu trúc của cả request (thiếu cột, độ dài các cột không khớp)
+    """
+    def __init__(self, errors):
+        super().__init__('; '.join(error['msg'] for error in errors))
+        self.errors = errors
+
+def field_constraints(schema):
+    """
+    Đọc kiểu và ràng buộc của các trường số trong một pydantic model
+
+    Parameters:
+    -----------
+    schema : type
+        Lớp pydantic (ví dụ ApplicationData)
+
+    Returns:
+    --------
+    dict
+        Tên trường -> {'integer': bool, 'required': bool, 'ge'/'gt'/'le'/'lt': giới hạn hoặc None}
+    """
+    constraints = {}
+    for name, field in schema.__fields__.items():
+        field_type = field.type_
+        if not (isinstance(field_type, type) and issubclass(field_type, (int, float))):
+            continue
+        info = field.field_info
+        constraints[name] = {
+            'integer': issubclass(field_type, int),
+            'required': field.required,
+            **{attr: getattr(info, attr) for attr, _, _, _ in RANGE_CHECKS}
+        }
+    return constraints
+
+def error(field, row, msg, error_type):
+    # Cùng dạng với lỗi 422 của FastAPI
+    loc = ['body', 'columns', field] if row is None else ['body', 'columns', field, int(row)]
+    return {'loc': loc, 'msg': msg, 'type': error_type}
+
+def coerce_column(values, integer):
+    """
+    Chuyển một cột JSON thành mảng float64
+
+    Returns:
+    --------
+    tuple
+        (mảng giá trị, mặt nạ giá trị rỗng, mặt nạ giá trị không phải số)
+    """
+    try:
+        array = np.asarray(values, dtype=np.float64)
+        invalid = np.zeros(len(array), dtype=bool)
+    except (ValueError, TypeError):
+        # Cột có chuỗi không phải số hoặc kiểu lạ: chuyển từng giá trị, đánh dấu các giá trị hỏng
+        raw = pd.Series(values, dtype=object)
+        array = pd.to_numeric(raw, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        invalid = np.isnan(array) & raw.notna().to_numpy()
+    if array.ndim != 1:
+        raise TypeError('mỗi cột phải là danh sách giá trị vô hướng')
+
+    missing = np.isnan(array) & ~invalid
+    if integer:
+        # pydantic v1 chuyển số thực thành số nguyên bằng int() (cắt phần thập phân)
+        array = np.trunc(array)
+    return array, missing, invalid
+
+def validate_columns(columns, schema, feature_names, max_errors=DEFAULT_MAX_ERRORS):
+    """
+    Kiểm tra một lô dữ liệu dạng cột theo ràng buộc của pydantic model bằng numpy
+
+    Thay vì dựng một đối tượng pydantic cho mỗi khách hàng, mỗi trường được
+    chuyển thành một mảng và kiểm tra kiểu, giá trị rỗng và khoảng giá trị
+    (ge/gt/le/lt) trên cả cột. Lỗi được báo theo từng dòng với cùng thông điệp
+    như pydantic.
+
+    Parameters:
+    -----------
+    columns : dict
+        Tên trường -> danh sách giá trị (mọi cột cùng độ dài)
+    schema : type
+        Lớp pydantic chứa ràng buộc (ApplicationData, BehaviorData, ...)
+    feature_names : list
+        Thứ tự đặc trưng của mô hình
+    max_errors : int
+        Số lỗi tối đa được giữ lại
+
+    Returns:
+    --------
+    tuple
+        (ma trận float64 (n, số đặc trưng) theo thứ tự feature_names,
+         mặt nạ dòng hợp lệ, danh sách lỗi, tổng số lỗi)
+
+    Raises:
+    -------
+    ColumnarValidationError
+        Khi thiếu cột bắt buộc hoặc các cột không cùng độ dài
+    """
+    constraints = field_constraints(schema)
+
+    structural = [
+        error(name, None, 'field required', 'value_error.missing')
+        for name, spec in constraints.items()
+        if (spec['required'] or name in feature_names) and name not in columns
+    ]
+    lengths = {len(values) for name, values in columns.items() if name in constraints}
+    if len(lengths) > 1:
+        structural.append(error('*', None, f'các cột phải cùng độ dài, nhận được {sorted(lengths)}',
+                                'value_error.length_mismatch'))
+    if structural:
+        raise ColumnarValidationError(structural)
+
+    n_rows = lengths.pop() if lengths else 0
+    position = {name: i for i, name in enumerate(feature_names)}
+    matrix = np.empty((n_rows, len(feature_names)), dtype=np.float64)
+    valid = np.ones(n_rows, dtype=bool)
+    errors, n_errors = [], 0
+
+    def report(name, mask, msg, error_type):
+        nonlocal n_errors
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        valid[rows] = False
+        n_errors += len(rows)
+        for row in rows[:max(max_errors - len(errors), 0)]:
+            errors.append(error(name, row, msg, error_type))
+
+    for name, spec in constraints.items():
+        if name not in columns:
+            continue
+        try:
+            values, missing, invalid = coerce_column(columns[name], spec['integer'])
+        except TypeError as e:
+            raise ColumnarValidationError([error(name, None, str(e), 'type_error.list')])
+
+        if spec['integer']:
+            report(name, invalid, 'value is not a valid integer', 'type_error.integer')
+        else:
+            report(name, invalid, 'value is not a valid float', 'type_error.float')
+        report(name, missing, 'none is not an allowed value', 'type_error.none.not_allowed')
+
+        present = ~(missing | invalid)
+        for attr, violates, msg, error_type in RANGE_CHECKS:
+            limit = spec[attr]
+            if limit is not None:
+                report(name, present & violates(values, limit, where=present, out=np.zeros(n_rows, dtype=bool)),
+                       msg.format(limit), error_type)
+
+        if name in position:
+            matrix[:, position[name]] = values
+
+    # Lỗi được gom theo trường; sắp lại theo dòng để dễ đọc
+    errors.sort(key=lambda item: (item['loc'][3], item['loc'][2]))
+    return matrix, valid, errors, n_errors
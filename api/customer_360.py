@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+# Thứ tự mô hình trong hồ sơ khách hàng
+PROFILE_MODELS = ('application', 'behavior', 'collections', 'desertion')
+
+# Cột nghiệp vụ mà logic sau chấm điểm đọc trực tiếp, không phụ thuộc booster có
+# dùng chúng làm đặc trưng hay không (bắt buộc như ở endpoint của từng mô hình)
+BUSINESS_COLUMNS = {
+    'behavior': ('current_limit',),
+    'collections': ('outstanding_amount',),
+}
+
+def route_features(frame, model, business_columns=()):
+    """
+    Chọn các đặc trưng của một mô hình và các dòng có đủ đặc trưng đó
+
+    Parameters:
+    -----------
+    frame : DataFrame
+        Bản ghi khách hàng đã gộp (hợp các đặc trưng của cả bốn mô hình)
+    model : BaseXGBoostModel
+        Mô hình đã tải
+    business_columns : tuple
+        Cột nghiệp vụ cần giữ thêm ngoài đặc trưng của booster (xem BUSINESS_COLUMNS)
+
+    Returns:
+    --------
+    tuple
+        (mảng vị trí các dòng đủ đặc trưng, DataFrame gồm đặc trưng theo thứ tự
+        của booster rồi tới các cột nghiệp vụ)
+    """
+    feature_names = list(model.model.feature_names)
+    columns = feature_names + [column for column in business_columns if column not in feature_names]
+    subset = frame.reindex(columns=columns)
+    eligible = np.flatnonzero(subset.notna().all(axis=1).to_numpy())
+    subset = subset.iloc[eligible].reset_index(drop=True)
+    # Cột toàn giá trị None có kiểu object; đưa về số trước khi chấm điểm
+    return eligible, subset.apply(pd.to_numeric)
+
+def evaluate_model(name, model, features):
+    """
+    Chấm điểm và chạy logic nghiệp vụ của một mô hình trên các dòng đủ đặc trưng
+
+    Returns:
+    --------
+    list
+        Một dict kết quả cho mỗi dòng của features (cùng thứ tự)
+    """
+    scoring = model.score(features)
+    credit_scores = scoring.score.tolist()
+
+    if name == 'application':
+        profiles = model.get_application_risk_profiles(features, scoring=scoring)
+        return [
+            {'probability_of_default': p, 'risk_level': risk_level,
+             'recommendation': recommendation, 'credit_score': score}
+            for p, risk_level, recommendation, score in zip(
+                profiles['probability_of_default'].to_numpy(dtype=np.float64).tolist(),
+                profiles['risk_level'].tolist(),
+                profiles['recommendation'].tolist(),
+                credit_scores
+            )
+        ]
+
+    if name == 'behavior':
+        recommendations = model.recommend_credit_limits(
+            features, features['current_limit'].to_numpy(), scoring=scoring
+        )
+        return [
+            {'probability_of_default': p, 'current_limit': current_limit,
+             'recommended_limit': recommended_limit, 'action': action,
+             'risk_level': risk_level, 'credit_score': score}
+            for p, current_limit, recommended_limit, action, risk_level, score in zip(
+                recommendations['probability_of_default'].to_numpy(dtype=np.float64).tolist(),
+                recommendations['current_limit'].tolist(),
+                recommendations['recommended_limit'].tolist(),
+                recommendations['action'].tolist(),
+                recommendations['risk_level'].tolist(),
+                credit_scores
+            )
+        ]
+
+    if name == 'collections':
+        # Giữ mọi dòng và đưa về thứ tự đầu vào (prioritize_collections sắp xếp theo ưu tiên)
+        prioritized = model.prioritize_collections(features, top_n=len(features), scoring=scoring).sort_index()
+        return [
+            {'probability_further_delinquency': p, 'priority_score': priority,
+             'suggested_action': action, 'credit_score': score}
+            for p, priority, action, score in zip(
+                prioritized['probability_further_delinquency'].to_numpy(dtype=np.float64).tolist(),
+                prioritized['priority_score'].to_numpy(dtype=np.float64).tolist(),
+                prioritized['suggested_action'].tolist(),
+                credit_scores
+            )
+        ]
+
+    if name == 'desertion':
+        strategy = model.create_retention_strategy(features, scoring=scoring)
+        return [
+            {'desertion_probability': p, 'risk_tier': tier, 'retention_strategy': retention,
+             'discount_offer': discount, 'credit_score': score}
+            for p, tier, retention, discount, score in zip(
+                strategy['desertion_probability'].to_numpy(dtype=np.float64).tolist(),
+                strategy['risk_tier'].tolist(),
+                strategy['retention_strategy'].tolist(),
+                strategy['discount_offer'].tolist(),
+                credit_scores
+            )
+        ]
+
+    raise ValueError(f"Không có mô hình: {name}")
+
+def build_profiles(customer_ids, frame, models, executor):
+    """
+    Đánh giá đồng thời các mô hình cho một lô bản ghi khách hàng đã gộp
+
+    Bản ghi được parse và dựng DataFrame một lần; mỗi mô hình nhận đúng tập
+    đặc trưng của nó (theo feature_names của booster, cùng các cột nghiệp vụ trong
+    BUSINESS_COLUMNS) và chỉ chấm các khách hàng có đủ các cột đó. Các mô hình chạy song song trên executor (XGBoost nhả GIL
+    khi dự đoán).
+
+    Parameters:
+    -----------
+    customer_ids : list
+        ID khách hàng theo thứ tự dòng của frame
+    frame : DataFrame
+        Đặc trưng đã gộp (None/NaN cho đặc trưng không có)
+    models : dict
+        Tên ngắn -> mô hình đang phục vụ (giữ nguyên trong suốt yêu cầu)
+    executor : Executor
+        Thread pool chạy các mô hình
+
+    Returns:
+    --------
+    tuple
+        (danh sách hồ sơ theo thứ tự đầu vào, dict phiên bản mô hình đã dùng)
+    """
+    profiles = [{'customer_id': customer_id} for customer_id in customer_ids]
+    for profile in profiles:
+        for name in models:
+            profile[name] = None
+
+    routed = {name: route_features(frame, model, BUSINESS_COLUMNS.get(name, ()))
+              for name, model in models.items()}
+    futures = {
+        name: executor.submit(evaluate_model, name, models[name], features)
+        for name, (eligible, features) in routed.items() if len(eligible)
+    }
+
+    versions = {}
+    for name, future in futures.items():
+        eligible = routed[name][0]
+        for position, result in zip(eligible.tolist(), future.result()):
+            profiles[position][name] = result
+        versions[name] = models[name].version
+
+    for profile in profiles:
+        # Mô hình không áp dụng được vì thiếu đặc trưng
+        profile['skipped_models'] = [name for name in models if profile[name] is None]
+
+    return profiles, versions
@@ -1,25 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Response
+from fastapi.responses import StreamingResponse
+import anyio.from_thread
 from pydantic import BaseModel, Field
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 import sys
 import json
-from typing import List
+import yaml
+from typing import Dict, List, Optional
 
 # Thêm thư mục gốc vào path
 sys.path.append(str(Path(__file__).parents[1]))
 
-from src.models.application_scorecard import ApplicationScorecard
-from src.models.behavior_scorecard import BehaviorScorecard
-from src.models.collections_scoring import CollectionsScoring
-from src.models.desertion_scoring import DesertionScoring
-from src.scorecard.scorecard_builder import ScorecardBuilder
+from src.models.registry import ModelRegistry
+from src.models.prediction_cache import PredictionCache
+from src.data.feature_store import FeatureStore
+from api.batching import MicroBatcher
+from api import bulk
+from api import customer_360
+from api import columnar
+from api.admission import AdmissionController, AdmissionMiddleware
+from api.serialization import frame_to_records, json_response
+from src.utils.instrumentation import (
+    instrumentation,
+    instrumented,
+    endpoint_stage,
+    InstrumentationMiddleware
+)
 from api.request_examples import (
     APPLICATION_EXAMPLE, 
     BEHAVIOR_EXAMPLE, 
     COLLECTIONS_EXAMPLE, 
-    DESERTION_EXAMPLE
+    DESERTION_EXAMPLE,
+    CUSTOMER_360_EXAMPLE
 )
 
 app = FastAPI(
@@ -28,21 +44,142 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Load models
-application_model = ApplicationScorecard()
-behavior_model = BehaviorScorecard()
-collections_model = CollectionsScoring()
-desertion_model = DesertionScoring()
+# Đo thời gian theo request (tổng, parse/validate, mã hóa response); xem /metrics
+app.add_middleware(InstrumentationMiddleware)
+
+# Cấu hình API (tùy chọn) trong config.yaml
+with open(Path(__file__).parents[1] / 'config.yaml', 'r') as file:
+    api_config = (yaml.safe_load(file) or {}).get('api', {})
 
+# Kiểm soát nạp: giới hạn đồng thời, hàng đợi, kích thước body và lô theo nhóm endpoint
+admission = AdmissionController(api_config.get('admission', {}))
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
+# Load models: phiên bản đang hoạt động trong manifest của từng mô hình,
+# hoặc artifact cũ trong thư mục models/ nếu chưa có phiên bản nào
+registry = ModelRegistry()
 try:
-    application_model.load_model()
-    behavior_model.load_model()
-    collections_model.load_model()
-    desertion_model.load_model()
+    registry.load_active()
     print("All models loaded successfully")
 except Exception as e:
     print(f"Error loading models: {e}")
 
+# Histogram thời gian theo giai đoạn của endpoint và mô hình (tắt được trong config.yaml);
+# bật sau khi tải mô hình để lần chạy thử không lẫn vào số liệu
+instrumentation.configure(enabled=api_config.get('instrumentation', {}).get('enabled', True))
+
+# Tên ngắn của mô hình dùng trong các endpoint
+MODEL_TYPES = {
+    'application': 'application_scorecard',
+    'behavior': 'behavior_scorecard',
+    'collections': 'collections_scoring',
+    'desertion': 'desertion_scoring'
+}
+
+# Bộ nhớ đệm dự đoán (tùy chọn): hồ sơ gửi lại nhiều lần chỉ được tính một lần.
+# Khóa chứa phiên bản mô hình; khi registry hoán đổi phiên bản, các phần tử cũ
+# của mô hình đó bị xóa.
+cache_config = api_config.get('prediction_cache', {})
+prediction_cache = None
+if cache_config.get('enabled', False):
+    prediction_cache = PredictionCache(
+        max_size=cache_config.get('max_size', 100000),
+        ttl_seconds=cache_config.get('ttl_seconds', 900)
+    )
+    
+    def attach_prediction_cache(model_type, model):
+        model.prediction_cache = prediction_cache
+        prediction_cache.invalidate(model_type)
+    
+    for model_type in registry.model_types:
+        if registry.get(model_type) is not None:
+            registry.get(model_type).prediction_cache = prediction_cache
+    registry.add_listener(attach_prediction_cache)
+
+# Kho đặc trưng theo customer_id (memory-map); chỉ mở kho đã dựng, không ghi gì
+# ra đĩa khi import (dựng bằng python run.py --action feature_store)
+feature_stores = {}
+for name in MODEL_TYPES:
+    store = FeatureStore(name)
+    if not store.exists():
+        print(f"Feature store {name} chưa được dựng (python run.py --action feature_store --model {name})")
+        continue
+    try:
+        feature_stores[name] = store.load()
+    except Exception as e:
+        print(f"Error loading feature store {name}: {e}")
+
+# Header cho biết phiên bản mô hình đã phục vụ response
+MODEL_VERSION_HEADER = 'X-Model-Version'
+
+def get_model(name):
+    """
+    Mô hình đang phục vụ theo tên ngắn; lấy tại thời điểm gọi để
+    các yêu cầu sau khi hoán đổi phiên bản dùng mô hình mới
+    """
+    model = registry.get(MODEL_TYPES[name])
+    if model is None:
+        raise RuntimeError(f"Mô hình {name} chưa được tải")
+    return model
+
+def with_model_version(result, response, version):
+    """
+    Gắn phiên bản mô hình vào header X-Model-Version của response
+    """
+    target = result if isinstance(result, Response) else response
+    if version is not None:
+        target.headers[MODEL_VERSION_HEADER] = str(version)
+    return result
+
+def score_records(model, records):
+    """
+    Chấm điểm danh sách bản ghi (dict) trong một lần gọi mô hình
+    
+    Parameters:
+    -----------
+    model : BaseXGBoostModel
+        Mô hình đã tải
+    records : list
+        Danh sách dict đặc trưng (có thể chứa customer_id)
+        
+    Returns:
+    --------
+    ScoringResult
+    """
+    if len(records) == 1:
+        return model.score_one(records[0])
+    return model.score(pd.DataFrame.from_records(records))
+
+# Gom các yêu cầu đồng thời của từng mô hình thành lô (micro-batching)
+batching_config = api_config.get('micro_batching', {})
+scoring_executor = ThreadPoolExecutor(
+    max_workers=batching_config.get('workers', 4),
+    thread_name_prefix='scoring'
+)
+batchers = {
+    name: MicroBatcher(
+        name,
+        lambda records, name=name: score_records(get_model(name), records),
+        max_batch_size=batching_config.get('max_batch_size', 256),
+        max_wait_ms=batching_config.get('max_wait_ms', 2.0),
+        executor=scoring_executor,
+        enabled=batching_config.get('enabled', True)
+    )
+    for name in MODEL_TYPES
+}
+
+# Mã hóa sẵn các response lớn thành bytes JSON (bỏ qua jsonable_encoder)
+pre_encode_responses = api_config.get('serialization', {}).get('pre_encode', True)
+
+# Kiểm tra dữ liệu dạng cột (/columnar/)
+columnar_config = api_config.get('columnar', {})
+
+def submit_from_thread(name, records):
+    """
+    Gửi bản ghi tới micro-batcher từ một handler đồng bộ (chạy trên threadpool của AnyIO)
+    """
+    return anyio.from_thread.run(batchers[name].submit, records)
+
 # Pydantic models
 class ApplicationData(BaseModel):
     """Dữ liệu input cho Application Scorecard"""
@@ -219,6 +356,115 @@ class BatchDesertionRequest(BaseModel):
             }
         }
 
+class Customer360Data(BaseModel):
+    """
+    Bản ghi gộp của một khách hàng cho hồ sơ 360
+    
+    Mọi đặc trưng đều không bắt buộc: mỗi mô hình chỉ được đánh giá khi bản ghi
+    có đủ đặc trưng của mô hình đó.
+    """
+    customer_id: str
+    # Application Scorecard (age dùng chung với Desertion Scoring)
+    age: Optional[int] = Field(None, ge=18, le=100)
+    income: Optional[float] = Field(None, ge=0)
+    employment_length: Optional[float] = Field(None, ge=0)
+    debt_to_income: Optional[float] = Field(None, ge=0)
+    credit_history_length: Optional[float] = Field(None, ge=0)
+    number_of_debts: Optional[int] = Field(None, ge=0)
+    number_of_delinquent_debts: Optional[int] = Field(None, ge=0)
+    homeowner: Optional[int] = Field(None, ge=0, le=1)
+    # Behavior Scorecard
+    current_balance: Optional[float] = Field(None, ge=0)
+    average_monthly_payment: Optional[float] = Field(None, ge=0)
+    payment_ratio: Optional[float] = Field(None, ge=0, le=1)
+    number_of_late_payments: Optional[int] = Field(None, ge=0)
+    months_since_last_late_payment: Optional[int] = Field(None, ge=0)
+    number_of_credit_inquiries: Optional[int] = Field(None, ge=0)
+    current_limit: Optional[float] = Field(None, ge=0)
+    average_utilization: Optional[float] = Field(None, ge=0, le=1)
+    # Collections Scoring
+    days_past_due: Optional[int] = Field(None, ge=0)
+    outstanding_amount: Optional[float] = Field(None, ge=0)
+    number_of_contacts: Optional[int] = Field(None, ge=0)
+    previous_late_payments: Optional[int] = Field(None, ge=0)
+    promised_payment_amount: Optional[float] = Field(None, ge=0)
+    broken_promises: Optional[int] = Field(None, ge=0)
+    months_on_book: Optional[int] = Field(None, ge=0)
+    last_payment_amount: Optional[float] = Field(None, ge=0)
+    # Desertion Scoring
+    months_to_maturity: Optional[int] = Field(None, ge=0)
+    total_relationship_value: Optional[float] = Field(None, ge=0)
+    number_of_products: Optional[int] = Field(None, ge=0)
+    satisfaction_score: Optional[float] = Field(None, ge=0, le=10)
+    number_of_complaints: Optional[int] = Field(None, ge=0)
+    months_since_last_interaction: Optional[float] = Field(None, ge=0)
+    tenure_months: Optional[int] = Field(None, ge=0)
+    monthly_average_balance: Optional[float] = Field(None, ge=0)
+    
+    class Config:
+        schema_extra = {
+            "example": CUSTOMER_360_EXAMPLE
+        }
+
+class BatchCustomer360Request(BaseModel):
+    customers: List[Customer360Data] = Field(..., description="Danh sách bản ghi khách hàng đã gộp")
+    models: Optional[List[str]] = Field(None, description="Các mô hình cần đánh giá (mặc định cả bốn)")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "customers": [CUSTOMER_360_EXAMPLE],
+                "models": ["behavior", "collections", "desertion"]
+            }
+        }
+
+class ColumnarBatchRequest(BaseModel):
+    customer_ids: Optional[List[str]] = Field(None, description="ID khách hàng theo thứ tự dòng (tùy chọn)")
+    columns: Dict[str, list] = Field(..., description="Tên đặc trưng -> danh sách giá trị (mọi cột cùng độ dài)")
+    on_error: str = Field('reject', regex='^(reject|skip)$',
+                          description="reject: trả 422 nếu có dòng lỗi; skip: bỏ qua dòng lỗi, chấm các dòng còn lại")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "customer_ids": [APPLICATION_EXAMPLE["customer_id"]],
+                "columns": {
+                    f: [value] for f, value in APPLICATION_EXAMPLE.items() if f != "customer_id"
+                },
+                "on_error": "reject"
+            }
+        }
+
+# Lớp pydantic chứa ràng buộc của từng mô hình (dùng cho kiểm tra dạng cột)
+SCHEMAS = {
+    'application': ApplicationData,
+    'behavior': BehaviorData,
+    'collections': CollectionsData,
+    'desertion': DesertionData
+}
+
+def customers_to_frame(customers):
+    """
+    Chuyển danh sách khách hàng (pydantic) thành một DataFrame dạng cột
+    
+    Parameters:
+    -----------
+    customers : list
+        Danh sách đối tượng ApplicationData, BehaviorData, ...
+        
+    Returns:
+    --------
+    tuple
+        (customer_ids, DataFrame đặc trưng không có cột customer_id)
+    """
+    fields = [f for f in type(customers[0]).__fields__ if f != 'customer_id']
+    customer_ids = [c.customer_id for c in customers]
+    
+    # Gom dữ liệu theo cột để pandas không phải suy luận kiểu từng dòng
+    frame = pd.DataFrame({f: [getattr(c, f) for c in customers] for f in fields})
+    
+    return customer_ids, frame
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Credit Scoring API", "version": "1.0.0"}
@@ -226,7 +472,8 @@ def read_root():
 @app.post("/application-score/", 
           description="Tính điểm tín dụng cho khách hàng mới dựa trên thông tin đơn vay",
           response_description="Hồ sơ rủi ro và điểm tín dụng của khách hàng")
-def get_application_score(data: ApplicationData):
+@instrumented
+async def get_application_score(data: ApplicationData, response: Response):
     """
     Tính điểm tín dụng cho khách hàng mới
     
@@ -246,63 +493,25 @@ def get_application_score(data: ApplicationData):
     ```
     """
     try:
-        # Chuyển đổi dữ liệu thành DataFrame
-        customer_df = pd.DataFrame([data.dict()])
-        
         # Lưu customer_id để trả về sau
         customer_id = data.customer_id
         
-        # Loại bỏ cột customer_id trước khi truyền vào mô hình
-        if 'customer_id' in customer_df.columns:
-            customer_df_for_model = customer_df.drop(columns=['customer_id'])
-        else:
-            customer_df_for_model = customer_df
-            
-        # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp 
-        for col in customer_df_for_model.columns:
-            if customer_df_for_model[col].dtype == 'object':
-                try:
-                    customer_df_for_model[col] = pd.to_numeric(customer_df_for_model[col])
-                except:
-                    # Nếu không thể chuyển sang numeric, chuyển sang category
-                    customer_df_for_model[col] = customer_df_for_model[col].astype('category')
-        
-        # Kiểm tra và thực hiện dự đoán trực tiếp nếu không có phương thức risk profile
-        if hasattr(application_model, 'get_application_risk_profile'):
-            # Tính điểm và tạo hồ sơ rủi ro
-            risk_profile = application_model.get_application_risk_profile(customer_df_for_model)
-            # Chuyển đổi các giá trị numpy về Python types
-            risk_profile = {k: float(v) if isinstance(v, (np.floating, np.integer)) else v 
-                          for k, v in risk_profile.items()}
-        else:
-            # Dự đoán xác suất mặc định
-            default_prob = float(application_model.predict(customer_df_for_model)[0])
-            risk_profile = {
-                'default_probability': float(default_prob),
-                'risk_level': 'High' if default_prob > 0.5 else ('Medium' if default_prob > 0.3 else 'Low'),
-                'suggested_action': 'Reject' if default_prob > 0.5 else ('Review' if default_prob > 0.3 else 'Approve')
-            }
-        
-        # Tính điểm scorecard nếu có
-        try:
-            # Kiểm tra xem mô hình đã được tải chưa
-            if application_model.model is None:
-                application_model.load_model()
-                
-            # Thử tính điểm trực tiếp từ mô hình
-            y_pred_proba = application_model.predict(customer_df_for_model)
-            # Chuyển đổi xác suất thành điểm (600-850) - đảm bảo dùng Python float
-            proba_value = float(y_pred_proba[0])
-            score = int(600 + 250 * (1 - proba_value))
-            risk_profile['credit_score'] = score
-        except Exception as e:
-            risk_profile['credit_score'] = 600  # Điểm mặc định
-            print(f"Error calculating scorecard: {e}")
+        # Chấm điểm một lần (ghép lô với các yêu cầu đồng thời)
+        # và dùng chung kết quả cho hồ sơ rủi ro và điểm tín dụng
+        with endpoint_stage('scoring'):
+            scoring = await batchers['application'].submit([data.dict()])
+        with endpoint_stage('domain'):
+            risk_profile = get_model('application').get_application_risk_profile(None, scoring=scoring)
+        # Chuyển đổi các giá trị numpy về Python types
+        risk_profile = {k: float(v) if isinstance(v, (np.floating, np.integer)) else v 
+                      for k, v in risk_profile.items()}
+        risk_profile['credit_score'] = int(scoring.score[0])
         
-        return {
+        return with_model_version({
             "customer_id": customer_id,
-            "risk_profile": risk_profile
-        }
+            "risk_profile": risk_profile,
+            "model_version": scoring.model_version
+        }, response, scoring.model_version)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -312,7 +521,8 @@ def get_application_score(data: ApplicationData):
 @app.post("/behavior-score/",
           description="Tính điểm hành vi và đề xuất giới hạn tín dụng cho khách hàng hiện tại",
           response_description="Đề xuất giới hạn tín dụng và điểm tín dụng của khách hàng")
-def get_behavior_score(data: BehaviorData):
+@instrumented
+async def get_behavior_score(data: BehaviorData, response: Response):
     """
     Tính điểm hành vi cho khách hàng hiện tại
     
@@ -332,77 +542,26 @@ def get_behavior_score(data: BehaviorData):
     ```
     """
     try:
-        # Chuyển đổi dữ liệu thành DataFrame
-        customer_df = pd.DataFrame([data.dict()])
-        
         # Lưu customer_id và current_limit để sử dụng sau
         customer_id = data.customer_id
         current_limit = data.current_limit
         
-        # Loại bỏ cột customer_id trước khi truyền vào mô hình
-        if 'customer_id' in customer_df.columns:
-            customer_df_for_model = customer_df.drop(columns=['customer_id'])
-        else:
-            customer_df_for_model = customer_df
-        
-        # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp
-        for col in customer_df_for_model.columns:
-            if customer_df_for_model[col].dtype == 'object':
-                try:
-                    customer_df_for_model[col] = pd.to_numeric(customer_df_for_model[col])
-                except:
-                    # Nếu không thể chuyển sang numeric, chuyển sang category
-                    customer_df_for_model[col] = customer_df_for_model[col].astype('category')
-        
-        # Kiểm tra và thực hiện dự đoán trực tiếp nếu không có phương thức recommend_credit_limit
-        if hasattr(behavior_model, 'recommend_credit_limit'):
-            # Tính toán đề xuất giới hạn tín dụng
-            recommendation = behavior_model.recommend_credit_limit(customer_df_for_model, current_limit)
-            # Chuyển đổi các giá trị numpy về Python types
-            recommendation = {k: float(v) if isinstance(v, (np.floating, np.integer)) else v 
-                            for k, v in recommendation.items()}
-        else:
-            # Dự đoán xác suất mặc định
-            default_prob = float(behavior_model.predict(customer_df_for_model)[0])
-            
-            # Tạo đề xuất đơn giản dựa trên xác suất mặc định
-            if (default_prob < 0.2):
-                new_limit = float(current_limit * 1.2)  # Tăng hạn mức 20%
-                action = "Increase"
-            elif (default_prob > 0.5):
-                new_limit = float(current_limit * 0.7)  # Giảm hạn mức 30%
-                action = "Decrease"
-            else:
-                new_limit = float(current_limit)  # Giữ nguyên
-                action = "Maintain"
-                
-            recommendation = {
-                'default_probability': float(default_prob),
-                'suggested_limit': new_limit,
-                'suggested_action': action,
-                'risk_level': 'High' if default_prob > 0.5 else ('Medium' if default_prob > 0.3 else 'Low')
-            }
-        
-        # Tính điểm scorecard nếu có
-        try:
-            # Kiểm tra xem mô hình đã được tải chưa
-            if behavior_model.model is None:
-                behavior_model.load_model()
-                
-            # Thử tính điểm trực tiếp từ mô hình
-            y_pred_proba = behavior_model.predict(customer_df_for_model)
-            # Chuyển đổi xác suất thành điểm (600-850) - đảm bảo dùng Python float
-            proba_value = float(y_pred_proba[0])
-            score = int(600 + 250 * (1 - proba_value))
-            recommendation['credit_score'] = score
-        except Exception as e:
-            recommendation['credit_score'] = 600  # Điểm mặc định
-            print(f"Error calculating scorecard: {e}")
+        # Chấm điểm một lần (ghép lô với các yêu cầu đồng thời)
+        # và dùng chung kết quả cho đề xuất hạn mức và điểm tín dụng
+        with endpoint_stage('scoring'):
+            scoring = await batchers['behavior'].submit([data.dict()])
+        with endpoint_stage('domain'):
+            recommendation = get_model('behavior').recommend_credit_limit(None, current_limit, scoring=scoring)
+        # Chuyển đổi các giá trị numpy về Python types
+        recommendation = {k: float(v) if isinstance(v, (np.floating, np.integer)) else v 
+                        for k, v in recommendation.items()}
+        recommendation['credit_score'] = int(scoring.score[0])
         
-        return {
+        return with_model_version({
             "customer_id": customer_id,
-            "credit_recommendation": recommendation
-        }
+            "credit_recommendation": recommendation,
+            "model_version": scoring.model_version
+        }, response, scoring.model_version)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -412,7 +571,8 @@ def get_behavior_score(data: BehaviorData):
 @app.post("/collections-prioritize/",
           description="Ưu tiên các tài khoản thu hồi nợ dựa trên khả năng tiếp tục trễ hạn",
           response_description="Danh sách tài khoản đã sắp xếp theo mức độ ưu tiên thu hồi nợ")
-def prioritize_collection(data_list: list[CollectionsData]):
+@instrumented
+def prioritize_collection(data_list: list[CollectionsData], response: Response):
     """
     Ưu tiên các tài khoản thu hồi nợ
     
@@ -440,55 +600,54 @@ def prioritize_collection(data_list: list[CollectionsData]):
     ]
     ```
     """
+    admission.check_batch_size(len(data_list))
     try:
-        # Chuyển đổi dữ liệu thành DataFrame
-        collection_df = pd.DataFrame([data.dict() for data in data_list])
-        
-        # Lưu mapping giữa customer_id và index để khôi phục sau
-        id_mapping = collection_df['customer_id'].to_dict()
+        with endpoint_stage('frame_build'):
+            # Chuyển đổi dữ liệu thành DataFrame
+            records = [data.dict() for data in data_list]
+            collection_df = pd.DataFrame(records)
         
-        # Loại bỏ cột customer_id trước khi truyền vào mô hình
-        if 'customer_id' in collection_df.columns:
-            collection_df_for_model = collection_df.drop(columns=['customer_id'])
-        else:
-            collection_df_for_model = collection_df
+            # Lưu mapping giữa customer_id và index để khôi phục sau
+            id_mapping = collection_df['customer_id'].to_dict()
         
-        # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp
-        for col in collection_df_for_model.columns:
-            if collection_df_for_model[col].dtype == 'object':
-                try:
-                    collection_df_for_model[col] = pd.to_numeric(collection_df_for_model[col])
-                except:
-                    # Nếu không thể chuyển sang numeric, chuyển sang category
-                    collection_df_for_model[col] = collection_df_for_model[col].astype('category')
-        
-        # Ưu tiên thu hồi nợ
-        prioritized = collections_model.prioritize_collections(collection_df_for_model)
+            # Loại bỏ cột customer_id trước khi truyền vào mô hình
+            if 'customer_id' in collection_df.columns:
+                collection_df_for_model = collection_df.drop(columns=['customer_id'])
+            else:
+                collection_df_for_model = collection_df
         
-        # Thêm lại cột customer_id
-        prioritized['customer_id'] = prioritized.index.map(lambda i: id_mapping.get(i, f"Unknown-{i}"))
+            # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp
+            for col in collection_df_for_model.columns:
+                if collection_df_for_model[col].dtype == 'object':
+                    try:
+                        collection_df_for_model[col] = pd.to_numeric(collection_df_for_model[col])
+                    except:
+                        # Nếu không thể chuyển sang numeric, chuyển sang category
+                        collection_df_for_model[col] = collection_df_for_model[col].astype('category')
         
-        # Chuyển kết quả thành JSON-serializable và đảm bảo các giá trị numpy được chuyển đổi
-        result = []
-        for idx, row in prioritized.iterrows():
-            row_dict = {}
-            for col, val in row.items():
-                if isinstance(val, (np.floating, np.integer)):
-                    row_dict[col] = float(val)
-                else:
-                    row_dict[col] = val
-            result.append(row_dict)
+        # Chấm điểm qua micro-batcher rồi ưu tiên thu hồi nợ
+        with endpoint_stage('scoring'):
+            scoring = submit_from_thread('collections', records)
+        with endpoint_stage('domain'):
+            prioritized = get_model('collections').prioritize_collections(collection_df_for_model, scoring=scoring)
+            
+            # Thêm lại cột customer_id
+            prioritized['customer_id'] = prioritized.index.map(lambda i: id_mapping.get(i, f"Unknown-{i}"))
         
-        return {
-            "prioritized_accounts": result
-        }
+        # Chuyển kết quả thành kiểu Python thuần theo từng cột (không duyệt từng dòng)
+        with endpoint_stage('serialization'):
+            return with_model_version(json_response({
+                "prioritized_accounts": frame_to_records(prioritized),
+                "model_version": scoring.model_version
+            }, pre_encoded=pre_encode_responses), response, scoring.model_version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
 @app.post("/desertion-strategy/",
           description="Tạo chiến lược giữ chân khách hàng dựa trên khả năng từ bỏ",
           response_description="Chiến lược giữ chân khách hàng tùy chỉnh cho từng khách hàng")
-def get_retention_strategy(data_list: list[DesertionData]):
+@instrumented
+def get_retention_strategy(data_list: list[DesertionData], response: Response):
     """
     Tạo chiến lược giữ chân khách hàng
     
@@ -516,49 +675,47 @@ def get_retention_strategy(data_list: list[DesertionData]):
     ]
     ```
     """
+    admission.check_batch_size(len(data_list))
     try:
-        # Chuyển đổi dữ liệu thành DataFrame
-        customer_df = pd.DataFrame([data.dict() for data in data_list])
+        with endpoint_stage('frame_build'):
+            # Chuyển đổi dữ liệu thành DataFrame
+            records = [data.dict() for data in data_list]
+            customer_df = pd.DataFrame(records)
         
-        # Lưu customer_id trước khi loại bỏ
-        customer_ids = customer_df['customer_id'].tolist() if 'customer_id' in customer_df.columns else []
+            # Lưu customer_id trước khi loại bỏ
+            customer_ids = customer_df['customer_id'].tolist() if 'customer_id' in customer_df.columns else []
         
-        # Loại bỏ cột customer_id trước khi truyền vào mô hình
-        if 'customer_id' in customer_df.columns:
-            customer_df_for_model = customer_df.drop(columns=['customer_id'])
-        else:
-            customer_df_for_model = customer_df
+            # Loại bỏ cột customer_id trước khi truyền vào mô hình
+            if 'customer_id' in customer_df.columns:
+                customer_df_for_model = customer_df.drop(columns=['customer_id'])
+            else:
+                customer_df_for_model = customer_df
             
-        # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp
-        for col in customer_df_for_model.columns:
-            if customer_df_for_model[col].dtype == 'object':
-                try:
-                    customer_df_for_model[col] = pd.to_numeric(customer_df_for_model[col])
-                except:
-                    # Nếu không thể chuyển sang numeric, chuyển sang category
-                    customer_df_for_model[col] = customer_df_for_model[col].astype('category')
-        
-        # Tạo chiến lược giữ chân
-        strategy_df = desertion_model.create_retention_strategy(customer_df_for_model)
+            # Đảm bảo tất cả các cột đều có kiểu dữ liệu phù hợp
+            for col in customer_df_for_model.columns:
+                if customer_df_for_model[col].dtype == 'object':
+                    try:
+                        customer_df_for_model[col] = pd.to_numeric(customer_df_for_model[col])
+                    except:
+                        # Nếu không thể chuyển sang numeric, chuyển sang category
+                        customer_df_for_model[col] = customer_df_for_model[col].astype('category')
         
-        # Thêm customer_id vào kết quả
-        if customer_ids and len(customer_ids) == len(strategy_df):
-            strategy_df['customer_id'] = customer_ids
-        
-        # Chuyển kết quả thành JSON-serializable và đảm bảo các giá trị numpy được chuyển đổi
-        result = []
-        for idx, row in strategy_df.iterrows():
-            row_dict = {}
-            for col, val in row.items():
-                if isinstance(val, (np.floating, np.integer)):
-                    row_dict[col] = float(val)
-                else:
-                    row_dict[col] = val
-            result.append(row_dict)
+        # Chấm điểm qua micro-batcher rồi tạo chiến lược giữ chân
+        with endpoint_stage('scoring'):
+            scoring = submit_from_thread('desertion', records)
+        with endpoint_stage('domain'):
+            strategy_df = get_model('desertion').create_retention_strategy(customer_df_for_model, scoring=scoring)
+            
+            # Thêm customer_id vào kết quả
+            if customer_ids and len(customer_ids) == len(strategy_df):
+                strategy_df['customer_id'] = customer_ids
         
-        return {
-            "retention_strategies": result
-        }
+        # Chuyển kết quả thành kiểu Python thuần theo từng cột (không duyệt từng dòng)
+        with endpoint_stage('serialization'):
+            return with_model_version(json_response({
+                "retention_strategies": frame_to_records(strategy_df),
+                "model_version": scoring.model_version
+            }, pre_encoded=pre_encode_responses), response, scoring.model_version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
@@ -566,7 +723,8 @@ def get_retention_strategy(data_list: list[DesertionData]):
 @app.post("/batch/application-score/", 
           description="Đánh giá rủi ro cho nhiều khách hàng mới",
           response_description="Hồ sơ rủi ro và điểm tín dụng của các khách hàng")
-def batch_application_score(data: BatchApplicationRequest):
+@instrumented
+def batch_application_score(data: BatchApplicationRequest, response: Response):
     """
     Đánh giá rủi ro hàng loạt cho các khách hàng mới
     
@@ -600,15 +758,44 @@ def batch_application_score(data: BatchApplicationRequest):
     }
     ```
     """
+    admission.check_batch_size(len(data.customers))
     try:
-        results = []
+        if not data.customers:
+            return {"results": []}
+        
+        # Dự đoán toàn bộ lô trong một lần gọi mô hình
+        with endpoint_stage('frame_build'):
+            customer_ids, customer_df = customers_to_frame(data.customers)
+        model = get_model('application')
+        with endpoint_stage('scoring'):
+            scoring = model.score(customer_df)
+        with endpoint_stage('domain'):
+            profiles = model.get_application_risk_profiles(customer_df, scoring=scoring)
         
-        for customer_data in data.customers:
-            # Xử lý từng khách hàng giống như endpoint đơn lẻ
-            result = get_application_score(customer_data)
-            results.append(result)
+        proba = profiles['probability_of_default'].to_numpy(dtype=np.float64)
+        credit_scores = scoring.score
         
-        return {"results": results}
+        results = [
+            {
+                "customer_id": customer_id,
+                "risk_profile": {
+                    'probability_of_default': p,
+                    'risk_level': risk_level,
+                    'recommendation': recommendation,
+                    'credit_score': score
+                }
+            }
+            for customer_id, p, risk_level, recommendation, score in zip(
+                customer_ids,
+                proba.tolist(),
+                profiles['risk_level'].tolist(),
+                profiles['recommendation'].tolist(),
+                credit_scores.tolist()
+            )
+        ]
+        
+        return with_model_version({"results": results, "model_version": scoring.model_version},
+                                  response, scoring.model_version)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -618,7 +805,8 @@ def batch_application_score(data: BatchApplicationRequest):
 @app.post("/batch/behavior-score/", 
           description="Đánh giá hành vi cho nhiều khách hàng hiện tại",
           response_description="Đề xuất giới hạn tín dụng và điểm tín dụng của các khách hàng")
-def batch_behavior_score(data: BatchBehaviorRequest):
+@instrumented
+def batch_behavior_score(data: BatchBehaviorRequest, response: Response):
     """
     Đánh giá hành vi hàng loạt cho các khách hàng hiện tại
     
@@ -652,15 +840,50 @@ def batch_behavior_score(data: BatchBehaviorRequest):
     }
     ```
     """
+    admission.check_batch_size(len(data.customers))
     try:
-        results = []
+        if not data.customers:
+            return {"results": []}
         
-        for customer_data in data.customers:
-            # Xử lý từng khách hàng giống như endpoint đơn lẻ
-            result = get_behavior_score(customer_data)
-            results.append(result)
+        # Dự đoán toàn bộ lô trong một lần gọi mô hình
+        with endpoint_stage('frame_build'):
+            customer_ids, customer_df = customers_to_frame(data.customers)
+        model = get_model('behavior')
+        with endpoint_stage('scoring'):
+            scoring = model.score(customer_df)
+        with endpoint_stage('domain'):
+            recommendations = model.recommend_credit_limits(
+                customer_df, customer_df['current_limit'].to_numpy(), scoring=scoring
+            )
+        
+        proba = recommendations['probability_of_default'].to_numpy(dtype=np.float64)
+        credit_scores = scoring.score
+        
+        results = [
+            {
+                "customer_id": customer_id,
+                "credit_recommendation": {
+                    'probability_of_default': p,
+                    'current_limit': current_limit,
+                    'recommended_limit': recommended_limit,
+                    'action': action,
+                    'risk_level': risk_level,
+                    'credit_score': score
+                }
+            }
+            for customer_id, p, current_limit, recommended_limit, action, risk_level, score in zip(
+                customer_ids,
+                proba.tolist(),
+                recommendations['current_limit'].tolist(),
+                recommendations['recommended_limit'].tolist(),
+                recommendations['action'].tolist(),
+                recommendations['risk_level'].tolist(),
+                credit_scores.tolist()
+            )
+        ]
         
-        return {"results": results}
+        return with_model_version({"results": results, "model_version": scoring.model_version},
+                                  response, scoring.model_version)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -670,7 +893,8 @@ def batch_behavior_score(data: BatchBehaviorRequest):
 @app.post("/batch/collections-prioritize/", 
           description="Đánh giá và ưu tiên các tài khoản thu hồi nợ",
           response_description="Danh sách tài khoản đã xếp hạng theo mức độ ưu tiên thu hồi nợ")
-def batch_collections_prioritize(data: BatchCollectionsRequest):
+@instrumented
+def batch_collections_prioritize(data: BatchCollectionsRequest, response: Response):
     """
     Ưu tiên các tài khoản thu hồi nợ
     
@@ -704,10 +928,11 @@ def batch_collections_prioritize(data: BatchCollectionsRequest):
     }
     ```
     """
+    admission.check_batch_size(len(data.customers))
     try:
         # Trực tiếp sử dụng phương thức prioritize_collection hiện có
         # vì nó đã được thiết kế để xử lý nhiều khách hàng
-        return prioritize_collection(data.customers)
+        return prioritize_collection(data.customers, response)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -717,7 +942,8 @@ def batch_collections_prioritize(data: BatchCollectionsRequest):
 @app.post("/batch/desertion-strategy/", 
           description="Tạo chiến lược giữ chân cho nhiều khách hàng",
           response_description="Chiến lược giữ chân khách hàng tùy chỉnh cho từng khách hàng")
-def batch_desertion_strategy(data: BatchDesertionRequest):
+@instrumented
+def batch_desertion_strategy(data: BatchDesertionRequest, response: Response):
     """
     Tạo chiến lược giữ chân hàng loạt cho các khách hàng
     
@@ -753,16 +979,477 @@ def batch_desertion_strategy(data: BatchDesertionRequest):
     }
     ```
     """
+    admission.check_batch_size(len(data.customers))
     try:
         # Trực tiếp sử dụng phương thức get_retention_strategy hiện có
         # vì nó đã được thiết kế để xử lý nhiều khách hàng
-        return get_retention_strategy(data.customers)
+        return get_retention_strategy(data.customers, response)
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
         print(f"Detailed error in batch_desertion_strategy: {error_details}")
         raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
 
+def customer_360_profiles(customers, model_names):
+    """
+    Dựng hồ sơ 360 cho danh sách bản ghi đã gộp (dùng chung cho endpoint đơn và lô)
+    """
+    model_names = list(model_names or customer_360.PROFILE_MODELS)
+    unknown = [name for name in model_names if name not in MODEL_TYPES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Không có mô hình: {', '.join(unknown)}")
+    
+    # Giữ nguyên phiên bản của từng mô hình trong suốt yêu cầu
+    models = {name: get_model(name) for name in customer_360.PROFILE_MODELS if name in model_names}
+    
+    with endpoint_stage('frame_build'):
+        customer_ids, customer_df = customers_to_frame(customers)
+    with endpoint_stage('scoring'):
+        profiles, versions = customer_360.build_profiles(customer_ids, customer_df, models, scoring_executor)
+    
+    # Header X-Model-Version dạng application=v1,behavior=v2,...
+    header = ','.join(f"{name}={version}" for name, version in versions.items()) or None
+    return profiles, versions, header
+
+@app.post("/customer-360/",
+          description="Đánh giá một khách hàng bằng cả bốn mô hình trong một yêu cầu",
+          response_description="Hồ sơ gộp: rủi ro hồ sơ, đề xuất hạn mức, ưu tiên thu hồi nợ và chiến lược giữ chân")
+@instrumented
+def get_customer_360(data: Customer360Data, response: Response,
+                     models: Optional[List[str]] = Query(None, description="Các mô hình cần đánh giá (mặc định cả bốn)")):
+    """
+    Hồ sơ khách hàng 360
+    
+    Nhận một bản ghi gộp, chuyển đúng tập đặc trưng tới từng mô hình
+    (Application, Behavior, Collections, Desertion) và đánh giá các mô hình
+    song song. Mô hình thiếu đặc trưng được liệt kê trong skipped_models.
+    
+    **Ví dụ Request:**
+    ```json
+    {
+        "customer_id": "CUS000456",
+        "age": 42,
+        "current_balance": 3500,
+        "payment_ratio": 0.65,
+        "current_limit": 10000,
+        "days_past_due": 45,
+        "outstanding_amount": 2500,
+        "months_to_maturity": 3,
+        "satisfaction_score": 6.5
+    }
+    ```
+    """
+    try:
+        profiles, versions, header = customer_360_profiles([data], models)
+        return with_model_version(dict(profiles[0], model_versions=versions), response, header)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        print(f"Detailed error in customer-360: {error_details}")
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.post("/batch/customer-360/",
+          description="Đánh giá nhiều khách hàng bằng cả bốn mô hình trong một yêu cầu",
+          response_description="Hồ sơ gộp của từng khách hàng")
+@instrumented
+def batch_customer_360(data: BatchCustomer360Request, response: Response):
+    """
+    Hồ sơ khách hàng 360 theo lô
+    
+    Mỗi mô hình được chấm điểm một lần cho mọi khách hàng có đủ đặc trưng của nó.
+    
+    **Ví dụ Request:**
+    ```json
+    {
+        "customers": [
+            {
+                "customer_id": "CUS000456",
+                "current_balance": 3500,
+                "average_monthly_payment": 850,
+                "payment_ratio": 0.65,
+                "number_of_late_payments": 1,
+                "months_since_last_late_payment": 8,
+                "number_of_credit_inquiries": 2,
+                "current_limit": 10000,
+                "average_utilization": 0.35
+            }
+        ],
+        "models": ["behavior", "desertion"]
+    }
+    ```
+    """
+    admission.check_batch_size(len(data.customers))
+    try:
+        if not data.customers:
+            return {"results": [], "model_versions": {}}
+        
+        profiles, versions, header = customer_360_profiles(data.customers, data.models)
+        with endpoint_stage('serialization'):
+            return with_model_version(json_response({"results": profiles, "model_versions": versions},
+                                                    pre_encoded=pre_encode_responses), response, header)
+    except HTTPException:
+        raise
+    except Exception as e:
+        import traceback
+        error_details = traceback.format_exc()
+        print(f"Detailed error in batch_customer_360: {error_details}")
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.post("/bulk/{model_name}/",
+          description="Chấm điểm hàng loạt từ tệp CSV/Parquet/NDJSON, trả kết quả dạng stream",
+          response_description="Kết quả chấm điểm dạng NDJSON hoặc CSV (có thể nén gzip)")
+@instrumented
+def bulk_score(model_name: str,
+               file: UploadFile = File(..., description="Tệp CSV, Parquet hoặc NDJSON (có thể nén .gz)"),
+               input_format: Optional[str] = Query(None, description="csv, parquet hoặc ndjson; mặc định suy ra từ tên tệp"),
+               output_format: str = Query('ndjson', description="ndjson hoặc csv"),
+               gzip: bool = Query(False, description="Nén gzip kết quả"),
+               chunk_size: int = Query(50000, ge=1, le=1000000, description="Số dòng mỗi lần chấm điểm")):
+    """
+    Chấm điểm hàng loạt từ tệp tải lên
+    
+    Tệp được đọc và chấm điểm theo từng chunk, kết quả được trả về dần dạng stream
+    nên bộ nhớ sử dụng không phụ thuộc kích thước tệp. Mỗi dòng kết quả gồm
+    customer_id (nếu có), probability, log_odds, credit_score và risk_tier.
+    
+    **Ví dụ:**
+    ```bash
+    curl -F "file=@portfolio.csv" "http://localhost:8000/bulk/behavior/?output_format=csv&gzip=true" -o scores.csv.gz
+    ```
+    """
+    if model_name not in MODEL_TYPES:
+        raise HTTPException(status_code=404, detail=f"Không có mô hình: {model_name}")
+    if output_format not in bulk.OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Không hỗ trợ định dạng đầu ra: {output_format}")
+    
+    # Giữ nguyên một phiên bản mô hình cho cả tệp, kể cả khi có hoán đổi giữa chừng
+    model = get_model(model_name)
+    reader = None
+    try:
+        fmt = bulk.infer_input_format(file.filename, input_format)
+        reader = bulk.iter_chunks(bulk.open_upload(file.file, file.filename), fmt, chunk_size)
+        
+        # Kiểm tra chunk đầu tiên để trả lỗi 400 trước khi bắt đầu stream
+        first, chunks = bulk.peek_chunks(reader)
+        if first is not None:
+            bulk.score_chunk(model, first.head(1), list(model.model.feature_names), use_cache=False)
+    except Exception as e:
+        # Đóng generator ngay trong lúc tệp tải lên còn mở
+        if reader is not None:
+            reader.close()
+        raise HTTPException(status_code=400, detail=f"Error reading upload: {str(e)}")
+    
+    filename = f"{model_name}_scores.{output_format if output_format == 'csv' else 'ndjson'}"
+    if gzip:
+        filename += '.gz'
+    
+    return StreamingResponse(
+        bulk.stream_scores(model, chunks, output_format=output_format, compress=gzip),
+        media_type='application/gzip' if gzip else bulk.OUTPUT_FORMATS[output_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            MODEL_VERSION_HEADER: str(model.version)
+        }
+    )
+
+@app.post("/bulk/collections/prioritize/",
+          description="Ưu tiên thu hồi nợ cho cả danh mục từ tệp CSV/Parquet/NDJSON",
+          response_description="top_n tài khoản có điểm ưu tiên cao nhất")
+@instrumented
+def bulk_prioritize_collections(response: Response,
+                                file: UploadFile = File(..., description="Tệp CSV, Parquet hoặc NDJSON (có thể nén .gz)"),
+                                input_format: Optional[str] = Query(None, description="csv, parquet hoặc ndjson; mặc định suy ra từ tên tệp"),
+                                top_n: int = Query(1000, ge=1, le=100000, description="Số tài khoản ưu tiên cần trả về"),
+                                chunk_size: int = Query(50000, ge=1, le=1000000, description="Số dòng mỗi lần chấm điểm")):
+    """
+    Ưu tiên thu hồi nợ cho cả danh mục
+    
+    Tệp được đọc và chấm điểm theo từng chunk; chỉ top_n tài khoản có điểm ưu
+    tiên cao nhất được giữ lại giữa các chunk nên bộ nhớ không phụ thuộc kích
+    thước danh mục. Mỗi kết quả gồm các cột của tệp, probability_further_delinquency,
+    priority_score và suggested_action.
+    
+    **Ví dụ:**
+    ```bash
+    curl -F "file=@collections_book.csv" "http://localhost:8000/bulk/collections/prioritize/?top_n=5000"
+    ```
+    """
+    model = get_model('collections')
+    try:
+        fmt = bulk.infer_input_format(file.filename, input_format)
+        # Đóng generator ngay (kể cả khi lỗi giữa chừng) trong lúc tệp tải lên còn mở
+        with closing(bulk.iter_chunks(bulk.open_upload(file.file, file.filename), fmt, chunk_size)) as chunks:
+            with endpoint_stage('scoring'):
+                prioritized, n_rows = model.prioritize_collections_stream(chunks, top_n=top_n)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Error reading upload: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+    
+    try:
+        with endpoint_stage('serialization'):
+            return with_model_version(json_response({
+                "prioritized_accounts": frame_to_records(prioritized),
+                "total_accounts": n_rows,
+                "model_version": model.version
+            }, pre_encoded=pre_encode_responses), response, model.version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.post("/score-by-id/{model_name}/",
+          description="Chấm điểm khách hàng theo danh sách ID, dữ liệu lấy từ feature store",
+          response_description="Kết quả chấm điểm của các khách hàng tìm thấy và danh sách ID không tìm thấy")
+@instrumented
+def score_by_ids(model_name: str, data: CustomerIDList, response: Response):
+    """
+    Chấm điểm khách hàng theo ID
+    
+    Đặc trưng được lấy trực tiếp từ feature store (tra chỉ mục customer_id và gom
+    các dòng từ các cột memory-map), không đọc lại tệp CSV. Mỗi kết quả gồm
+    customer_id, probability, log_odds, credit_score và risk_tier.
+    
+    **Ví dụ Request:**
+    ```json
+    {
+        "customer_ids": ["CUS000123", "CUS000124", "CUS000125"]
+    }
+    ```
+    """
+    admission.check_batch_size(len(data.customer_ids))
+    if model_name not in MODEL_TYPES:
+        raise HTTPException(status_code=404, detail=f"Không có mô hình: {model_name}")
+    if model_name not in feature_stores:
+        raise HTTPException(status_code=503, detail=f"Feature store {model_name} chưa sẵn sàng")
+    
+    try:
+        model = get_model(model_name)
+        feature_names = list(model.model.feature_names)
+        with endpoint_stage('feature_lookup'):
+            customer_df, not_found = feature_stores[model_name].refresh().lookup(data.customer_ids, feature_names)
+        
+        with endpoint_stage('scoring'):
+            scored = bulk.score_chunk(model, customer_df, feature_names, use_cache=True) if len(customer_df) else None
+        with endpoint_stage('serialization'):
+            results = frame_to_records(scored) if scored is not None else []
+        
+        return with_model_version(json_response({
+            "results": results,
+            "not_found": not_found,
+            "model_version": model.version
+        }, pre_encoded=pre_encode_responses), response, model.version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.post("/columnar/{model_name}/",
+          description="Chấm điểm một lô dữ liệu dạng cột, kiểm tra ràng buộc bằng numpy",
+          response_description="Kết quả chấm điểm dạng cột và lỗi theo từng dòng")
+@instrumented
+def columnar_score(model_name: str, data: ColumnarBatchRequest, response: Response):
+    """
+    Chấm điểm hàng loạt với dữ liệu dạng cột
+    
+    Mỗi đặc trưng là một mảng; ràng buộc của ApplicationData, BehaviorData, ...
+    được kiểm tra trên cả cột thay vì dựng một đối tượng pydantic cho mỗi khách
+    hàng, và ma trận giá trị được đưa thẳng vào mô hình (không qua DataFrame).
+    Với on_error=reject (mặc định), request có dòng lỗi bị trả 422 kèm lỗi của
+    từng dòng; với on_error=skip, các dòng lỗi bị bỏ qua và liệt kê trong errors.
+    
+    **Ví dụ Request:**
+    ```json
+    {
+        "customer_ids": ["CUS000123", "CUS000124"],
+        "columns": {
+            "age": [35, 42],
+            "income": [50000, 60000],
+            "employment_length": [5.5, 8.0],
+            "debt_to_income": [0.25, 0.15],
+            "credit_history_length": [7, 12],
+            "number_of_debts": [2, 1],
+            "number_of_delinquent_debts": [0, 0],
+            "homeowner": [1, 1]
+        }
+    }
+    ```
+    """
+    n_rows = max((len(values) for values in data.columns.values()), default=0)
+    admission.check_batch_size(n_rows)
+    if model_name not in MODEL_TYPES:
+        raise HTTPException(status_code=404, detail=f"Không có mô hình: {model_name}")
+    if data.customer_ids is not None and len(data.customer_ids) != n_rows:
+        raise HTTPException(status_code=422, detail=[columnar.error(
+            'customer_ids', None, f'cần {n_rows} ID, nhận được {len(data.customer_ids)}',
+            'value_error.length_mismatch')])
+    
+    model = get_model(model_name)
+    with endpoint_stage('columnar_validate'):
+        try:
+            matrix, valid, errors, n_errors = columnar.validate_columns(
+                data.columns, SCHEMAS[model_name], list(model.model.feature_names),
+                max_errors=columnar_config.get('max_errors', columnar.DEFAULT_MAX_ERRORS))
+        except columnar.ColumnarValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors)
+    if n_errors and data.on_error == 'reject':
+        raise HTTPException(status_code=422, detail=errors)
+    
+    try:
+        rows = np.flatnonzero(valid)
+        with endpoint_stage('scoring'):
+            scoring = model.score_matrix(matrix[rows] if n_errors else matrix)
+        
+        with endpoint_stage('serialization'):
+            customer_ids = data.customer_ids
+            if customer_ids is not None and n_errors:
+                customer_ids = [customer_ids[i] for i in rows.tolist()]
+            payload = {
+                "rows": rows.tolist(),
+                "customer_ids": customer_ids,
+                "probability": scoring.probability.astype(np.float64).tolist(),
+                "log_odds": scoring.log_odds.tolist(),
+                "credit_score": scoring.score.tolist(),
+                "risk_tier": scoring.tier.tolist(),
+                "errors": errors,
+                "n_errors": n_errors,
+                "model_version": model.version
+            }
+            return with_model_version(json_response(payload, pre_encoded=pre_encode_responses),
+                                      response, model.version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+@app.get("/batching/stats",
+         description="Thống kê micro-batching của từng mô hình",
+         response_description="Độ sâu hàng đợi, kích thước lô và thời gian chờ")
+def get_batching_stats():
+    """
+    Thống kê micro-batching: độ sâu hàng đợi, kích thước lô và thời gian chờ
+    """
+    return {name: batcher.stats() for name, batcher in batchers.items()}
+
+@app.get("/admission/stats",
+         description="Thống kê kiểm soát nạp",
+         response_description="Giới hạn, số yêu cầu đang xử lý, đang chờ và bị từ chối theo nhóm endpoint")
+def get_admission_stats():
+    """
+    Giới hạn và trạng thái kiểm soát nạp theo nhóm endpoint (của tiến trình worker hiện tại)
+    """
+    return admission.stats()
+
+@app.get("/cache/stats",
+         description="Thống kê bộ nhớ đệm dự đoán",
+         response_description="Kích thước, hit/miss, eviction và hết hạn")
+def get_cache_stats():
+    """
+    Thống kê bộ nhớ đệm dự đoán (bật trong mục api.prediction_cache của config.yaml)
+    """
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+def collect_serving_metrics():
+    """
+    Metric của micro-batcher, bộ nhớ đệm và phiên bản mô hình cho /metrics
+    """
+    batcher_stats = {name: batcher.stats() for name, batcher in batchers.items()}
+    metrics = [
+        ('scoring_batcher_queue_depth', 'gauge', 'Số dòng đang chờ ghép lô',
+         [({'model': name}, stats['queue_depth']) for name, stats in batcher_stats.items()]),
+        ('scoring_batcher_requests_total', 'counter', 'Số yêu cầu gửi tới micro-batcher',
+         [({'model': name}, stats['requests']) for name, stats in batcher_stats.items()]),
+        ('scoring_batcher_batches_total', 'counter', 'Số lô đã chấm điểm',
+         [({'model': name}, stats['batches']) for name, stats in batcher_stats.items()]),
+        ('scoring_batcher_rows_total', 'counter', 'Số dòng đã chấm điểm qua micro-batcher',
+         [({'model': name}, stats['rows']) for name, stats in batcher_stats.items()]),
+        ('model_info', 'gauge', 'Phiên bản mô hình đang phục vụ',
+         [({'model': name, 'version': str(get_model(name).version)}, 1) for name in MODEL_TYPES]),
+    ]
+    if prediction_cache is not None:
+        cache_stats = prediction_cache.stats()
+        metrics += [
+            ('prediction_cache_size', 'gauge', 'Số phần tử trong bộ nhớ đệm dự đoán', [({}, cache_stats['size'])]),
+        ] + [
+            (f'prediction_cache_{name}_total', 'counter', f'Bộ đếm {name} của bộ nhớ đệm dự đoán',
+             [({}, cache_stats[name])])
+            for name in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+        ]
+    return metrics
+
+instrumentation.add_collector(collect_serving_metrics)
+instrumentation.add_collector(admission.collect_metrics)
+
+@app.get("/metrics",
+         description="Metric ở định dạng text của Prometheus",
+         response_description="Histogram thời gian theo giai đoạn, micro-batching, bộ nhớ đệm và phiên bản mô hình")
+def get_metrics():
+    """
+    Metric cho Prometheus: histogram thời gian theo giai đoạn của từng endpoint
+    (parse_validate, frame_build, scoring, domain, serialization, response_encode)
+    và từng mô hình (dtype_coercion, woe_transform, booster_predict,
+    woe_lookup, inplace_predict), cùng số liệu micro-batching và bộ nhớ đệm
+    """
+    return Response(content=instrumentation.render_prometheus(),
+                    media_type='text/plain; version=0.0.4')
+
+@app.on_event("startup")
+def start_registry_watch():
+    # Theo dõi manifest để mọi tiến trình API cùng chuyển sang phiên bản mới
+    registry.watch(api_config.get('registry', {}).get('poll_interval_s', 5.0))
+
+@app.get("/models/",
+         description="Phiên bản đang phục vụ, phiên bản trước và các phiên bản có sẵn của từng mô hình",
+         response_description="Trạng thái registry của từng mô hình")
+def list_models():
+    """
+    Trạng thái registry: phiên bản đang phục vụ, phiên bản trước (để rollback),
+    phiên bản đang tải và các phiên bản có sẵn
+    """
+    return {name: registry.status()[model_type] for name, model_type in MODEL_TYPES.items()}
+
+@app.post("/models/{model_name}/activate",
+          description="Tải phiên bản mới ở luồng nền, chạy thử rồi hoán đổi vào phục vụ",
+          response_description="Trạng thái chuyển phiên bản")
+def activate_model(model_name: str,
+                   version: str = Query(..., description="Phiên bản cần phục vụ"),
+                   wait: bool = Query(False, description="Chờ tải xong mới trả về")):
+    """
+    Chuyển sang phục vụ một phiên bản
+
+    Các yêu cầu đang xử lý vẫn dùng phiên bản cũ tới khi hoàn tất; phiên bản cũ
+    được giữ trong bộ nhớ để rollback tức thì.
+
+    **Ví dụ:**
+    ```bash
+    curl -X POST "http://localhost:8000/models/application/activate?version=20250101-120000"
+    ```
+    """
+    if model_name not in MODEL_TYPES:
+        raise HTTPException(status_code=404, detail=f"Không có mô hình: {model_name}")
+    try:
+        status = registry.activate(MODEL_TYPES[model_name], version, background=not wait)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error activating model: {str(e)}")
+
+    return {"model": model_name, "version": version, "status": status}
+
+@app.post("/models/{model_name}/rollback",
+          description="Quay lại phiên bản trước (đang nằm sẵn trong bộ nhớ)",
+          response_description="Phiên bản đang phục vụ sau khi rollback")
+def rollback_model(model_name: str):
+    """
+    Quay lại phiên bản phục vụ trước đó
+    """
+    if model_name not in MODEL_TYPES:
+        raise HTTPException(status_code=404, detail=f"Không có mô hình: {model_name}")
+    try:
+        version = registry.rollback(MODEL_TYPES[model_name])
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return {"model": model_name, "version": version, "status": "swapped"}
+
 # Hàm hỗ trợ để lấy dữ liệu khách hàng từ ID
 def get_customer_data_by_ids(customer_ids, data_type):
     """
@@ -780,26 +1467,12 @@ def get_customer_data_by_ids(customer_ids, data_type):
     DataFrame
         Dữ liệu của các khách hàng
     """
-    # Xác định đường dẫn file dữ liệu dựa trên loại
-    base_path = Path(__file__).parents[1] / 'data'
-    
-    if data_type == "application":
-        file_path = base_path / 'processed' / 'processed_application_data.csv'
-    elif data_type == "behavior":
-        file_path = base_path / 'processed' / 'processed_behavior_data.csv'
-    elif data_type == "collections":
-        file_path = base_path / 'processed' / 'processed_collections_data.csv'
-    elif data_type == "desertion":
-        file_path = base_path / 'processed' / 'processed_desertion_data.csv'
-    else:
+    if data_type not in MODEL_TYPES:
         raise ValueError(f"Không hỗ trợ loại dữ liệu: {data_type}")
     
     try:
-        # Đọc dữ liệu
-        df = pd.read_csv(file_path)
-        
-        # Lọc theo ID khách hàng
-        filtered_df = df[df['customer_id'].isin(customer_ids)]
+        # Tra chỉ mục của feature store thay vì đọc lại toàn bộ tệp CSV
+        filtered_df, _ = feature_stores[data_type].refresh().lookup(customer_ids)
         
         return filtered_df
     except Exception as e:
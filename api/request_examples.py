@@ -81,3 +81,33 @@ DESERTION_EXAMPLE = [
         "monthly_average_balance": 12000
     }
 ]
+
+# Ví dụ cho hồ sơ khách hàng 360 (bản ghi gộp đặc trưng của các mô hình)
+CUSTOMER_360_EXAMPLE = {
+    "customer_id": "CUS000456",
+    "age": 42,
+    "current_balance": 3500,
+    "average_monthly_payment": 850,
+    "payment_ratio": 0.65,
+    "number_of_late_payments": 1,
+    "months_since_last_late_payment": 8,
+    "number_of_credit_inquiries": 2,
+    "current_limit": 10000,
+    "average_utilization": 0.35,
+    "days_past_due": 45,
+    "outstanding_amount": 2500,
+    "number_of_contacts": 3,
+    "previous_late_payments": 2,
+    "promised_payment_amount": 500,
+    "broken_promises": 1,
+    "months_on_book": 24,
+    "last_payment_amount": 300,
+    "months_to_maturity": 3,
+    "total_relationship_value": 75000,
+    "number_of_products": 2,
+    "satisfaction_score": 6.5,
+    "number_of_complaints": 1,
+    "months_since_last_interaction": 2,
+    "tenure_months": 36,
+    "monthly_average_balance": 8500
+}
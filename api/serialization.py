@@ -0,0 +1,80 @@
+import json
+
+import pandas as pd
+from fastapi.responses import Response
+
+# orjson là tùy chọn: nhanh hơn json chuẩn nhiều lần khi mã hóa danh sách lớn
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def column_to_python(series):
+    """
+    Chuyển một cột thành mảng object chứa kiểu Python thuần (int, float, str, None)
+
+    Chuyển đổi được thực hiện một lần cho cả cột: numpy int/float thành int/float
+    của Python, categorical thành giá trị gốc, NaN/NaT thành None.
+
+    Cột số nguyên được mã hóa thành số nguyên JSON (107, không phải 107.0), giống
+    vòng lặp iterrows cũ: các DataFrame kết quả luôn có cột chuỗi (customer_id,
+    hành động đề xuất) nên iterrows trả về int của Python và float() không được gọi.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(object)
+
+    values = series.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    if missing.any():
+        values[missing] = None
+    return values
+
+def frame_to_records(df):
+    """
+    Chuyển DataFrame thành danh sách dict sẵn sàng mã hóa JSON
+
+    Parameters:
+    -----------
+    df : DataFrame
+        Kết quả cần trả về
+
+    Returns:
+    --------
+    list
+        Mỗi phần tử là một dict {tên cột: giá trị Python}
+    """
+    if len(df) == 0:
+        return []
+
+    columns = [str(col) for col in df.columns]
+    arrays = [column_to_python(df.iloc[:, i]) for i in range(df.shape[1])]
+    return [dict(zip(columns, row)) for row in zip(*arrays)]
+
+def dumps(payload):
+    """
+    Mã hóa payload thành bytes JSON (dùng orjson nếu có)
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+def json_response(payload, pre_encoded=True):
+    """
+    Trả payload về cho FastAPI
+
+    Parameters:
+    -----------
+    payload : dict
+        Nội dung đã ở dạng kiểu Python thuần (xem frame_to_records)
+    pre_encoded : bool
+        Nếu True, mã hóa sẵn thành bytes để bỏ qua bước jsonable_encoder
+        (duyệt từng giá trị) của FastAPI
+
+    Returns:
+    --------
+    Response hoặc dict
+    """
+    if pre_encoded:
+        return Response(content=dumps(payload), media_type='application/json')
+    return payload
@@ -0,0 +1,158 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+
+import yaml
+
+# Thêm thư mục gốc vào path
+sys.path.append(str(Path(__file__).parents[1]))
+
+def load_server_config():
+    """
+    Đọc mục api.server trong config.yaml
+    """
+    with open(Path(__file__).parents[1] / 'config.yaml', 'r') as file:
+        return ((yaml.safe_load(file) or {}).get('api', {}) or {}).get('server', {}) or {}
+
+def bind_socket(host, port, backlog=2048):
+    """
+    Mở socket lắng nghe trong tiến trình master để mọi worker dùng chung
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(app, sock, log_level='info'):
+    """
+    Chạy một uvicorn server trên socket đã mở sẵn
+    """
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level)
+    uvicorn.Server(config).run(sockets=[sock])
+
+def serve(host='0.0.0.0', port=8000, workers=1, threads_per_worker=1, backlog=2048, log_level='info'):
+    """
+    Phục vụ API theo mô hình pre-fork
+
+    Tiến trình master mở socket, import api.main (tải bốn mô hình, bảng WOE và
+    đường dự đoán nhanh) đúng một lần, đóng băng heap bằng gc.freeze() rồi fork
+    các worker. Worker dùng chung các cấu trúc chỉ đọc này theo cơ chế
+    copy-on-write nên không phải import lại thư viện hay đọc lại mô hình, và bộ
+    nhớ không tăng theo số worker. Worker bị dừng bất thường sẽ được khởi động lại.
+
+    Parameters:
+    -----------
+    host : str
+        Địa chỉ lắng nghe
+    port : int
+        Cổng lắng nghe
+    workers : int
+        Số tiến trình worker (0 = số lõi CPU)
+    threads_per_worker : int
+        Số luồng OpenMP của XGBoost trong mỗi worker
+    backlog : int
+        Độ dài hàng đợi kết nối của socket
+    log_level : str
+        Mức log của uvicorn
+    """
+    workers = workers or os.cpu_count() or 1
+
+    # Giới hạn OpenMP trước khi import xgboost: vừa tránh tranh chấp lõi giữa
+    # các worker, vừa tránh dùng thread pool OpenMP đã khởi tạo trước khi fork
+    os.environ.setdefault('OMP_NUM_THREADS', str(threads_per_worker))
+
+    sock = bind_socket(host, port, backlog)
+
+    started = time.perf_counter()
+    from api.main import app, registry
+    # Áp dụng cho cả các phiên bản mà worker tải và hoán đổi sau này qua registry
+    registry.set_nthread(threads_per_worker)
+    print(f"Models loaded in master in {time.perf_counter() - started:.2f}s")
+
+    if workers == 1:
+        run_worker(app, sock, log_level)
+        return
+
+    # Chuyển mọi đối tượng hiện có sang thế hệ vĩnh viễn để GC của worker không
+    # ghi vào header của chúng (làm mất chia sẻ copy-on-write)
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn(worker_id):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                run_worker(app, sock, log_level)
+            except BaseException:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        children[pid] = worker_id
+        print(f"Started worker {worker_id} (pid {pid})")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    for worker_id in range(workers):
+        spawn(worker_id)
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        worker_id = children.pop(pid, None)
+        if worker_id is not None and not stopping:
+            print(f"Worker {worker_id} (pid {pid}) exited with status {status}, restarting")
+            time.sleep(1)
+            spawn(worker_id)
+
+    sock.close()
+
+def main():
+    server_config = load_server_config()
+
+    parser = argparse.ArgumentParser(description='Credit Scoring API (pre-fork)')
+    parser.add_argument('--host', type=str, default=server_config.get('host', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=server_config.get('port', 8000))
+    parser.add_argument('--workers', type=int, default=server_config.get('workers', 1),
+                        help='Số tiến trình worker (0 = số lõi CPU)')
+    parser.add_argument('--threads-per-worker', type=int, default=server_config.get('threads_per_worker', 1),
+                        help='Số luồng OpenMP của XGBoost trong mỗi worker')
+    parser.add_argument('--backlog', type=int, default=server_config.get('backlog', 2048))
+    parser.add_argument('--log-level', type=str, default=server_config.get('log_level', 'info'))
+    args = parser.parse_args()
+
+    serve(host=args.host, port=args.port, workers=args.workers,
+          threads_per_worker=args.threads_per_worker, backlog=args.backlog,
+          log_level=args.log_level)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Tiện ích dùng chung cho các script benchmark
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Thêm thư mục gốc vào path
+sys.path.append(str(Path(__file__).parents[1]))
+
+from src.data.sample_generator import (
+    generate_application_data,
+    generate_behavior_data,
+    generate_collections_data,
+    generate_desertion_data
+)
+
+# Tên ngắn của mô hình -> (đường dẫn lớp, hàm sinh dữ liệu, cột mục tiêu)
+MODEL_SPECS = {
+    'application': ('src.models.application_scorecard.ApplicationScorecard',
+                    generate_application_data, 'default_flag'),
+    'behavior': ('src.models.behavior_scorecard.BehaviorScorecard',
+                 generate_behavior_data, 'default_flag'),
+    'collections': ('src.models.collections_scoring.CollectionsScoring',
+                    generate_collections_data, 'further_delinquency'),
+    'desertion': ('src.models.desertion_scoring.DesertionScoring',
+                  generate_desertion_data, 'desertion_flag'),
+}
+
+def load_model(name):
+    """
+    Khởi tạo và tải mô hình đã huấn luyện theo tên ngắn
+    """
+    import importlib
+    
+    class_path = MODEL_SPECS[name][0]
+    module_name, class_name = class_path.rsplit('.', 1)
+    model = getattr(importlib.import_module(module_name), class_name)()
+    model.load_model()
+    return model
+
+def generate_frame(name, n_samples):
+    """
+    Sinh dữ liệu mẫu (có customer_id, không có cột mục tiêu) theo phân phối của sample_generator
+    """
+    _, generator, target = MODEL_SPECS[name]
+    data = generator(n_samples=n_samples)
+    return data.drop(columns=[target]).reset_index(drop=True)
+
+def timed_calls(func, inputs, warmup=20):
+    """
+    Gọi func cho từng phần tử của inputs và trả về mảng độ trễ (giây)
+    """
+    for item in inputs[:warmup]:
+        func(item)
+    
+    latencies = np.empty(len(inputs))
+    for i, item in enumerate(inputs):
+        start = time.perf_counter()
+        func(item)
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+def summarize_latencies(latencies):
+    """
+    Tóm tắt phân phối độ trễ (mili giây)
+    """
+    latencies_ms = np.asarray(latencies) * 1000
+    return {
+        'count': int(len(latencies_ms)),
+        'mean_ms': float(latencies_ms.mean()),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'max_ms': float(latencies_ms.max()),
+    }
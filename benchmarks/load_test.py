@@ -0,0 +1,455 @@
+"""
+Đo thông lượng và độ trễ của API chấm điểm ở nhiều mức đồng thời và kích thước lô
+
+Payload được sinh theo phân phối của src/data/sample_generator.py cho cả bốn
+mô hình. Có hai chế độ:
+  - inprocess: gọi thẳng ứng dụng ASGI (api.main.app) trong cùng tiến trình,
+    không qua mạng, để đo riêng chi phí của ứng dụng
+  - http: gửi request HTTP tới server đang chạy (--url) hoặc tự khởi động
+    api.server (--spawn-server) với số worker cho trước
+
+Kết quả (thông lượng, p50/p95/p99, CPU và RSS của từng tiến trình) được in ra
+và ghi vào file JSON kèm commit git để so sánh giữa các lần chạy.
+
+Ví dụ:
+    python -m benchmarks.load_test --mode inprocess --models application collections \\
+        --concurrency 1 8 --batch-sizes 1 100 --duration 10
+    python -m benchmarks.load_test --mode http --spawn-server --workers 2 --concurrency 16
+    python -m benchmarks.load_test --compare results/benchmarks/a.json results/benchmarks/b.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.common import MODEL_SPECS, generate_frame, summarize_latencies
+from api.serialization import dumps, frame_to_records
+
+ROOT_DIR = Path(__file__).parents[1]
+DEFAULT_OUTPUT_DIR = ROOT_DIR / 'results' / 'benchmarks'
+
+# Endpoint một khách hàng (body là list nếu True) và endpoint theo lô của từng mô hình
+SINGLE_ENDPOINTS = {
+    'application': ('/application-score/', False),
+    'behavior': ('/behavior-score/', False),
+    'collections': ('/collections-prioritize/', True),
+    'desertion': ('/desertion-strategy/', True),
+}
+BATCH_ENDPOINTS = {
+    'application': '/batch/application-score/',
+    'behavior': '/batch/behavior-score/',
+    'collections': '/batch/collections-prioritize/',
+    'desertion': '/batch/desertion-strategy/',
+}
+
+# ----------------------------------------------------------------------
+# Payload
+# ----------------------------------------------------------------------
+def build_payloads(name, batch_size, n_payloads, seed=0):
+    """
+    Sinh sẵn các body JSON (bytes) cho một mô hình và kích thước lô
+
+    Parameters:
+    -----------
+    name : str
+        Tên ngắn của mô hình
+    batch_size : int
+        Số khách hàng mỗi request (1 = endpoint một khách hàng)
+    n_payloads : int
+        Số body khác nhau (request lần lượt dùng vòng tròn các body này)
+    seed : int
+        Hạt giống chọn ngẫu nhiên khách hàng
+
+    Returns:
+    --------
+    tuple
+        (đường dẫn endpoint, danh sách body bytes)
+    """
+    pool_size = max(batch_size * min(n_payloads, 50), 1000)
+    records = frame_to_records(generate_frame(name, pool_size))
+    rng = np.random.default_rng(seed)
+
+    if batch_size == 1:
+        path, as_list = SINGLE_ENDPOINTS[name]
+    else:
+        path, as_list = BATCH_ENDPOINTS[name], False
+
+    bodies = []
+    for _ in range(n_payloads):
+        rows = [records[i] for i in rng.integers(0, len(records), batch_size)]
+        if batch_size == 1:
+            payload = rows if as_list else rows[0]
+        else:
+            payload = {'customers': rows}
+        bodies.append(dumps(payload))
+    return path, bodies
+
+# ----------------------------------------------------------------------
+# CPU và bộ nhớ của tiến trình (đọc /proc trên Linux)
+# ----------------------------------------------------------------------
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+def process_tree(pid):
+    """
+    Tiến trình pid và các tiến trình con trực tiếp (các worker của api.server)
+    """
+    pids = [pid]
+    task_dir = Path(f'/proc/{pid}/task')
+    if task_dir.exists():
+        for task in task_dir.iterdir():
+            try:
+                pids.extend(int(child) for child in (task / 'children').read_text().split())
+            except OSError:
+                pass
+    return pids
+
+def process_usage(pid):
+    """
+    Thời gian CPU (giây), RSS hiện tại và RSS đỉnh (MB) của một tiến trình
+
+    Returns:
+    --------
+    dict hoặc None
+        None nếu không đọc được (tiến trình đã dừng hoặc không có /proc)
+    """
+    try:
+        stat = Path(f'/proc/{pid}/stat').read_text()
+        status = Path(f'/proc/{pid}/status').read_text()
+    except OSError:
+        return None
+
+    # Bỏ qua phần "(tên tiến trình)" vì tên có thể chứa khoảng trắng
+    fields = stat[stat.rindex(')') + 2:].split()
+    memory = {}
+    for line in status.splitlines():
+        key, _, value = line.partition(':')
+        if key in ('VmRSS', 'VmHWM'):
+            memory[key] = int(value.split()[0]) / 1024
+    return {
+        'cpu_seconds': (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+        'rss_mb': memory.get('VmRSS'),
+        'peak_rss_mb': memory.get('VmHWM'),
+    }
+
+def usage_snapshot(pids):
+    return {pid: usage for pid in pids if (usage := process_usage(pid)) is not None}
+
+def usage_delta(before, after, wall_seconds):
+    """
+    CPU (% một lõi) và RSS của từng tiến trình trong khoảng đo
+    """
+    processes = []
+    for pid, end in after.items():
+        start = before.get(pid, {'cpu_seconds': 0.0})
+        cpu_seconds = end['cpu_seconds'] - start['cpu_seconds']
+        processes.append({
+            'pid': pid,
+            'cpu_seconds': cpu_seconds,
+            'cpu_percent': 100.0 * cpu_seconds / wall_seconds if wall_seconds else 0.0,
+            'rss_mb': end['rss_mb'],
+            'peak_rss_mb': end['peak_rss_mb'],
+        })
+    return processes
+
+# ----------------------------------------------------------------------
+# Chạy tải
+# ----------------------------------------------------------------------
+async def run_load(client, path, bodies, concurrency, duration, max_requests):
+    """
+    Gửi request với concurrency luồng song song tới khi hết thời gian hoặc đủ số request
+
+    Returns:
+    --------
+    tuple
+        (mảng độ trễ giây, dict số request theo mã trạng thái, thời gian chạy giây)
+    """
+    headers = {'content-type': 'application/json'}
+    latencies = []
+    statuses = {}
+    counter = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal counter
+        while time.perf_counter() < deadline and (not max_requests or counter < max_requests):
+            body = bodies[counter % len(bodies)]
+            counter += 1
+            start = time.perf_counter()
+            try:
+                response = await client.post(path, content=body, headers=headers)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return np.array(latencies), statuses, time.perf_counter() - started
+
+async def run_scenarios(client, scenarios, args, server_pids):
+    """
+    Chạy lần lượt các kịch bản (mô hình, kích thước lô, mức đồng thời)
+    """
+    results = []
+    for name, batch_size, concurrency in scenarios:
+        path, bodies = build_payloads(name, batch_size, args.payloads, seed=args.seed)
+
+        # Chạy nóng: nạp bộ nhớ đệm của booster, thread pool và kết nối
+        await run_load(client, path, bodies, concurrency, args.warmup, 0)
+
+        pids = process_tree(server_pids[0]) if server_pids else []
+        pids = sorted(set(pids) | {os.getpid()})
+        before = usage_snapshot(pids)
+        latencies, statuses, wall_seconds = await run_load(
+            client, path, bodies, concurrency, args.duration, args.max_requests
+        )
+        after = usage_snapshot(pids)
+
+        n_ok = statuses.get('200', 0)
+        result = {
+            'model': name,
+            'endpoint': path,
+            'batch_size': batch_size,
+            'concurrency': concurrency,
+            'wall_seconds': wall_seconds,
+            'requests': int(len(latencies)),
+            'statuses': statuses,
+            'error_rate': 1.0 - n_ok / len(latencies) if len(latencies) else 0.0,
+            'throughput_rps': len(latencies) / wall_seconds if wall_seconds else 0.0,
+            'throughput_rows_per_s': n_ok * batch_size / wall_seconds if wall_seconds else 0.0,
+            'latency': summarize_latencies(latencies) if len(latencies) else None,
+            'processes': [
+                dict(p, role=process_role(p['pid'], server_pids))
+                for p in usage_delta(before, after, wall_seconds)
+            ],
+        }
+        results.append(result)
+        print_result(result)
+    return results
+
+def process_role(pid, server_pids):
+    """
+    Vai trò của tiến trình: client (benchmark), server, hoặc inprocess khi cả hai là một
+    """
+    if not server_pids:
+        return 'inprocess'
+    return 'client' if pid == os.getpid() else 'server'
+
+def print_result(result):
+    latency = result['latency'] or {}
+    # CPU (% một lõi) và RSS cộng dồn của các tiến trình phục vụ request
+    serving = [p for p in result['processes'] if p['role'] != 'client']
+    cpu = sum(p['cpu_percent'] for p in serving)
+    rss = sum(p['rss_mb'] or 0 for p in serving)
+    print(f"{result['model']:<12}{result['batch_size']:>6}{result['concurrency']:>6}"
+          f"{result['throughput_rps']:>10.1f}{result['throughput_rows_per_s']:>12.1f}"
+          f"{latency.get('p50_ms', float('nan')):>9.2f}{latency.get('p95_ms', float('nan')):>9.2f}"
+          f"{latency.get('p99_ms', float('nan')):>9.2f}{result['error_rate'] * 100:>7.1f}"
+          f"{cpu:>8.0f}{rss:>9.0f}")
+
+def print_header():
+    print(f"{'Mô hình':<12}{'Lô':>6}{'Đ.thời':>6}{'req/s':>10}{'dòng/s':>12}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'lỗi %':>7}{'CPU %':>8}{'RSS MB':>9}")
+
+# ----------------------------------------------------------------------
+# Server HTTP
+# ----------------------------------------------------------------------
+def spawn_server(port, workers, threads_per_worker, startup_timeout=300):
+    """
+    Khởi động api.server ở tiến trình con và chờ tới khi nhận request
+    """
+    command = [sys.executable, '-m', 'api.server', '--host', '127.0.0.1', '--port', str(port),
+               '--workers', str(workers), '--threads-per-worker', str(threads_per_worker),
+               '--log-level', 'warning']
+    process = subprocess.Popen(command, cwd=ROOT_DIR)
+
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"api.server đã dừng với mã {process.returncode}")
+        try:
+            if httpx.get(f'{url}/models/', timeout=1.0).status_code == 200:
+                # Chờ mọi worker sẵn sàng (mỗi worker nhận request sau khi fork xong)
+                time.sleep(1.0)
+                return process, url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    stop_server(process)
+    raise RuntimeError("api.server không sẵn sàng trong thời gian chờ")
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+# ----------------------------------------------------------------------
+# Kết quả
+# ----------------------------------------------------------------------
+def git_info():
+    """
+    Commit hiện tại và trạng thái thư mục làm việc (để so sánh giữa các commit)
+    """
+    def git(*command):
+        try:
+            return subprocess.run(['git', *command], cwd=ROOT_DIR, capture_output=True,
+                                  text=True, timeout=30).stdout.strip()
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+def compare(baseline_path, candidate_path):
+    """
+    So sánh hai file kết quả theo từng kịch bản (mô hình, lô, mức đồng thời)
+
+    Chế độ (inprocess/http) là của cả file, không nằm trong khóa kịch bản; hai
+    file khác chế độ vẫn được so sánh nhưng kèm cảnh báo.
+    """
+    def load(path):
+        with open(path, 'r') as f:
+            report = json.load(f)
+        return report, {(r['model'], r['batch_size'], r['concurrency']): r for r in report['results']}
+
+    baseline, baseline_results = load(baseline_path)
+    candidate, candidate_results = load(candidate_path)
+    print(f"Gốc:     {baseline['git']['commit']} ({baseline['config']['mode']})")
+    print(f"So sánh: {candidate['git']['commit']} ({candidate['config']['mode']})")
+    if baseline['config']['mode'] != candidate['config']['mode']:
+        print("Cảnh báo: hai file đo ở chế độ khác nhau, chênh lệch gồm cả chi phí HTTP")
+    print(f"{'Mô hình':<12}{'Lô':>6}{'Đ.thời':>6}{'req/s':>22}{'p50 ms':>20}{'p99 ms':>20}")
+
+    def cell(old, new, fmt):
+        change = (new / old - 1) * 100 if old else float('nan')
+        return f"{old:{fmt}}→{new:{fmt}} ({change:+.0f}%)"
+
+    for key in sorted(set(baseline_results) & set(candidate_results)):
+        old, new = baseline_results[key], candidate_results[key]
+        if not old['latency'] or not new['latency']:
+            continue
+        print(f"{key[0]:<12}{key[1]:>6}{key[2]:>6}"
+              f"{cell(old['throughput_rps'], new['throughput_rps'], '.0f'):>22}"
+              f"{cell(old['latency']['p50_ms'], new['latency']['p50_ms'], '.2f'):>20}"
+              f"{cell(old['latency']['p99_ms'], new['latency']['p99_ms'], '.2f'):>20}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark thông lượng và độ trễ của API')
+    parser.add_argument('--mode', default='inprocess', choices=['inprocess', 'http'],
+                        help='inprocess: gọi thẳng ứng dụng ASGI; http: qua HTTP cục bộ')
+    parser.add_argument('--models', nargs='+', default=list(MODEL_SPECS), choices=list(MODEL_SPECS))
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 100],
+                        help='Số khách hàng mỗi request (1 = endpoint một khách hàng)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8],
+                        help='Số request gửi song song')
+    parser.add_argument('--duration', type=float, default=10.0, help='Thời gian đo mỗi kịch bản (giây)')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Thời gian chạy nóng mỗi kịch bản (giây)')
+    parser.add_argument('--max-requests', type=int, default=0, help='Số request tối đa mỗi kịch bản (0 = không giới hạn)')
+    parser.add_argument('--payloads', type=int, default=200, help='Số body khác nhau mỗi kịch bản')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', type=str, default=None, help='Địa chỉ server đang chạy (chế độ http)')
+    parser.add_argument('--server-pid', type=int, default=None,
+                        help='PID tiến trình master của server đang chạy, để đo CPU/RSS')
+    parser.add_argument('--spawn-server', action='store_true', help='Tự khởi động api.server (chế độ http)')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--workers', type=int, default=1, help='Số worker của server tự khởi động')
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--output', type=str, default=None,
+                        help='File JSON kết quả (mặc định results/benchmarks/load_test_<thời gian>_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help='So sánh hai file kết quả thay vì chạy benchmark')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scenarios = [(name, batch_size, concurrency)
+                 for name in args.models for batch_size in args.batch_sizes for concurrency in args.concurrency]
+
+    server_process = None
+    server_pids = []
+    if args.mode == 'inprocess':
+        from api.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://benchmark',
+                                   timeout=None)
+    else:
+        if args.spawn_server:
+            server_process, url = spawn_server(args.port, args.workers, args.threads_per_worker)
+            server_pids = [server_process.pid]
+        elif args.url:
+            url = args.url
+            server_pids = [args.server_pid] if args.server_pid else []
+        else:
+            parser.error('chế độ http cần --url hoặc --spawn-server')
+        max_connections = max(args.concurrency)
+        client = httpx.AsyncClient(base_url=url, timeout=60.0,
+                                   limits=httpx.Limits(max_connections=max_connections,
+                                                       max_keepalive_connections=max_connections))
+
+    async def run():
+        async with client:
+            return await run_scenarios(client, scenarios, args, server_pids)
+
+    print_header()
+    try:
+        results = asyncio.run(run())
+    finally:
+        if server_process is not None:
+            stop_server(server_process)
+
+    git = git_info()
+    report = {
+        'benchmark': 'load_test',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'git': git,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'mode': args.mode,
+            'url': None if args.mode == 'inprocess' else url,
+            'workers': args.workers if args.spawn_server else None,
+            'threads_per_worker': args.threads_per_worker if args.spawn_server else None,
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'max_requests': args.max_requests,
+            'payloads': args.payloads,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        output_path = Path(args.output)
+    else:
+        commit = (git['commit'] or 'nogit')[:8]
+        output_path = DEFAULT_OUTPUT_DIR / f"load_test_{datetime.now():%Y%m%d-%H%M%S}_{commit}.json"
+    os.makedirs(output_path.parent, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Đã lưu kết quả vào {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+So sánh thời gian chuyển kết quả DataFrame thành JSON theo số dòng:
+vòng lặp iterrows cũ + jsonable_encoder của FastAPI so với frame_to_records + mã hóa sẵn
+
+Ví dụ:
+    python -m benchmarks.serialization --rows 100 1000 10000 50000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.common import generate_frame, load_model
+from api.serialization import ORJSON_AVAILABLE, dumps, frame_to_records
+
+def legacy_records(df):
+    """
+    Cách chuyển đổi cũ của api/main.py: duyệt từng dòng và kiểm tra kiểu từng giá trị
+    """
+    result = []
+    for idx, row in df.iterrows():
+        row_dict = {}
+        for col, val in row.items():
+            if isinstance(val, (np.floating, np.integer)):
+                row_dict[col] = float(val)
+            else:
+                row_dict[col] = val
+        result.append(row_dict)
+    return result
+
+def best_of(func, repeat):
+    """
+    Thời gian nhỏ nhất (giây) trong repeat lần chạy
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chuyển kết quả thành JSON')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    model = load_model('collections')
+    frame = generate_frame('collections', max(args.rows))
+    prioritized = model.prioritize_collections(frame.drop(columns=['customer_id']), top_n=len(frame))
+    prioritized['customer_id'] = frame['customer_id']
+    
+    print(f"orjson: {'có' if ORJSON_AVAILABLE else 'không'}")
+    # Hai cách chuyển đổi phải cho cùng JSON (số nguyên vẫn là số nguyên)
+    sample = prioritized.head(min(args.rows))
+    print(f"JSON giống cách cũ: {'có' if dumps(frame_to_records(sample)) == dumps(legacy_records(sample)) else 'không'}")
+    print(f"{'Số dòng':>10}{'iterrows+encoder (ms)':>24}{'records (ms)':>15}{'records+bytes (ms)':>21}{'tăng tốc':>10}")
+    for n_rows in args.rows:
+        df = prioritized.head(n_rows)
+        
+        legacy = best_of(lambda: json.dumps(jsonable_encoder({'prioritized_accounts': legacy_records(df)})),
+                         args.repeat)
+        records = best_of(lambda: frame_to_records(df), args.repeat)
+        encoded = best_of(lambda: dumps({'prioritized_accounts': frame_to_records(df)}), args.repeat)
+        
+        print(f"{n_rows:>10}{legacy * 1000:>24.2f}{records * 1000:>15.2f}{encoded * 1000:>21.2f}"
+              f"{legacy / encoded:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+So sánh độ trễ dự đoán một khách hàng giữa predict (pandas + DMatrix) và predict_one
+
+Ví dụ:
+    python -m benchmarks.single_row_latency --model application --n 2000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import MODEL_SPECS, generate_frame, load_model, timed_calls, summarize_latencies
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark độ trễ dự đoán một dòng')
+    parser.add_argument('--model', default='application', choices=list(MODEL_SPECS))
+    parser.add_argument('--n', type=int, default=2000, help='Số lượt dự đoán')
+    args = parser.parse_args()
+    
+    model = load_model(args.model)
+    model.compile_fast_path()
+    
+    frame = generate_frame(args.model, args.n)
+    records = frame.to_dict('records')
+    feature_names = model.model.feature_names
+    arrays = [np.asarray([r[name] for name in feature_names], dtype=np.float32) for r in records]
+    
+    # Kiểm tra hai đường cho cùng kết quả trước khi đo
+    reference = model.predict(frame.head(50))
+    fast = np.array([model.predict_one(r) for r in records[:50]])
+    max_diff = float(np.abs(reference - fast).max())
+    
+    results = {
+        'predict (DataFrame 1 dòng)': timed_calls(lambda r: model.predict(pd.DataFrame([r])), records),
+        'predict_one (dict)': timed_calls(model.predict_one, records),
+        'predict_one (mảng float)': timed_calls(model.predict_one, arrays),
+    }
+    
+    print(f"Mô hình: {model.model_type}, số lượt: {args.n}, sai khác tối đa: {max_diff:.2e}")
+    print(f"{'Đường dự đoán':<30}{'p50 (ms)':>10}{'p99 (ms)':>10}{'mean (ms)':>11}")
+    for name, latencies in results.items():
+        stats = summarize_latencies(latencies)
+        print(f"{name:<30}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['mean_ms']:>11.3f}")
+
+if __name__ == "__main__":
+    main()
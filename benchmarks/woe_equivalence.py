@@ -0,0 +1,178 @@
+"""
+Kiểm tra bảng tra WOE đã biên dịch cho kết quả giống OptimalBinning.transform(metric='woe')
+và so sánh thời gian chuyển đổi
+
+Dữ liệu kiểm tra gồm giá trị thiếu, giá trị nằm ngoài khoảng khi fit, category chưa
+gặp và giá trị đặc biệt (special_codes). Mã bin uint8 (transform_codes) phải khôi phục
+đúng ma trận WOE. Artifact JSON/.npy (save_artifact) được tải lại,
+có và không memory-map, và phải cho ma trận WOE giống hệt; thời gian tải được so với
+pickle. Thoát với mã lỗi 1 nếu có cột lệch quá --tol.
+
+Ví dụ:
+    python -m benchmarks.woe_equivalence --rows 50000 --features 32
+"""
+import argparse
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from optbinning import OptimalBinning
+
+from benchmarks.woe_fit import generate_wide_frame
+from src.features.woe_iv import WoeIvTransformer, WoeLookupTable
+
+def perturb(X, seed=0):
+    """
+    Thêm giá trị thiếu, giá trị ngoài khoảng và category chưa gặp vào dữ liệu kiểm tra
+    """
+    rng = np.random.default_rng(seed)
+    X = X.copy()
+    n_rows = len(X)
+    for column in X.columns:
+        rows = rng.choice(n_rows, size=max(n_rows // 50, 1), replace=False)
+        if pd.api.types.is_numeric_dtype(X[column]):
+            values = X[column].to_numpy(dtype=np.float64).copy()
+            values[rows[::2]] = np.nan
+            values[rows[1::4]] = values.max() * 10
+            values[rows[3::4]] = values.min() - 10
+            X[column] = values
+        else:
+            values = X[column].to_numpy(dtype=object).copy()
+            values[rows[::2]] = None
+            values[rows[1::2]] = 'UNSEEN'
+            X[column] = values
+    return X
+
+def time_call(func, repeat=20):
+    """
+    Thời gian nhỏ nhất (giây) của func qua nhiều lần gọi
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+COLD_LOAD_SCRIPT = """
+import sys, time
+import numpy, pandas
+start = time.perf_counter()
+from src.features.woe_iv import WoeIvTransformer
+{statement}
+print(time.perf_counter() - start, 'optbinning' in sys.modules)
+"""
+
+def cold_load(statement):
+    """
+    Thời gian tải (giây) trong một tiến trình Python mới, tính cả import, và
+    optbinning có bị import hay không
+    """
+    output = subprocess.run([sys.executable, '-c', COLD_LOAD_SCRIPT.format(statement=statement)],
+                            cwd=Path(__file__).parents[1], capture_output=True, text=True, check=True).stdout
+    elapsed, imported = output.split()[-2:]
+    return float(elapsed), imported == 'True'
+
+def max_difference(a, b):
+    return float(np.max(np.abs(np.asarray(a, dtype=np.float64) - np.asarray(b, dtype=np.float64)), initial=0.0))
+
+def main():
+    parser = argparse.ArgumentParser(description='Kiểm tra bảng tra WOE đã biên dịch so với OptimalBinning')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--tol', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    X, y = generate_wide_frame(args.rows, args.features)
+    transformer = WoeIvTransformer().fit(X, y, prescreen=False)
+    X_test = perturb(X)
+
+    failures = []
+    print(f"{'Cột':<10}{'Kiểu':<13}{'Số bin':>7}{'lệch float64':>15}{'lệch float32':>15}")
+    matrix = transformer.transform_matrix(X_test, list(X_test.columns))
+    for i, (column, binning) in enumerate(transformer.binnings.items()):
+        expected = binning.transform(X_test[column].to_numpy(), metric='woe')
+        compiled = transformer.lookup_tables[column].lookup_array(X_test[column].to_numpy())
+        diff64 = max_difference(expected, compiled)
+        # Ma trận float32 cho XGBoost: sai số chỉ do làm tròn float32
+        diff32 = max_difference(np.float32(expected), matrix[:, i])
+        print(f"{column:<10}{binning.dtype:<13}{len(binning.splits) + 1:>7}{diff64:>15.2e}{diff32:>15.2e}")
+        if diff64 > args.tol or diff32 > 0:
+            failures.append(column)
+
+    # Giá trị đặc biệt: OptimalBinning fit với special_codes rồi biên dịch
+    rng = np.random.default_rng(1)
+    values = X.iloc[:, 0].to_numpy(dtype=np.float64).copy()
+    values[rng.choice(len(values), size=len(values) // 20, replace=False)] = -999.0
+    special_binning = OptimalBinning(name='special', dtype='numerical', special_codes=[-999.0],
+                                     max_n_bins=transformer.max_bins, min_bin_size=transformer.min_bin_size)
+    special_binning.fit(values, y)
+    test_values = np.concatenate([values, [np.nan, -999.0]])
+    diff = max_difference(special_binning.transform(test_values, metric='woe'),
+                          WoeLookupTable.from_binning(special_binning).lookup_array(test_values))
+    special_table = WoeLookupTable.from_binning(special_binning)
+    diff_codes = max_difference(special_table.code_woe[special_table.lookup_codes(test_values)],
+                                special_table.lookup_array(test_values))
+    print(f"{'special':<10}{'numerical':<13}{len(special_binning.splits) + 1:>7}{diff:>15.2e}")
+    if diff > args.tol or diff_codes > 0:
+        failures.append('special')
+
+    # Mã bin uint8: khôi phục WOE từ mã phải cho đúng ma trận float32
+    dataset = transformer.transform_codes(X_test, list(X_test.columns))
+    if not np.array_equal(dataset.to_woe(), matrix):
+        failures.append('bin codes')
+    print(f"\nMã bin: {dataset.nbytes / 1024:.0f} KB, ma trận WOE float32: {matrix.nbytes / 1024:.0f} KB, "
+          f"DataFrame WOE: {transformer.transform(X_test).memory_usage(deep=True).sum() / 1024:.0f} KB")
+
+    # Thời gian: OptimalBinning.transform từng cột (cách cũ) so với bảng tra đã biên dịch
+    start = time.perf_counter()
+    for column, binning in transformer.binnings.items():
+        binning.transform(X_test[column], metric='woe')
+    optbinning_time = time.perf_counter() - start
+    start = time.perf_counter()
+    transformer.transform_matrix(X_test, list(X_test.columns))
+    compiled_time = time.perf_counter() - start
+    codes_time = time_call(lambda: transformer.transform_codes(X_test, list(X_test.columns)), repeat=5)
+    print(f"OptimalBinning.transform: {optbinning_time * 1000:.1f} ms, "
+          f"bảng tra đã biên dịch: {compiled_time * 1000:.1f} ms ({optbinning_time / compiled_time:.1f}x), "
+          f"mã bin: {codes_time * 1000:.1f} ms")
+
+    # Artifact JSON/.npy: tải lại phải cho đúng ma trận WOE; so thời gian tải với pickle
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pickle_path = Path(tmp_dir) / 'woe_transformer.pkl'
+        artifact_path = Path(tmp_dir) / 'woe.json'
+        transformer.save(pickle_path)
+        transformer.save_artifact(artifact_path)
+        for mmap in (False, True):
+            loaded = WoeIvTransformer.load_artifact(artifact_path, mmap=mmap)
+            if not np.array_equal(loaded.transform_matrix(X_test, list(X_test.columns)), matrix):
+                failures.append(f'artifact(mmap={mmap})')
+            if not loaded.get_iv_table().equals(transformer.get_iv_table()):
+                failures.append(f'artifact IV (mmap={mmap})')
+        pickle_time = time_call(lambda: WoeIvTransformer.load(pickle_path))
+        artifact_time = time_call(lambda: WoeIvTransformer.load_artifact(artifact_path))
+        mmap_time = time_call(lambda: WoeIvTransformer.load_artifact(artifact_path, mmap=True))
+        cold_pickle = cold_load(f"WoeIvTransformer.load({str(pickle_path)!r})")
+        cold_artifact = cold_load(f"WoeIvTransformer.load_artifact({str(artifact_path)!r}, mmap=True)")
+        sizes = {path.suffix: path.stat().st_size for path in Path(tmp_dir).iterdir()}
+    print(f"\n{'Tải':<18}{'kích thước':>12}{'đã import':>12}{'tiến trình mới':>16}{'optbinning':>12}")
+    print(f"{'pickle':<18}{sizes['.pkl'] / 1024:>10.0f}KB{pickle_time * 1000:>10.2f}ms"
+          f"{cold_pickle[0] * 1000:>14.0f}ms{'có' if cold_pickle[1] else 'không':>12}")
+    print(f"{'artifact':<18}{(sizes['.json'] + sizes['.npy']) / 1024:>10.0f}KB{artifact_time * 1000:>10.2f}ms"
+          f"{cold_artifact[0] * 1000:>14.0f}ms{'có' if cold_artifact[1] else 'không':>12}")
+    print(f"{'artifact (mmap)':<18}{'':>12}{mmap_time * 1000:>10.2f}ms")
+    if cold_artifact[1]:
+        failures.append('artifact import optbinning')
+
+    if failures:
+        print(f"LỆCH: {failures}")
+        sys.exit(1)
+    print("Bảng tra đã biên dịch và artifact khớp với OptimalBinning")
+
+if __name__ == "__main__":
+    main()
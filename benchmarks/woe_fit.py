@@ -0,0 +1,70 @@
+"""
+Thời gian WoeIvTransformer.fit theo số tiến trình trên một tập dữ liệu rộng sinh ngẫu nhiên,
+kèm kiểm tra bảng IV giống hệt chế độ tuần tự
+
+Ví dụ:
+    python -m benchmarks.woe_fit --rows 50000 --features 64 --jobs 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import benchmarks.common  # noqa: F401  (thêm thư mục gốc vào path)
+from src.features.woe_iv import WoeIvTransformer
+
+def generate_wide_frame(n_rows, n_features, categorical_ratio=0.1, seed=42):
+    """
+    Sinh dữ liệu rộng: các biến số có phân phối khác nhau, một phần biến phân loại
+    và mục tiêu nhị phân phụ thuộc (phi tuyến) vào một nửa số biến
+    """
+    rng = np.random.default_rng(seed)
+    n_categorical = int(n_features * categorical_ratio)
+    columns = {}
+    logit = np.full(n_rows, -2.0)
+    for i in range(n_features - n_categorical):
+        kind = i % 3
+        if kind == 0:
+            values = rng.normal(size=n_rows)
+        elif kind == 1:
+            values = rng.lognormal(mean=8, sigma=1, size=n_rows)
+        else:
+            values = rng.poisson(lam=3, size=n_rows).astype(float)
+        columns[f'num_{i:03d}'] = values
+        if i % 2 == 0:
+            standardized = (values - values.mean()) / (values.std() + 1e-9)
+            logit += rng.uniform(0.1, 0.5) * np.tanh(standardized)
+    for i in range(n_categorical):
+        values = rng.choice(list('ABCDEFGH'), size=n_rows)
+        columns[f'cat_{i:03d}'] = values
+        logit += (values == 'A') * 0.4
+    target = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(int)
+    return pd.DataFrame(columns), pd.Series(target, name='target')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fit WOE song song theo cột')
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--features', type=int, default=64)
+    parser.add_argument('--jobs', type=int, nargs='+', default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    X, y = generate_wide_frame(args.rows, args.features)
+    print(f"{args.rows} dòng x {args.features} biến, {os.cpu_count()} lõi CPU")
+    print(f"{'Tiến trình':>10}{'Thời gian (s)':>15}{'tăng tốc':>10}{'IV giống tuần tự':>18}")
+
+    baseline_time, baseline_iv = None, None
+    for n_jobs in args.jobs:
+        start = time.perf_counter()
+        transformer = WoeIvTransformer().fit(X, y, n_jobs=n_jobs, prescreen=False)
+        elapsed = time.perf_counter() - start
+
+        iv_table = transformer.get_iv_table()
+        if baseline_time is None:
+            baseline_time, baseline_iv = elapsed, iv_table
+        print(f"{n_jobs:>10}{elapsed:>15.2f}{baseline_time / elapsed:>9.2f}x"
+              f"{'có' if iv_table.equals(baseline_iv) else 'KHÔNG':>18}")
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,59 @@ import argparse
 import os
 from pathlib import Path
 
+def publish_model(model, metrics):
+    """
+    Lưu mô hình vừa huấn luyện thành phiên bản mới trong registry (models/<model_type>/<version>/)
+    """
+    from src.models.registry import ModelRegistry
+    version = ModelRegistry().publish(model, metrics=metrics)
+    print(f"Đã lưu phiên bản {version} của {model.model_type}")
+
+def api_command(workers=None):
+    """
+    Lệnh khởi động API (pre-fork: mô hình được tải một lần rồi chia sẻ cho các worker)
+    """
+    command = ["python", "-m", "api.server"]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+    return command
+
+def web_command(proxy_mode):
+    """
+    Lệnh khởi động Web UI và biến môi trường chọn cách proxy tới API
+    """
+    env = dict(os.environ)
+    env['WEB_PROXY_MODE'] = proxy_mode
+    return ["python", "web/app.py"], env
+
+def default_proxy_mode():
+    """
+    web.proxy.mode trong config.yaml (mặc định http)
+    """
+    import yaml
+    with open(Path(__file__).parent / 'config.yaml', 'r') as file:
+        web_config = (yaml.safe_load(file) or {}).get('web', {}) or {}
+    return os.environ.get('WEB_PROXY_MODE', (web_config.get('proxy', {}) or {}).get('mode', 'http'))
+
 def main():
     parser = argparse.ArgumentParser(description='Credit Scoring và Scorecard System')
     parser.add_argument('--action', type=str, required=True,
-                        choices=['preprocess', 'train', 'scorecard', 'all', 'api', 'generate_data', 'web', 'server'],
+                        choices=['preprocess', 'train', 'scorecard', 'all', 'api', 'generate_data', 'web', 'server',
+                                 'feature_store', 'campaign', 'optimize_limits', 'convert_artifacts'],
                         help='Hành động cần thực hiện')
     parser.add_argument('--model', type=str, default='all',
                         choices=['application', 'behavior', 'collections', 'desertion', 'all'],
                         help='Loại mô hình để huấn luyện hoặc tạo scorecard')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Số tiến trình worker của API hoặc của các tác vụ campaign/optimize_limits '
+                             '(0 = số lõi CPU ở mọi hành động; mặc định theo config.yaml)')
+    parser.add_argument('--proxy-mode', type=str, default=None, choices=['http', 'inprocess'],
+                        help='Cách Web UI gọi API: http (qua cổng 8000) hoặc inprocess (chạy mô hình ngay trong '
+                             'tiến trình Web UI, không khởi động API riêng); mặc định theo web.proxy.mode trong config.yaml')
     
     args = parser.parse_args()
+    if args.action in ('web', 'server') and args.proxy_mode is None:
+        args.proxy_mode = default_proxy_mode()
     
     # Tạo thư mục cần thiết
     needed_dirs = [
@@ -47,6 +90,61 @@ def main():
             print(f"Lỗi khi tiền xử lý dữ liệu: {e}")
             print("Gợi ý: Hãy chạy 'python run.py --action generate_data' trước để tạo dữ liệu mẫu")
     
+    if args.action == 'feature_store':
+        try:
+            print("Cập nhật feature store...")
+            from src.data.feature_store import FeatureStore, DATA_FILES
+            data_types = list(DATA_FILES) if args.model == 'all' else [args.model]
+            for data_type in data_types:
+                store = FeatureStore(data_type)
+                frame, source = store.read_processed()
+                snapshot_id = store.append_snapshot(frame, source=source)
+                print(f"{data_type}: đã ghi snapshot {snapshot_id} ({len(frame)} dòng)")
+        except Exception as e:
+            print(f"Lỗi khi cập nhật feature store: {e}")
+    
+    if args.action == 'campaign':
+        try:
+            print("Chạy chiến dịch giữ chân khách hàng sắp đáo hạn...")
+            from src.models.retention_campaign import load_campaign_config, run_campaign
+            config = load_campaign_config()
+            summary = run_campaign(
+                Path(__file__).parent / config.get('input', 'data/raw/desertion_data.csv'),
+                chunk_size=config.get('chunk_size', 100000),
+                workers=args.workers if args.workers is not None else config.get('workers'),
+                max_months_to_maturity=config.get('max_months_to_maturity')
+            )
+            print(f"Đã chọn {summary['rows_selected']}/{summary['rows_read']} khách hàng, "
+                  f"theo hạng {summary['tiers']} ({summary['elapsed_s']} giây)")
+        except Exception as e:
+            print(f"Lỗi khi chạy chiến dịch giữ chân: {e}")
+    
+    if args.action == 'optimize_limits':
+        try:
+            print("Tối ưu hạn mức tín dụng toàn danh mục...")
+            from src.models.limit_optimizer import DEFAULT_PARAMS, load_optimizer_config, optimize_portfolio
+            config = load_optimizer_config()
+            summary = optimize_portfolio(
+                Path(__file__).parent / config.get('input', 'data/raw/behavior_data.csv'),
+                chunk_size=config.get('chunk_size', 100000),
+                workers=args.workers if args.workers is not None else config.get('workers'),
+                params={name: config[name] for name in DEFAULT_PARAMS if name in config}
+            )
+            print(f"{summary['accounts']} tài khoản, hành động {summary['actions']}, "
+                  f"biên lợi nhuận kỳ vọng {summary['current']['expected_margin']:.0f} -> "
+                  f"{summary['recommended']['expected_margin']:.0f} ({summary['elapsed_s']} giây)")
+        except Exception as e:
+            print(f"Lỗi khi tối ưu hạn mức: {e}")
+    
+    if args.action == 'convert_artifacts':
+        try:
+            print("Chuyển artifact .pkl của mô hình sang JSON/.npy...")
+            from src.models.convert_artifacts import convert_all
+            written = convert_all()
+            print(f"Đã ghi {len(written)} tệp")
+        except Exception as e:
+            print(f"Lỗi khi chuyển đổi artifact: {e}")
+    
     if args.action == 'train' or args.action == 'all':
         print("Bắt đầu huấn luyện mô hình...")
         
@@ -57,6 +155,7 @@ def main():
                 app_model = ApplicationScorecard()
                 app_metrics = app_model.process_and_train()
                 print(f"Metrics: {app_metrics}")
+                publish_model(app_model, app_metrics)
             except Exception as e:
                 print(f"Lỗi khi huấn luyện Application Scorecard: {e}")
             
@@ -67,6 +166,7 @@ def main():
                 behavior_model = BehaviorScorecard()
                 behavior_metrics = behavior_model.process_and_train()
                 print(f"Metrics: {behavior_metrics}")
+                publish_model(behavior_model, behavior_metrics)
             except Exception as e:
                 print(f"Lỗi khi huấn luyện Behavior Scorecard: {e}")
             
@@ -77,6 +177,7 @@ def main():
                 collections_model = CollectionsScoring()
                 collections_metrics = collections_model.process_and_train()
                 print(f"Metrics: {collections_metrics}")
+                publish_model(collections_model, collections_metrics)
             except Exception as e:
                 print(f"Lỗi khi huấn luyện Collections Scoring: {e}")
             
@@ -87,6 +188,7 @@ def main():
                 desertion_model = DesertionScoring()
                 desertion_metrics = desertion_model.process_and_train()
                 print(f"Metrics: {desertion_metrics}")
+                publish_model(desertion_model, desertion_metrics)
             except Exception as e:
                 print(f"Lỗi khi huấn luyện Desertion Scoring: {e}")
             
@@ -178,7 +280,7 @@ def main():
     if args.action == 'api':
         print("Khởi động API...")
         import subprocess
-        subprocess.run(["python", "-m", "api.main"])
+        subprocess.run(api_command(args.workers))
 
     if args.action == 'web':
         print("Khởi động Web UI...")
@@ -191,7 +293,8 @@ def main():
                 print("Installing Flask...")
                 subprocess.run(["pip", "install", "flask"])
             # Start the web application
-            subprocess.run(["python", "web/app.py"])
+            command, env = web_command(args.proxy_mode)
+            subprocess.run(command, env=env)
         except Exception as e:
             print(f"Error starting web UI: {e}")
     
@@ -212,19 +315,24 @@ def main():
             # Function to start the API
             def start_api():
                 print("Khởi động API backend...")
-                subprocess.run(["python", "-m", "api.main"])
+                subprocess.run(api_command(args.workers))
             
             # Function to start the Web UI
             def start_web():
-                # Give API a moment to start
-                time.sleep(2)
                 print("Khởi động Web UI frontend...")
-                subprocess.run(["python", "web/app.py"])
+                command, env = web_command(args.proxy_mode)
+                subprocess.run(command, env=env)
             
-            # Start API in a separate thread
-            api_thread = threading.Thread(target=start_api)
-            api_thread.daemon = True
-            api_thread.start()
+            # Chế độ inprocess: Web UI tự tải mô hình và gọi thẳng ứng dụng FastAPI,
+            # không cần tiến trình API riêng và không qua thêm một bước HTTP
+            if args.proxy_mode != 'inprocess':
+                # Start API in a separate thread
+                api_thread = threading.Thread(target=start_api)
+                api_thread.daemon = True
+                api_thread.start()
+                
+                # Give API a moment to start
+                time.sleep(2)
             
             # Start Web UI in the main thread
             start_web()
@@ -14,10 +14,13 @@ setup(
         "fastapi>=0.68.0",
         "uvicorn>=0.15.0",
         "pydantic>=1.8.0",
+        "python-multipart>=0.0.5",
         "PyYAML>=6.0",
         "optbinning>=0.15.0",
         # SHAP là tùy chọn
         # "shap>=0.40.0",
+        # orjson là tùy chọn (mã hóa JSON nhanh cho response lớn)
+        # "orjson>=3.8.0",
     ],
     python_requires=">=3.8",
     author="Credit Scoring Team",
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+# Tên tệp dữ liệu của từng loại (giống DataPreprocessor)
+DATA_FILES = {
+    'application': 'application_data.csv',
+    'behavior': 'behavior_data.csv',
+    'collections': 'collections_data.csv',
+    'desertion': 'desertion_data.csv',
+}
+
+ID_COLUMN = 'customer_id'
+
+class FeatureStore:
+    """
+    Kho đặc trưng khách hàng dạng cột trên đĩa
+
+    Mỗi snapshot là một thư mục chứa một tệp .npy cho mỗi cột (kể cả customer_id),
+    được mở bằng memory-map nên không phải đọc cả tệp vào bộ nhớ. Khi tải, kho
+    dựng chỉ mục customer_id -> (snapshot, dòng); snapshot mới hơn ghi đè dữ liệu
+    của cùng customer_id trong snapshot cũ. Tra cứu một danh sách ID chỉ là một
+    lần tra chỉ mục và gom các dòng tương ứng của từng cột.
+
+    Cấu trúc thư mục: <feature_store_path>/<data_type>/manifest.json và
+    <feature_store_path>/<data_type>/snapshots/<snapshot_id>/<cột>.npy
+    """
+    def __init__(self, data_type, root_dir=None, config_path=None):
+        """
+        Parameters:
+        -----------
+        data_type : str
+            Loại dữ liệu ('application', 'behavior', 'collections', 'desertion')
+        root_dir : str, optional
+            Thư mục gốc của kho (mặc định data.feature_store_path trong config.yaml)
+        config_path : str, optional
+            Đường dẫn đến file cấu hình
+        """
+        if data_type not in DATA_FILES:
+            raise ValueError(f"Không hỗ trợ loại dữ liệu: {data_type}")
+
+        project_root = Path(__file__).parents[2]
+        if config_path is None:
+            config_path = project_root / 'config.yaml'
+        with open(config_path, 'r') as file:
+            self.config = yaml.safe_load(file)
+
+        if root_dir is None:
+            root_dir = project_root / self.config['data'].get('feature_store_path', 'data/feature_store/')
+        self.data_type = data_type
+        self.path = Path(root_dir) / data_type
+        self.project_root = project_root
+
+        self.columns = []
+        self._snapshots = []
+        self._dtypes = {}
+        self._index = pd.Index([])
+        self._snapshot_of = np.empty(0, dtype=np.int32)
+        self._row_of = np.empty(0, dtype=np.int64)
+        self._manifest_mtime = None
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+    @property
+    def manifest_path(self):
+        return self.path / 'manifest.json'
+
+    def exists(self):
+        return self.manifest_path.exists()
+
+    def read_manifest(self):
+        if not self.exists():
+            return {'data_type': self.data_type, 'columns': [], 'snapshots': []}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ------------------------------------------------------------------
+    # Ghi
+    # ------------------------------------------------------------------
+    def append_snapshot(self, frame, snapshot_id=None, source=None, replace=False):
+        """
+        Thêm một snapshot (ví dụ dữ liệu làm mới hằng ngày)
+
+        Parameters:
+        -----------
+        frame : DataFrame
+            Dữ liệu có cột customer_id và cùng các cột với kho (nếu kho đã có dữ liệu)
+        snapshot_id : str, optional
+            Tên snapshot (mặc định theo thời gian)
+        source : str, optional
+            Nguồn dữ liệu, ghi vào manifest
+        replace : bool
+            Thay thế mọi snapshot cũ trong manifest bằng snapshot này
+
+        Returns:
+        --------
+        str
+            Tên snapshot đã ghi
+        """
+        if ID_COLUMN not in frame.columns:
+            raise ValueError(f"Snapshot cần có cột {ID_COLUMN}")
+        if frame[ID_COLUMN].duplicated().any():
+            raise ValueError(f"Snapshot có {ID_COLUMN} trùng lặp")
+
+        manifest = self.read_manifest()
+        columns = [col for col in frame.columns if col != ID_COLUMN]
+        if manifest['columns'] and set(columns) != set(manifest['columns']):
+            raise ValueError(f"Cột của snapshot khác với kho: {sorted(set(columns) ^ set(manifest['columns']))}")
+        columns = manifest['columns'] or columns
+
+        existing = {entry['snapshot_id'] for entry in manifest['snapshots']}
+        if snapshot_id is None:
+            snapshot_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+            base, suffix = snapshot_id, 1
+            while snapshot_id in existing:
+                snapshot_id = f'{base}-{suffix}'
+                suffix += 1
+        elif snapshot_id in existing:
+            raise ValueError(f"Snapshot {snapshot_id} đã tồn tại")
+
+        snapshot_dir = self.path / 'snapshots' / snapshot_id
+        os.makedirs(snapshot_dir, exist_ok=True)
+        for col in [ID_COLUMN] + columns:
+            np.save(snapshot_dir / f'{col}.npy', self._column_array(frame[col], col == ID_COLUMN))
+
+        manifest['columns'] = columns
+        if replace:
+            manifest['snapshots'] = []
+        manifest['snapshots'].append({
+            'snapshot_id': snapshot_id,
+            'rows': int(len(frame)),
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'source': source
+        })
+        self._write_manifest(manifest)
+
+        if self._snapshots:
+            self.load()
+        return snapshot_id
+
+    @staticmethod
+    def _column_array(series, as_text=False):
+        """
+        Chuyển một cột thành mảng numpy kích thước cố định để memory-map được
+        """
+        if as_text or not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+            return series.astype(str).to_numpy(dtype=str)
+        return series.to_numpy()
+
+    def compact(self):
+        """
+        Gộp mọi snapshot thành một (chỉ giữ dữ liệu mới nhất của mỗi customer_id)
+        """
+        if not self._snapshots:
+            self.load()
+        old_snapshots = [entry['snapshot_id'] for entry in self.read_manifest()['snapshots']]
+        if len(old_snapshots) <= 1:
+            return old_snapshots[0] if old_snapshots else None
+
+        # Ghi snapshot mới trước, đổi manifest sau cùng rồi mới xóa snapshot cũ
+        frame, _ = self.lookup(self._index)
+        snapshot_id = self.append_snapshot(frame, source='compact', replace=True)
+
+        for old in old_snapshots:
+            shutil.rmtree(self.path / 'snapshots' / old, ignore_errors=True)
+        return snapshot_id
+
+    # ------------------------------------------------------------------
+    # Đọc
+    # ------------------------------------------------------------------
+    def load(self):
+        """
+        Memory-map các snapshot và dựng chỉ mục customer_id -> (snapshot, dòng)
+        """
+        manifest = self.read_manifest()
+        self.columns = manifest['columns']
+
+        snapshots = []
+        for entry in manifest['snapshots']:
+            snapshot_dir = self.path / 'snapshots' / entry['snapshot_id']
+            snapshots.append({col: np.load(snapshot_dir / f'{col}.npy', mmap_mode='r')
+                              for col in [ID_COLUMN] + self.columns})
+
+        if snapshots:
+            ids = np.concatenate([np.asarray(s[ID_COLUMN]) for s in snapshots])
+            sizes = [len(s[ID_COLUMN]) for s in snapshots]
+            snapshot_of = np.repeat(np.arange(len(snapshots), dtype=np.int32), sizes)
+            row_of = np.concatenate([np.arange(size, dtype=np.int64) for size in sizes])
+
+            # Snapshot sau ghi đè snapshot trước cho cùng customer_id
+            keep = ~pd.Index(ids).duplicated(keep='last')
+            self._index = pd.Index(ids[keep])
+            self._snapshot_of = snapshot_of[keep]
+            self._row_of = row_of[keep]
+        else:
+            self._index = pd.Index([])
+            self._snapshot_of = np.empty(0, dtype=np.int32)
+            self._row_of = np.empty(0, dtype=np.int64)
+
+        self._dtypes = {col: np.result_type(*[s[col].dtype for s in snapshots]) for col in self.columns} \
+            if snapshots else {}
+        self._snapshots = snapshots
+        self._manifest_mtime = self.manifest_path.stat().st_mtime if self.exists() else None
+        return self
+
+    def refresh(self):
+        """
+        Tải lại nếu manifest đã thay đổi (ví dụ tiến trình khác vừa thêm snapshot)
+        """
+        mtime = self.manifest_path.stat().st_mtime if self.exists() else None
+        if mtime != self._manifest_mtime:
+            self.load()
+        return self
+
+    def lookup(self, customer_ids, columns=None):
+        """
+        Lấy dữ liệu của các khách hàng theo ID
+
+        Parameters:
+        -----------
+        customer_ids : list
+            Danh sách ID khách hàng
+        columns : list, optional
+            Các cột cần lấy (mặc định tất cả)
+
+        Returns:
+        --------
+        tuple
+            (DataFrame có cột customer_id theo thứ tự yêu cầu, danh sách ID không tìm thấy)
+        """
+        columns = self.columns if columns is None else list(columns)
+        unknown = [col for col in columns if col not in self._dtypes]
+        if unknown:
+            raise KeyError(f"Kho {self.data_type} không có cột: {unknown}")
+
+        ids = np.asarray(customer_ids, dtype=str) if len(customer_ids) else np.empty(0, dtype=str)
+        positions = self._index.get_indexer(ids)
+        found = positions >= 0
+        positions = positions[found]
+        snapshot_of = self._snapshot_of[positions]
+        row_of = self._row_of[positions]
+
+        data = {ID_COLUMN: ids[found]}
+        if len(self._snapshots) == 1:
+            snapshot = self._snapshots[0]
+            for col in columns:
+                data[col] = snapshot[col][row_of]
+        else:
+            groups = [(s, snapshot_of == s) for s in np.unique(snapshot_of)]
+            for col in columns:
+                values = np.empty(len(positions), dtype=self._dtypes[col])
+                for s, mask in groups:
+                    values[mask] = self._snapshots[s][col][row_of[mask]]
+                data[col] = values
+
+        return pd.DataFrame(data), ids[~found].tolist()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, customer_id):
+        return customer_id in self._index
+
+    # ------------------------------------------------------------------
+    # Dựng từ data/processed
+    # ------------------------------------------------------------------
+    def read_processed(self):
+        """
+        Đọc dữ liệu đã tiền xử lý kèm customer_id
+
+        DataPreprocessor giữ customer_id làm khóa trong tệp đã xử lý. Tệp cũ không
+        có customer_id chỉ được ghép với customer_id của tệp thô theo vị trí khi
+        chắc chắn cùng thứ tự dòng: cùng số dòng và tiền xử lý không lấy mẫu
+        (data.max_samples); nếu không thì báo lỗi thay vì ghép sai khách hàng.
+        """
+        file_name = DATA_FILES[self.data_type]
+        processed_dir = self.project_root / self.config['data']['processed_data_path']
+        processed_path = processed_dir / f'processed_{file_name}'
+        if not processed_path.exists() and (processed_dir / f'processed_{file_name}.gz').exists():
+            processed_path = processed_dir / f'processed_{file_name}.gz'
+        frame = pd.read_csv(processed_path)
+
+        if ID_COLUMN not in frame.columns:
+            raw_path = self.project_root / self.config['data']['raw_data_path'] / file_name
+            raw_ids = pd.read_csv(raw_path, usecols=[ID_COLUMN])[ID_COLUMN]
+            max_samples = self.config['data'].get('max_samples')
+            if len(raw_ids) != len(frame) or (max_samples and len(raw_ids) > max_samples):
+                raise ValueError(f"{processed_path} không có {ID_COLUMN} và không chắc cùng thứ tự dòng với "
+                                 f"{raw_path}; chạy lại tiền xử lý (python run.py --action preprocess) "
+                                 f"để giữ {ID_COLUMN}")
+            frame.insert(0, ID_COLUMN, raw_ids.to_numpy())
+
+        try:
+            source = processed_path.relative_to(self.project_root)
+        except ValueError:
+            source = processed_path
+        return frame, str(source)
+
+def main():
+    parser = argparse.ArgumentParser(description='Quản lý feature store khách hàng')
+    parser.add_argument('command', choices=['build', 'append', 'compact', 'info'])
+    parser.add_argument('--data-type', default='all', choices=list(DATA_FILES) + ['all'])
+    parser.add_argument('--file', help='Tệp CSV snapshot cần thêm (cho lệnh append)')
+    args = parser.parse_args()
+
+    data_types = list(DATA_FILES) if args.data_type == 'all' else [args.data_type]
+    for data_type in data_types:
+        store = FeatureStore(data_type)
+        if args.command == 'build':
+            # Dựng lần đầu, hoặc thêm snapshot mới từ data/processed nếu kho đã có
+            frame, source = store.read_processed()
+            snapshot_id = store.append_snapshot(frame, source=source)
+            print(f"{data_type}: đã ghi snapshot {snapshot_id} ({len(frame)} dòng)")
+        elif args.command == 'append':
+            if not args.file:
+                parser.error('append cần --file')
+            frame = pd.read_csv(args.file)
+            snapshot_id = store.append_snapshot(frame, source=args.file)
+            print(f"{data_type}: đã ghi snapshot {snapshot_id} ({len(frame)} dòng)")
+        elif args.command == 'compact':
+            print(f"{data_type}: đã gộp thành snapshot {store.compact()}")
+        else:
+            store.load()
+            manifest = store.read_manifest()
+            print(f"{data_type}: {len(store)} khách hàng, {len(manifest['snapshots'])} snapshot, "
+                  f"cột {manifest['columns']}")
+
+if __name__ == "__main__":
+    main()
@@ -135,12 +135,19 @@ class DataPreprocessor:
         df = self.load_data(file_name)
         print(f"Dữ liệu gốc: {df.shape}")
         
+        # customer_id là khóa, không phải đặc trưng: tách ra trước khi xử lý và gắn
+        # lại vào dữ liệu đã xử lý (feature store ghép theo khóa này)
+        customer_ids = df.pop('customer_id').to_numpy() if 'customer_id' in df.columns else None
+        
         df = self.handle_missing_values(df)
         df = self.handle_outliers(df)
         df = self.encode_categorical(df)
         df = self.select_features(df, target_col)
         df = self.reduce_precision(df)
         
+        if customer_ids is not None:
+            df.insert(0, 'customer_id', customer_ids)
+        
         # Đảm bảo thư mục tồn tại trước khi lưu
         os.makedirs(Path(self.processed_data_path), exist_ok=True)
         
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+class BinCodedDataset:
+    """
+    Dữ liệu đã rời rạc hóa: ma trận mã bin uint8 và bảng WOE theo mã của từng đặc trưng
+
+    Mỗi đặc trưng chỉ có vài giá trị WOE (tối đa max_bins bin cùng các mã cho giá
+    trị thiếu/đặc biệt/category chưa gặp), nên lưu mã bin 1 byte thay cho WOE
+    float64 giảm bộ nhớ khoảng 8 lần. WOE chỉ được khôi phục (một phép gather mỗi
+    cột) khi cần, ví dụ từng lát dòng trước khi đưa vào XGBoost.
+    """
+    def __init__(self, codes, feature_names, code_woe, index=None):
+        """
+        Parameters:
+        -----------
+        codes : ndarray
+            Ma trận mã bin uint8 (số dòng, số đặc trưng), lưu theo cột (Fortran order)
+        feature_names : list
+            Tên đặc trưng theo thứ tự cột
+        code_woe : list
+            Mảng WOE theo mã của từng đặc trưng (code_woe[j][codes[i, j]] là WOE của ô i, j)
+        index : Index, optional
+            Chỉ mục dòng của DataFrame gốc
+        """
+        self.codes = np.asfortranarray(codes, dtype=np.uint8)
+        self.feature_names = list(feature_names)
+        self.code_woe = [np.asarray(woe, dtype=np.float64) for woe in code_woe]
+        self.index = index if index is not None else pd.RangeIndex(len(self.codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+    def take(self, rows):
+        """
+        Tập con theo vị trí dòng (mảng vị trí hoặc slice)
+        """
+        return BinCodedDataset(self.codes[rows], self.feature_names, self.code_woe, self.index[rows])
+
+    def select(self, feature_names):
+        """
+        Tập con theo tên đặc trưng (theo thứ tự feature_names)
+        """
+        positions = [self.feature_names.index(name) for name in feature_names]
+        return BinCodedDataset(self.codes[:, positions], feature_names,
+                               [self.code_woe[j] for j in positions], self.index)
+
+    def to_woe(self, rows=None, dtype=np.float32):
+        """
+        Khôi phục ma trận WOE (cho cả dữ liệu hoặc một lát dòng)
+
+        Parameters:
+        -----------
+        rows : slice, optional
+            Lát dòng cần khôi phục (mặc định tất cả)
+        dtype : numpy dtype
+            Kiểu của ma trận (mặc định float32 như XGBoost)
+
+        Returns:
+        --------
+        ndarray
+            Ma trận WOE (số dòng, số đặc trưng)
+        """
+        codes = self.codes if rows is None else self.codes[rows]
+        matrix = np.empty(codes.shape, dtype=dtype)
+        for j, woe in enumerate(self.code_woe):
+            matrix[:, j] = woe.astype(dtype, copy=False)[codes[:, j]]
+        return matrix
+
+    def iter_woe(self, batch_rows, dtype=np.float32):
+        """
+        Khôi phục WOE theo từng lát batch_rows dòng
+
+        Yields:
+        -------
+        tuple
+            (slice dòng, ma trận WOE của lát)
+        """
+        for start in range(0, len(self), batch_rows):
+            rows = slice(start, min(start + batch_rows, len(self)))
+            yield rows, self.to_woe(rows, dtype=dtype)
+
+    def to_frame(self):
+        """
+        DataFrame WOE float64 (cho các bước cần DataFrame như biểu đồ)
+        """
+        return pd.DataFrame(self.to_woe(dtype=np.float64), columns=self.feature_names, index=self.index)
@@ -0,0 +1,378 @@
+import math
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Số điểm tối đa giữ trong một QuantileSketch sau khi gộp
+DEFAULT_SKETCH_SIZE = 2048
+
+def weighted_quantiles(points, weights, levels):
+    """
+    Phân vị có trọng số của một tập điểm (nội suy tuyến tính theo trọng số tích lũy)
+    """
+    order = np.argsort(points, kind='stable')
+    points, weights = points[order], weights[order]
+    cumulative = (np.cumsum(weights) - weights / 2) / weights.sum()
+    return np.interp(levels, cumulative, points)
+
+def iv_terms(count, bad, total_bad, total_good, smoothing=0.5):
+    """
+    Phần đóng góp IV của từng bin; bin rỗng đóng góp 0, bin thiếu good hoặc bad
+    được cộng thêm smoothing vào cả hai để log hữu hạn
+    """
+    good = count - bad
+    pure = (count > 0) & ((good == 0) | (bad == 0))
+    good = np.where(pure, good + smoothing, good)
+    bad = np.where(pure, bad + smoothing, bad)
+    dist_bad = bad / max(total_bad, smoothing)
+    dist_good = good / max(total_good, smoothing)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = (dist_bad - dist_good) * np.log(dist_bad / dist_good)
+    return np.where(count > 0, terms, 0.0)
+
+def screen_iv(X, y, columns=None, n_bins=20):
+    """
+    IV xấp xỉ của mọi cột từ histogram cùng tần suất, tính vector hóa một lượt
+
+    Biến số được chia thành n_bins bin theo phân vị (np.nanquantile trên cả ma
+    trận), biến phân loại theo category; giá trị thiếu là một bin riêng. Mã bin
+    của mọi cột được dồn vào một np.bincount duy nhất, IV từng cột được cộng
+    bằng np.add.reduceat.
+
+    Parameters:
+    -----------
+    X : DataFrame
+        Dữ liệu đặc trưng
+    y : array-like
+        Cột mục tiêu (bad = 1, good = 0)
+    columns : list, optional
+        Các cột cần sàng lọc (mặc định mọi cột)
+    n_bins : int
+        Số bin cùng tần suất của biến số
+
+    Returns:
+    --------
+    DataFrame
+        Variable, IV (xấp xỉ), Bins (số bin khác rỗng), sắp xếp theo IV giảm dần
+    """
+    columns = list(X.columns if columns is None else columns)
+    y = np.asarray(y, dtype=np.float64)
+    numeric = [column for column in columns if pd.api.types.is_numeric_dtype(X[column])]
+    categorical = [column for column in columns if column not in numeric]
+
+    blocks, widths = [], []
+    if numeric:
+        values = X[numeric].to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        codes = np.zeros(values.shape, dtype=np.intp)
+        if len(values) and n_bins > 1:
+            with warnings.catch_warnings():
+                # Cột toàn giá trị thiếu: điểm chia NaN, mọi dòng vào bin thiếu
+                warnings.simplefilter('ignore', RuntimeWarning)
+                edges = np.nanquantile(values, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0)
+            # Mã bin = số điểm chia <= giá trị (giá trị bằng nhau luôn cùng bin)
+            for level_edges in edges:
+                codes += values >= level_edges
+        codes[missing] = n_bins
+        blocks.append(codes)
+        widths += [n_bins + 1] * len(numeric)
+    for column in categorical:
+        codes, categories = pd.factorize(X[column])
+        # Giá trị thiếu (mã -1) vào bin cuối
+        codes = np.where(codes < 0, len(categories), codes)
+        blocks.append(codes[:, None])
+        widths.append(len(categories) + 1)
+
+    ordered = numeric + categorical
+    if not ordered:
+        return pd.DataFrame({'Variable': [], 'IV': [], 'Bins': []})
+
+    offsets = np.concatenate([[0], np.cumsum(widths)[:-1]])
+    flat = (np.hstack(blocks) + offsets).ravel()
+    n_slots = int(np.sum(widths))
+    count = np.bincount(flat, minlength=n_slots).astype(np.float64)
+    bad = np.bincount(flat, weights=np.broadcast_to(y[:, None], (len(y), len(ordered))).ravel(),
+                      minlength=n_slots)
+
+    total_bad = y.sum()
+    terms = iv_terms(count, bad, total_bad, len(y) - total_bad)
+    report = pd.DataFrame({
+        'Variable': ordered,
+        'IV': np.add.reduceat(terms, offsets),
+        'Bins': np.add.reduceat((count > 0).astype(np.int64), offsets)
+    })
+    return report.sort_values('IV', ascending=False, kind='stable').reset_index(drop=True)
+
+class QuantileSketch:
+    """
+    Tóm tắt phân vị gộp được của một biến số
+
+    Mỗi chunk đóng góp các điểm phân vị của nó, mỗi điểm mang trọng số bằng số
+    giá trị nó đại diện; khi gộp vượt quá size điểm, tóm tắt được nén lại bằng
+    phân vị có trọng số nên bộ nhớ không phụ thuộc số chunk.
+    """
+    def __init__(self, size=DEFAULT_SKETCH_SIZE):
+        self.size = size
+        self.points = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+
+    def update(self, values):
+        """
+        Thêm các giá trị (đã bỏ giá trị thiếu) của một chunk
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return self
+        n_points = min(self.size, len(values))
+        other = QuantileSketch(self.size)
+        other.points = np.quantile(values, np.linspace(0, 1, n_points))
+        other.weights = np.full(n_points, len(values) / n_points)
+        return self.merge(other)
+
+    def merge(self, other):
+        self.points = np.concatenate([self.points, other.points])
+        self.weights = np.concatenate([self.weights, other.weights])
+        if len(self.points) > self.size:
+            total = self.weights.sum()
+            self.points = weighted_quantiles(self.points, self.weights, (np.arange(self.size) + 0.5) / self.size)
+            self.weights = np.full(self.size, total / self.size)
+        return self
+
+    def edges(self, n_prebins):
+        """
+        Điểm chia của n_prebins bin (gần) cùng tần suất
+        """
+        if not len(self.points):
+            return np.empty(0, dtype=np.float64)
+        return np.unique(weighted_quantiles(self.points, self.weights, np.linspace(0, 1, n_prebins + 1)[1:-1]))
+
+class NumericHistogram:
+    """
+    Số lượng, số bad và tổng giá trị theo từng bin mịn của một biến số (cộng được giữa các chunk)
+
+    Bin i gồm các giá trị trong [edges[i-1], edges[i]), giống WoeLookupTable.
+    """
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        n_bins = len(self.edges) + 1
+        self.count = np.zeros(n_bins)
+        self.bad = np.zeros(n_bins)
+        self.total = np.zeros(n_bins)
+        self.missing_count = 0.0
+        self.missing_bad = 0.0
+
+    def update(self, values, y):
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        self.missing_count += missing.sum()
+        self.missing_bad += y[missing].sum()
+
+        values, y = values[~missing], y[~missing]
+        bins = np.searchsorted(self.edges, values, side='right')
+        n_bins = len(self.count)
+        self.count += np.bincount(bins, minlength=n_bins)
+        self.bad += np.bincount(bins, weights=y, minlength=n_bins)
+        self.total += np.bincount(bins, weights=values, minlength=n_bins)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.bad += other.bad
+        self.total += other.total
+        self.missing_count += other.missing_count
+        self.missing_bad += other.missing_bad
+        return self
+
+    def iv(self):
+        """
+        IV xấp xỉ trên các bin mịn (giá trị thiếu là một bin)
+        """
+        count = np.append(self.count, self.missing_count)
+        bad = np.append(self.bad, self.missing_bad)
+        total_bad = bad.sum()
+        return float(iv_terms(count, bad, total_bad, count.sum() - total_bad).sum())
+
+    def n_bins(self):
+        return int(np.count_nonzero(self.count) + (self.missing_count > 0))
+
+    def weighted_sample(self):
+        """
+        Mẫu có trọng số tương đương: mỗi bin mịn là hai điểm (good, bad) tại giá trị
+        trung bình của bin, giá trị thiếu là NaN
+
+        Returns:
+        --------
+        tuple
+            (x, y, sample_weight) truyền cho OptimalBinning.fit
+        """
+        filled = self.count > 0
+        centers = self.total[filled] / self.count[filled]
+        good = self.count[filled] - self.bad[filled]
+        x = np.concatenate([centers, centers, [np.nan, np.nan]])
+        y = np.concatenate([np.zeros(len(centers)), np.ones(len(centers)), [0, 1]]).astype(int)
+        weight = np.concatenate([good, self.bad[filled], [self.missing_count - self.missing_bad, self.missing_bad]])
+        keep = weight > 0
+        return x[keep], y[keep], weight[keep]
+
+class CategoricalHistogram:
+    """
+    Số lượng và số bad theo từng category của một biến phân loại (cộng được giữa các chunk)
+    """
+    def __init__(self):
+        self.counts = pd.DataFrame({'count': [], 'bad': []}, dtype=np.float64)
+        self.missing_count = 0.0
+        self.missing_bad = 0.0
+
+    def update(self, values, y):
+        values = pd.Series(values, dtype=object)
+        missing = values.isna().to_numpy()
+        self.missing_count += missing.sum()
+        self.missing_bad += y[missing].sum()
+
+        counts = pd.DataFrame({'count': 1.0, 'bad': y[~missing]}, index=values[~missing].to_numpy())
+        return self.merge_counts(counts.groupby(level=0).sum())
+
+    def merge_counts(self, counts):
+        self.counts = self.counts.add(counts, fill_value=0) if len(self.counts) else counts
+        return self
+
+    def merge(self, other):
+        self.merge_counts(other.counts)
+        self.missing_count += other.missing_count
+        self.missing_bad += other.missing_bad
+        return self
+
+    def iv(self):
+        """
+        IV xấp xỉ theo category (giá trị thiếu là một bin)
+        """
+        count = np.append(self.counts['count'].to_numpy(), self.missing_count)
+        bad = np.append(self.counts['bad'].to_numpy(), self.missing_bad)
+        total_bad = bad.sum()
+        return float(iv_terms(count, bad, total_bad, count.sum() - total_bad).sum())
+
+    def n_bins(self):
+        return int(np.count_nonzero(self.counts['count'].to_numpy()) + (self.missing_count > 0))
+
+    def weighted_sample(self):
+        """
+        Mẫu có trọng số tương đương: mỗi category là một điểm good và một điểm bad
+        mang toàn bộ trọng số, giá trị thiếu là NaN
+
+        OptimalBinning sắp xếp category theo tỷ lệ bad không tính trọng số, nên
+        category thứ r (theo tỷ lệ bad có trọng số) được thêm các điểm trọng số 0
+        để tỷ lệ bad không trọng số của nó bằng phân số thứ r trong ordered_fractions:
+        thứ tự và kết quả binning giống hệt fit trên dữ liệu gốc. Mỗi category cần
+        khoảng căn bậc hai của số category điểm.
+        """
+        counts = self.counts[self.counts['count'] > 0]
+        count, bad = counts['count'].to_numpy(), counts['bad'].to_numpy()
+        order = np.argsort(bad / count, kind='stable')
+        categories = counts.index.to_numpy(dtype=object)[order]
+        count, bad = count[order], bad[order]
+
+        n_bad, n_points = ordered_fractions(len(categories))
+        n_good = n_points - n_bad
+        # Điểm đầu tiên của mỗi nhóm (category, nhãn) mang trọng số thật
+        bad_weight = np.zeros(n_bad.sum())
+        bad_weight[np.cumsum(n_bad) - n_bad] = bad
+        good_weight = np.zeros(n_good.sum())
+        good_weight[np.cumsum(n_good) - n_good] = count - bad
+
+        x = np.concatenate([np.repeat(categories, n_good), np.repeat(categories, n_bad),
+                            np.array([np.nan, np.nan], dtype=object)])
+        y = np.concatenate([np.zeros(len(good_weight)), np.ones(len(bad_weight)), [0, 1]])
+        weight = np.concatenate([good_weight, bad_weight, [self.missing_count - self.missing_bad, self.missing_bad]])
+        # Bỏ điểm thiếu rỗng; các điểm trọng số 0 của category được giữ để cố định thứ tự
+        keep = np.ones(len(x), dtype=bool)
+        keep[-2:] = weight[-2:] > 0
+        return x[keep], y[keep].astype(int), weight[keep]
+
+def ordered_fractions(n):
+    """
+    n phân số tối giản khác nhau trong (0, 1) có mẫu số nhỏ nhất, sắp xếp tăng dần
+
+    Returns:
+    --------
+    tuple
+        (tử số, mẫu số) dạng mảng số nguyên
+    """
+    numerators, denominators = [], []
+    denominator = 2
+    while len(numerators) < n:
+        for numerator in range(1, denominator):
+            if math.gcd(numerator, denominator) == 1:
+                numerators.append(numerator)
+                denominators.append(denominator)
+        denominator += 1
+    numerators = np.array(numerators[:n], dtype=np.int64)
+    denominators = np.array(denominators[:n], dtype=np.int64)
+    order = np.argsort(numerators / denominators, kind='stable')
+    return numerators[order], denominators[order]
+
+def chunk_target(chunk, target):
+    """
+    Mục tiêu của chunk (bad = 1, good = 0) và mặt nạ các dòng có mục tiêu
+    """
+    y = pd.to_numeric(chunk[target], errors='coerce').to_numpy(dtype=np.float64)
+    labeled = ~np.isnan(y)
+    return y[labeled], labeled
+
+def numeric_values(values):
+    return pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64)
+
+def sketch_chunk(numeric_columns, target, sketch_size, chunk):
+    """
+    Lượt 1: tóm tắt phân vị của các biến số trong một chunk
+    """
+    _, labeled = chunk_target(chunk, target)
+    sketches = {}
+    for column in numeric_columns:
+        values = numeric_values(chunk[column].to_numpy()[labeled])
+        sketches[column] = QuantileSketch(sketch_size).update(values[~np.isnan(values)])
+    return sketches
+
+def histogram_chunk(edges, categorical_columns, target, chunk):
+    """
+    Lượt 2: histogram good/bad theo bin mịn (biến số) hoặc theo category (biến phân loại) của một chunk
+    """
+    y, labeled = chunk_target(chunk, target)
+    histograms = {}
+    for column, column_edges in edges.items():
+        histograms[column] = NumericHistogram(column_edges).update(numeric_values(chunk[column].to_numpy()[labeled]), y)
+    for column in categorical_columns:
+        histograms[column] = CategoricalHistogram().update(chunk[column].to_numpy()[labeled], y)
+    return histograms
+
+def read_chunks(path, chunk_size, input_format=None):
+    """
+    Đọc tệp CSV hoặc Parquet thành từng DataFrame có tối đa chunk_size dòng
+    """
+    if input_format is None:
+        input_format = 'parquet' if Path(path).suffix.lower() in ('.parquet', '.pq') else 'csv'
+    if input_format == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif input_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Đọc Parquet cần cài đặt thư viện pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Không hỗ trợ định dạng đầu vào: {input_format}")
+
+def merge_all(results):
+    """
+    Gộp kết quả {cột: sketch/histogram} của các chunk
+    """
+    merged = {}
+    for result in results:
+        for column, stats in result.items():
+            if column in merged:
+                merged[column].merge(stats)
+            else:
+                merged[column] = stats
+    return merged
@@ -1,10 +1,247 @@
 import pandas as pd
 import numpy as np
-from optbinning import OptimalBinning
 import yaml
+import os
+import itertools
+import json
 import pickle
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
 from pathlib import Path
 
+from ..utils.instrumentation import instrumentation
+
+# Định dạng artifact WOE: manifest JSON + một mảng float64 (.npy) chứa điểm chia và WOE
+ARTIFACT_FORMAT = 'woe-lookup-tables'
+ARTIFACT_VERSION = 1
+
+def _json_value(value):
+    """
+    Chuyển scalar numpy (category, giá trị đặc biệt) thành kiểu Python để ghi JSON
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+class WoeLookupTable:
+    """
+    Bảng tra WOE đã biên dịch cho một biến, không cần gọi OptimalBinning khi dự đoán
+    
+    Biến số: mảng điểm chia tăng dần và mảng WOE của từng bin (tra bằng
+    np.searchsorted). Biến phân loại: bảng băm category -> WOE. Giá trị thiếu,
+    giá trị đặc biệt (special_codes) và category chưa gặp có WOE riêng.
+    """
+    def __init__(self, dtype, woe, splits=None, categories=None, missing_woe=0.0, unknown_woe=0.0,
+                 special_values=None, special_woe=None):
+        """
+        Parameters:
+        -----------
+        dtype : str
+            'numerical' hoặc 'categorical'
+        woe : array-like
+            Giá trị WOE của từng bin (biến số) hoặc từng category (biến phân loại)
+        splits : array-like, optional
+            Các điểm chia tăng dần của biến số; bin i là [splits[i-1], splits[i])
+        categories : list, optional
+            Danh sách category tương ứng với woe của biến phân loại
+        missing_woe : float
+            WOE cho giá trị thiếu
+        unknown_woe : float
+            WOE cho category chưa gặp khi fit
+        special_values : list, optional
+            Các giá trị đặc biệt được tách bin riêng (special_codes của OptimalBinning)
+        special_woe : array-like, optional
+            WOE tương ứng với special_values
+        """
+        self.dtype = dtype
+        self.woe = np.asarray(woe, dtype=np.float64)
+        self.splits = np.asarray(splits if splits is not None else [], dtype=np.float64)
+        self.categories = list(categories) if categories is not None else []
+        self.missing_woe = float(missing_woe)
+        self.unknown_woe = float(unknown_woe)
+        self.special_values = list(special_values) if special_values is not None else []
+        self.special_woe = np.asarray(special_woe if special_woe is not None else [], dtype=np.float64)
+        
+        # Cấu trúc Python thuần cho đường tra cứu từng giá trị
+        self._splits_list = self.splits.tolist()
+        self._woe_list = self.woe.tolist()
+        self._category_woe = dict(zip(self.categories, self._woe_list))
+        self._special_woe = dict(zip(self.special_values, self.special_woe.tolist()))
+        
+        # Chỉ mục băm cho đường tra cứu cả cột; WOE của category chưa gặp ở vị trí cuối
+        self._category_index = pd.Index(self.categories)
+        self._category_woe_array = np.append(self.woe, self.unknown_woe) if dtype == 'categorical' else None
+        
+        # Mã bin (lookup_codes): các bin, rồi giá trị thiếu, category chưa gặp (biến phân loại)
+        # và từng giá trị đặc biệt. Category cùng WOE (cùng bin) dùng chung một mã.
+        if dtype == 'categorical':
+            bin_woe, self._category_codes = np.unique(self.woe, return_inverse=True)
+            self._category_codes = np.append(self._category_codes, len(bin_woe) + 1)
+            self.code_woe = np.concatenate([bin_woe, [self.missing_woe, self.unknown_woe], self.special_woe])
+        else:
+            bin_woe = self.woe
+            self.code_woe = np.concatenate([bin_woe, [self.missing_woe], self.special_woe])
+        self._missing_code = len(bin_woe)
+        self._special_codes = len(self.code_woe) - len(self.special_woe) + np.arange(len(self.special_woe))
+    
+    def __setstate__(self, state):
+        # Dựng lại các cấu trúc dẫn xuất khi unpickle (kể cả bảng tra pickle bởi phiên bản cũ hơn)
+        self.__init__(state['dtype'], state['woe'], splits=state['splits'], categories=state['categories'],
+                      missing_woe=state['missing_woe'], unknown_woe=state['unknown_woe'],
+                      special_values=state.get('special_values'), special_woe=state.get('special_woe'))
+    
+    def lookup(self, value):
+        """
+        Tra WOE cho một giá trị đơn lẻ
+        """
+        if value is None or value != value:
+            return self.missing_woe
+        if self._special_woe and value in self._special_woe:
+            return self._special_woe[value]
+        if self.dtype == 'categorical':
+            return self._category_woe.get(value, self.unknown_woe)
+        return self._woe_list[bisect_right(self._splits_list, value)]
+    
+    def lookup_array(self, values, out=None):
+        """
+        Tra WOE cho cả một cột: np.searchsorted + gather (biến số) hoặc tra
+        chỉ mục băm (biến phân loại)
+        
+        Parameters:
+        -----------
+        values : array-like
+            Giá trị của biến; NaN/None là giá trị thiếu
+        out : ndarray, optional
+            Mảng 1 chiều để ghi kết quả (ví dụ một cột của ma trận float32)
+            
+        Returns:
+        --------
+        ndarray
+            Mảng WOE (float64, hoặc out nếu được truyền vào)
+        """
+        if self.dtype == 'categorical':
+            values = np.asarray(values, dtype=object)
+            positions = self._category_index.get_indexer(values)
+            woe = self._category_woe_array[positions]
+            missing = pd.isna(values)
+        else:
+            values = np.asarray(values, dtype=np.float64)
+            woe = self.woe[np.searchsorted(self.splits, values, side='right')]
+            missing = np.isnan(values)
+        
+        woe[missing] = self.missing_woe
+        if self.special_values:
+            for special, special_woe in self._special_woe.items():
+                woe[values == special] = special_woe
+        
+        if out is None:
+            return woe
+        out[:] = woe
+        return out
+    
+    def lookup_codes(self, values, out=None):
+        """
+        Mã bin uint8 của cả một cột; self.code_woe[mã] là WOE tương ứng
+        
+        Parameters:
+        -----------
+        values : array-like
+            Giá trị của biến; NaN/None là giá trị thiếu
+        out : ndarray, optional
+            Mảng uint8 1 chiều để ghi kết quả (ví dụ một cột của BinCodedDataset)
+            
+        Returns:
+        --------
+        ndarray
+            Mảng mã bin uint8 (hoặc out nếu được truyền vào)
+        """
+        if len(self.code_woe) > 256:
+            raise ValueError(f"Biến có {len(self.code_woe)} mã bin, vượt quá 256 của uint8")
+        
+        if self.dtype == 'categorical':
+            values = np.asarray(values, dtype=object)
+            # Vị trí -1 (category chưa gặp) lấy phần tử cuối của _category_codes
+            codes = self._category_codes[self._category_index.get_indexer(values)]
+            missing = pd.isna(values)
+        else:
+            values = np.asarray(values, dtype=np.float64)
+            codes = np.searchsorted(self.splits, values, side='right')
+            missing = np.isnan(values)
+        
+        codes[missing] = self._missing_code
+        for special, code in zip(self.special_values, self._special_codes):
+            codes[values == special] = code
+        
+        if out is None:
+            return codes.astype(np.uint8)
+        out[:] = codes
+        return out
+    
+    @classmethod
+    def from_binning(cls, binning):
+        """
+        Biên dịch bảng tra từ một OptimalBinning đã fit
+        
+        WOE của từng bin được lấy bằng chính binning.transform trên một giá trị
+        đại diện của bin, nên kết quả trùng khớp với OptimalBinning.
+        """
+        is_categorical = binning.dtype == 'categorical'
+        missing_woe = binning.transform(np.array([np.nan], dtype=object if is_categorical else float),
+                                        metric='woe')[0]
+        
+        special_values = list(binning.special_codes or [])
+        special_woe = None
+        if special_values:
+            special_woe = binning.transform(np.array(special_values, dtype=object if is_categorical else float),
+                                            metric='woe')
+        
+        if is_categorical:
+            categories = [category for bin_categories in binning.splits for category in bin_categories]
+            woe = binning.transform(np.array(categories, dtype=object), metric='woe')
+            unknown_woe = binning.transform(np.array(['__unknown_category__'], dtype=object), metric='woe')[0]
+            return cls('categorical', woe, categories=categories, missing_woe=missing_woe,
+                       unknown_woe=unknown_woe, special_values=special_values, special_woe=special_woe)
+        
+        splits = np.asarray(binning.splits, dtype=np.float64)
+        # Giá trị đại diện: một điểm nhỏ hơn điểm chia đầu tiên, sau đó chính các điểm chia
+        if len(splits):
+            representatives = np.concatenate([[splits[0] - 1.0], splits])
+        else:
+            representatives = np.array([0.0])
+        woe = binning.transform(representatives, metric='woe')
+        return cls('numerical', woe, splits=splits, missing_woe=missing_woe,
+                   special_values=special_values, special_woe=special_woe)
+
+def fit_binning(column, variable, y, max_bins, min_bin_size, sample_weight=None):
+    """
+    Fit OptimalBinning cho một biến (chạy được trong tiến trình worker)
+    
+    sample_weight là trọng số của từng dòng (fit từ histogram: mỗi điểm đại diện
+    cho nhiều dòng cùng bin và cùng nhãn).
+    
+    Returns:
+    --------
+    tuple
+        (tên cột, OptimalBinning đã fit hoặc None, IV, thông điệp lỗi hoặc None)
+    """
+    # Chỉ cần optbinning khi fit; dự đoán dùng bảng tra đã biên dịch
+    from optbinning import OptimalBinning
+    
+    binning = OptimalBinning(
+        name=column,
+        dtype='numerical' if pd.api.types.is_numeric_dtype(variable) else 'categorical',
+        max_n_bins=max_bins,
+        min_bin_size=min_bin_size
+    )
+    try:
+        binning.fit(variable, y, sample_weight=sample_weight)
+        # IV lấy từ bảng binning (OptimalBinning không có thuộc tính iv)
+        binning.binning_table.build()
+        iv = float(binning.binning_table.iv)
+    except Exception as e:
+        return column, None, None, str(e)
+    return column, binning, iv, None
+
 class WoeIvTransformer:
     """
     Tính toán Weight of Evidence (WOE) và Information Value (IV) cho các biến
@@ -18,10 +255,14 @@ class WoeIvTransformer:
         
         self.max_bins = self.config['feature_engineering']['max_bins']
         self.min_bin_size = self.config['feature_engineering']['min_bin_size']
+        self.n_jobs = self.config['feature_engineering'].get('n_jobs', 1)
+        self.prescreen = self.config['feature_engineering'].get('prescreen', {}) or {}
         self.binnings = {}
         self.iv_values = {}
+        self.screening_report = None
+        self.screened_out = []
         
-    def fit(self, X, y, columns=None):
+    def fit(self, X, y, columns=None, n_jobs=None, prescreen=None):
         """
         Tính WOE và IV cho tất cả các cột được chỉ định
         
@@ -33,33 +274,165 @@ class WoeIvTransformer:
             Cột mục tiêu (bad = 1, good = 0)
         columns : list, optional
             Danh sách cột cần tính WOE, IV. Nếu None, sẽ tính toán tất cả các cột.
+        n_jobs : int, optional
+            Số tiến trình fit song song các cột (1 = tuần tự, 0 = số lõi CPU);
+            mặc định theo feature_engineering.n_jobs trong config.yaml
+        prescreen : bool, optional
+            Sàng lọc IV xấp xỉ (screen_iv) trước optimal binning, chỉ fit các cột
+            đạt ngưỡng; mặc định theo feature_engineering.prescreen.enabled
         """
         if columns is None:
             columns = X.columns
-            
+        columns = list(columns)
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        if not n_jobs:
+            n_jobs = os.cpu_count() or 1
+        
+        y = np.asarray(y)
+        if self.prescreen.get('enabled', False) if prescreen is None else prescreen:
+            from .prebinning import screen_iv
+            report = screen_iv(X, y, columns, n_bins=self.prescreen.get('n_bins', 20))
+            columns = self._apply_prescreen(report, columns)
+        
+        tasks = ((column, X[column], y, self.max_bins, self.min_bin_size) for column in columns)
+        return self._fit_binnings(tasks, n_jobs)
+    
+    def fit_streaming(self, source, target, columns=None, chunk_size=None, input_format=None,
+                      n_jobs=None, n_prebins=None, prescreen=None):
+        """
+        Tính WOE và IV từ dữ liệu đọc theo chunk, không cần nạp toàn bộ vào bộ nhớ
+        
+        Lượt 1 tạo tóm tắt phân vị (QuantileSketch) của từng biến số để chọn
+        n_prebins bin mịn cùng tần suất; lượt 2 đếm good/bad theo bin mịn (biến số)
+        hoặc theo category (biến phân loại). Thống kê của từng chunk được tính song
+        song rồi cộng lại; OptimalBinning sau đó chỉ chạy trên histogram đã gộp
+        (mỗi bin là hai điểm good/bad có trọng số) nên kết quả gần với fit trong
+        bộ nhớ nhưng điểm chia chỉ chính xác tới độ mịn của bin.
+        
+        Parameters:
+        -----------
+        source : str hoặc callable
+            Tệp CSV/Parquet, hoặc hàm không tham số trả về một iterable DataFrame
+            mới (dữ liệu được đọc hai lượt)
+        target : str
+            Cột mục tiêu (bad = 1, good = 0); dòng thiếu mục tiêu bị bỏ qua
+        columns : list, optional
+            Danh sách cột cần tính WOE, IV. Nếu None, dùng mọi cột trừ target.
+            Kiểu (số hay phân loại) của cột được xác định từ chunk đầu tiên.
+        chunk_size : int, optional
+            Số dòng mỗi chunk khi đọc tệp; mặc định theo feature_engineering.streaming
+        input_format : str, optional
+            'csv' hoặc 'parquet' (mặc định suy ra từ phần mở rộng)
+        n_jobs : int, optional
+            Số tiến trình (1 = tuần tự, 0 = số lõi CPU); mặc định theo feature_engineering.n_jobs
+        n_prebins : int, optional
+            Số bin mịn của mỗi biến số; mặc định theo feature_engineering.streaming
+        prescreen : bool, optional
+            Sàng lọc theo IV xấp xỉ tính trên histogram đã gộp trước optimal binning;
+            mặc định theo feature_engineering.prescreen.enabled
+        """
+        from ..models.parallel_scoring import map_ordered
+        from .prebinning import DEFAULT_SKETCH_SIZE, histogram_chunk, merge_all, read_chunks, sketch_chunk
+        
+        streaming_config = self.config['feature_engineering'].get('streaming', {}) or {}
+        if chunk_size is None:
+            chunk_size = streaming_config.get('chunk_size', 100000)
+        if n_prebins is None:
+            n_prebins = streaming_config.get('n_prebins', 200)
+        sketch_size = streaming_config.get('sketch_size', DEFAULT_SKETCH_SIZE)
+        if n_jobs is None:
+            n_jobs = self.n_jobs
+        if not n_jobs:
+            n_jobs = os.cpu_count() or 1
+        
+        if callable(source):
+            open_chunks = source
+        else:
+            open_chunks = lambda: read_chunks(source, chunk_size, input_format)
+        
+        # Lượt 1: kiểu cột (từ chunk đầu tiên) và tóm tắt phân vị của biến số
+        chunks = iter(open_chunks())
+        first = next(chunks, None)
+        if first is None:
+            raise ValueError("Dữ liệu rỗng")
+        if columns is None:
+            columns = [column for column in first.columns if column != target]
+        columns = list(columns)
+        numeric_columns = [column for column in columns if pd.api.types.is_numeric_dtype(first[column])]
+        categorical_columns = [column for column in columns if column not in numeric_columns]
+        
+        sketches = merge_all(map_ordered(partial(sketch_chunk, numeric_columns, target, sketch_size),
+                                         itertools.chain([first], chunks), n_jobs))
+        edges = {column: sketches[column].edges(n_prebins) for column in numeric_columns}
+        
+        # Lượt 2: histogram good/bad
+        histograms = merge_all(map_ordered(partial(histogram_chunk, edges, categorical_columns, target),
+                                           open_chunks(), n_jobs))
+        
+        if self.prescreen.get('enabled', False) if prescreen is None else prescreen:
+            report = pd.DataFrame({
+                'Variable': columns,
+                'IV': [histograms[column].iv() for column in columns],
+                'Bins': [histograms[column].n_bins() for column in columns]
+            }).sort_values('IV', ascending=False, kind='stable').reset_index(drop=True)
+            columns = self._apply_prescreen(report, columns)
+        
+        # Optimal binning trên histogram đã gộp
+        tasks = []
         for column in columns:
-            variable = X[column]
-            
-            # Kiểm tra kiểu dữ liệu
-            if pd.api.types.is_numeric_dtype(variable):
-                binning_type = 'continuous'
-            else:
-                binning_type = 'categorical'
-                
-            # Tạo binning tối ưu
-            binning = OptimalBinning(
-                name=column,
-                dtype=binning_type,
-                max_n_bins=self.max_bins,
-                min_bin_size=self.min_bin_size
-            )
-            
-            try:
-                binning.fit(variable, y)
-                self.binnings[column] = binning
-                self.iv_values[column] = binning.iv
-            except Exception as e:
-                print(f"Lỗi khi tính WOE cho {column}: {e}")
+            x, y, weight = histograms[column].weighted_sample()
+            tasks.append((column, x, y, self.max_bins, self.min_bin_size, weight))
+        return self._fit_binnings(tasks, n_jobs)
+    
+    def _apply_prescreen(self, report, columns):
+        """
+        Chọn các cột có IV xấp xỉ >= prescreen.min_iv (và trong top_k nếu đặt), lưu
+        báo cáo sàng lọc vào screening_report
+        
+        Returns:
+        --------
+        list
+            Các cột được giữ, theo thứ tự của columns
+        """
+        min_iv = self.prescreen.get('min_iv', 0.0) or 0.0
+        top_k = self.prescreen.get('top_k')
+        
+        report = report.copy()
+        selected = report['IV'].to_numpy() >= min_iv
+        if top_k is not None:
+            # report đã sắp xếp theo IV giảm dần
+            selected &= np.arange(len(report)) < top_k
+        report['Selected'] = selected
+        
+        self.screening_report = report
+        kept = set(report.loc[selected, 'Variable'])
+        self.screened_out = list(report.loc[~selected, 'Variable'])
+        print(f"Sàng lọc IV: giữ {len(kept)}/{len(columns)} biến (IV >= {min_iv}"
+              f"{f', top {top_k}' if top_k is not None else ''})")
+        return [column for column in columns if column in kept]
+    
+    def _fit_binnings(self, tasks, n_jobs):
+        """
+        Chạy fit_binning cho từng tác vụ (song song nếu n_jobs > 1) và lưu kết quả
+        """
+        tasks = list(tasks)
+        n_jobs = min(n_jobs, max(len(tasks), 1))
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                # map trả kết quả theo đúng thứ tự cột nên kết quả giống hệt chế độ tuần tự
+                results = list(executor.map(fit_binning, *zip(*tasks)))
+        else:
+            results = [fit_binning(*task) for task in tasks]
+        
+        self.fit_errors = {}
+        for column, binning, iv, error in results:
+            if error is not None:
+                print(f"Lỗi khi tính WOE cho {column}: {error}")
+                self.fit_errors[column] = error
+                continue
+            self.binnings[column] = binning
+            self.iv_values[column] = iv
                 
         # Sắp xếp IV theo thứ tự giảm dần
         self.iv_table = pd.DataFrame({
@@ -67,6 +440,9 @@ class WoeIvTransformer:
             'IV': list(self.iv_values.values())
         }).sort_values('IV', ascending=False).reset_index(drop=True)
         
+        # Bảng tra đã biên dịch dùng khi chuyển đổi (không gọi lại OptimalBinning)
+        self.lookup_tables = self.compile_lookup_tables(rebuild=True)
+        
         return self
     
     def transform(self, X, columns=None):
@@ -85,16 +461,114 @@ class WoeIvTransformer:
         DataFrame
             DataFrame với các cột đã chuyển đổi thành WOE
         """
-        X_woe = X.copy()
-        
+        tables = self.compile_lookup_tables()
         if columns is None:
-            columns = self.binnings.keys()
+            columns = tables.keys()
+        columns = set(column for column in columns if column in tables)
         
-        for column in columns:
-            if column in self.binnings:
-                X_woe[column] = self.binnings[column].transform(X[column], metric='woe')
+        # Dựng frame mới theo từng cột thay vì sao chép cả frame rồi ghi đè
+        data = {}
+        for column in X.columns:
+            if column in columns:
+                with instrumentation.stage('woe_feature_seconds', feature=column):
+                    data[column] = tables[column].lookup_array(X[column].to_numpy())
+            else:
+                data[column] = X[column]
+        
+        return pd.DataFrame(data, index=X.index)
+    
+    def transform_matrix(self, X, feature_names, dtype=np.float32):
+        """
+        Chuyển đổi sang WOE và ghi thẳng vào một ma trận cấp phát sẵn
+        
+        Mỗi cột chỉ là một lần np.searchsorted + gather; cột không có binning
+        được giữ nguyên giá trị. Dùng cho dự đoán (XGBoost inplace_predict).
+        
+        Parameters:
+        -----------
+        X : DataFrame hoặc dict
+            Dữ liệu, truy cập theo tên cột
+        feature_names : list
+            Thứ tự cột của ma trận kết quả
+        dtype : numpy dtype
+            Kiểu của ma trận (mặc định float32 như XGBoost)
             
-        return X_woe
+        Returns:
+        --------
+        ndarray
+            Ma trận (số dòng, len(feature_names))
+        """
+        tables = self.compile_lookup_tables()
+        n_rows = len(X) if isinstance(X, pd.DataFrame) else len(next(iter(X.values()), ()))
+        matrix = np.empty((n_rows, len(feature_names)), dtype=dtype)
+        for i, column in enumerate(feature_names):
+            values = X[column]
+            values = values.to_numpy() if hasattr(values, 'to_numpy') else np.asarray(values)
+            table = tables.get(column)
+            if table is None:
+                matrix[:, i] = values
+                continue
+            with instrumentation.stage('woe_feature_seconds', feature=column):
+                table.lookup_array(values, out=matrix[:, i])
+        return matrix
+    
+    def can_encode(self, feature_names):
+        """
+        Mọi đặc trưng trong feature_names đều có bảng tra (biểu diễn được bằng mã bin)
+        """
+        tables = self.compile_lookup_tables()
+        return bool(feature_names) and all(name in tables for name in feature_names)
+    
+    def transform_codes(self, X, feature_names=None):
+        """
+        Chuyển đổi sang ma trận mã bin uint8 thay cho WOE
+        
+        Parameters:
+        -----------
+        X : DataFrame
+            Dữ liệu cần chuyển đổi
+        feature_names : list, optional
+            Thứ tự cột; mặc định các cột của X có binning
+            
+        Returns:
+        --------
+        BinCodedDataset
+            Mã bin và bảng WOE theo mã của từng đặc trưng
+        """
+        from .bin_codes import BinCodedDataset
+        
+        tables = self.compile_lookup_tables()
+        if feature_names is None:
+            feature_names = [column for column in X.columns if column in tables]
+        missing = [name for name in feature_names if name not in tables]
+        if missing:
+            raise ValueError(f"Không có binning cho các đặc trưng: {missing}")
+        
+        codes = np.empty((len(X), len(feature_names)), dtype=np.uint8, order='F')
+        for j, column in enumerate(feature_names):
+            with instrumentation.stage('woe_feature_seconds', feature=column):
+                tables[column].lookup_codes(X[column].to_numpy(), out=codes[:, j])
+        return BinCodedDataset(codes, feature_names, [tables[name].code_woe for name in feature_names],
+                               index=X.index)
+    
+    def compile_lookup_tables(self, rebuild=False):
+        """
+        Biên dịch các binning đã fit thành bảng tra WOE bằng numpy/Python thuần
+        
+        Bảng tra được tạo khi fit và lưu cùng transformer; transformer cũ chưa
+        có bảng tra được biên dịch ở lần gọi đầu tiên.
+        
+        Returns:
+        --------
+        dict
+            {tên cột: WoeLookupTable}
+        """
+        tables = getattr(self, 'lookup_tables', None)
+        if tables is None or rebuild:
+            tables = {column: WoeLookupTable.from_binning(binning)
+                      for column, binning in self.binnings.items()}
+            self.lookup_tables = tables
+        return tables
     
     def fit_transform(self, X, y, columns=None):
         """
@@ -109,6 +583,13 @@ class WoeIvTransformer:
         """
         return self.iv_table.copy()
     
+    def get_screening_report(self):
+        """
+        Trả về báo cáo sàng lọc IV (Variable, IV xấp xỉ, Bins, Selected) hoặc None nếu không sàng lọc
+        """
+        report = getattr(self, 'screening_report', None)
+        return report.copy() if report is not None else None
+    
     def get_binning_table(self, column):
         """
         Trả về bảng binning chi tiết cho một cột
@@ -118,6 +599,127 @@ class WoeIvTransformer:
         else:
             return None
     
+    def save_artifact(self, path='models/woe_transformer.json'):
+        """
+        Lưu bảng tra WOE thành artifact không phụ thuộc optbinning
+        
+        Manifest JSON (path) ghi thứ tự đặc trưng, kiểu, IV, category, WOE của giá
+        trị thiếu/đặc biệt và vị trí của từng mảng; điểm chia và WOE của mọi đặc
+        trưng được nối vào một mảng float64 ghi cạnh manifest (cùng tên, đuôi .npy).
+        
+        Returns:
+        --------
+        tuple
+            (đường dẫn manifest, đường dẫn mảng)
+        """
+        path = Path(path)
+        array_path = path.with_suffix('.npy')
+        
+        arrays, offset, features = [], 0, []
+        def append(values):
+            nonlocal offset
+            arrays.append(np.asarray(values, dtype=np.float64))
+            span = [offset, offset + len(arrays[-1])]
+            offset = span[1]
+            return span
+        
+        for column, table in self.compile_lookup_tables().items():
+            features.append({
+                'name': column,
+                'dtype': table.dtype,
+                'iv': self.iv_values.get(column),
+                'splits': append(table.splits),
+                'woe': append(table.woe),
+                'special_woe': append(table.special_woe),
+                'categories': [_json_value(category) for category in table.categories],
+                'special_values': [_json_value(value) for value in table.special_values],
+                'missing_woe': table.missing_woe,
+                'unknown_woe': table.unknown_woe
+            })
+        
+        manifest = {
+            'format': ARTIFACT_FORMAT,
+            'format_version': ARTIFACT_VERSION,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'max_bins': self.max_bins,
+            'min_bin_size': self.min_bin_size,
+            'arrays': array_path.name,
+            'features': features,
+            'fit_errors': getattr(self, 'fit_errors', {}),
+            'screening': (self.screening_report.to_dict(orient='records')
+                          if getattr(self, 'screening_report', None) is not None else None)
+        }
+        
+        os.makedirs(path.parent, exist_ok=True)
+        np.save(array_path, np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64))
+        # Ghi manifest sau cùng (tệp tạm rồi đổi tên): manifest tồn tại nghĩa là mảng đã ghi xong
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path, array_path
+    
+    @classmethod
+    def load_artifact(cls, path='models/woe_transformer.json', mmap=False):
+        """
+        Tải transformer từ artifact do save_artifact tạo ra
+        
+        Không đọc config.yaml, không unpickle và không import optbinning; transformer
+        chỉ có bảng tra (binnings rỗng) nên dùng được cho transform/transform_matrix
+        nhưng không có bảng binning chi tiết.
+        
+        Parameters:
+        -----------
+        path : str
+            Đường dẫn manifest JSON
+        mmap : bool
+            Memory-map mảng điểm chia/WOE (chỉ đọc, chia sẻ trang giữa các tiến trình)
+            thay vì đọc vào bộ nhớ
+        """
+        path = Path(path)
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != ARTIFACT_FORMAT or manifest.get('format_version') != ARTIFACT_VERSION:
+            raise ValueError(f"Artifact WOE không được hỗ trợ: {path} "
+                             f"({manifest.get('format')} phiên bản {manifest.get('format_version')})")
+        
+        values = np.load(path.parent / manifest['arrays'], mmap_mode='r' if mmap else None)
+        
+        transformer = cls.__new__(cls)
+        transformer.config = None
+        transformer.max_bins = manifest['max_bins']
+        transformer.min_bin_size = manifest['min_bin_size']
+        transformer.n_jobs = 1
+        transformer.binnings = {}
+        transformer.fit_errors = manifest.get('fit_errors', {})
+        transformer.lookup_tables = {}
+        transformer.iv_values = {}
+        for feature in manifest['features']:
+            column = feature['name']
+            transformer.lookup_tables[column] = WoeLookupTable(
+                feature['dtype'], values[slice(*feature['woe'])],
+                splits=values[slice(*feature['splits'])],
+                categories=feature['categories'],
+                missing_woe=feature['missing_woe'],
+                unknown_woe=feature['unknown_woe'],
+                special_values=feature['special_values'],
+                special_woe=values[slice(*feature['special_woe'])]
+            )
+            if feature['iv'] is not None:
+                transformer.iv_values[column] = feature['iv']
+        
+        transformer.iv_table = pd.DataFrame({
+            'Variable': list(transformer.iv_values.keys()),
+            'IV': list(transformer.iv_values.values())
+        }).sort_values('IV', ascending=False).reset_index(drop=True)
+        
+        screening = manifest.get('screening')
+        transformer.screening_report = pd.DataFrame(screening) if screening is not None else None
+        transformer.screened_out = ([record['Variable'] for record in screening if not record['Selected']]
+                                    if screening is not None else [])
+        transformer.prescreen = {}
+        return transformer
+    
     def save(self, path='models/woe_transformer.pkl'):
         """
         Lưu transformer
@@ -144,7 +746,7 @@ if __name__ == "__main__":
     
     # Tách X và y
     y = data['default_flag']
-    X = data.drop('default_flag', axis=1)
+    X = data.drop(columns=['default_flag']).drop(columns=['customer_id'], errors='ignore')
     
     # Fit và transform
     woe_transformer = WoeIvTransformer()
@@ -7,6 +7,11 @@ class ApplicationScorecard(BaseXGBoostModel):
     """
     Mô hình Application Scorecard cho khách hàng mới
     """
+    # High nếu xác suất > 0.3, Medium nếu > 0.1, còn lại Low
+    risk_thresholds = (0.1, 0.3)
+    risk_labels = ('Low', 'Medium', 'High')
+    recommendations = {'Low': 'Approve', 'Medium': 'Review', 'High': 'Reject'}
+    
     def __init__(self, config_path=None):
         super().__init__('application_scorecard', config_path)
     
@@ -47,7 +52,7 @@ class ApplicationScorecard(BaseXGBoostModel):
         
         return metrics
         
-    def get_application_risk_profile(self, customer_data):
+    def get_application_risk_profile(self, customer_data, scoring=None):
         """
         Tạo hồ sơ rủi ro cho một khách hàng mới
         
@@ -55,21 +60,55 @@ class ApplicationScorecard(BaseXGBoostModel):
         -----------
         customer_data : DataFrame
             Dữ liệu của một khách hàng
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ customer_data
             
         Returns:
         --------
         dict
             Thông tin rủi ro và điểm
         """
-        proba = self.predict(customer_data)[0]
+        if scoring is None:
+            scoring = self.score(customer_data)
+        
+        proba = scoring.probability[0]
+        risk_level = scoring.tier[0]
         
         risk_profile = {
             'probability_of_default': proba,
-            'risk_level': 'High' if proba > 0.3 else ('Medium' if proba > 0.1 else 'Low'),
-            'recommendation': 'Reject' if proba > 0.3 else ('Review' if proba > 0.1 else 'Approve')
+            'risk_level': risk_level,
+            'recommendation': self.recommendations[risk_level]
         }
         
         return risk_profile
+    
+    def get_application_risk_profiles(self, customer_data, scoring=None):
+        """
+        Tạo hồ sơ rủi ro cho nhiều khách hàng mới trong một lần dự đoán
+        
+        Parameters:
+        -----------
+        customer_data : DataFrame
+            Dữ liệu của các khách hàng (mỗi dòng một khách hàng)
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ customer_data
+            
+        Returns:
+        --------
+        DataFrame
+            Xác suất vỡ nợ, mức rủi ro và khuyến nghị cho từng khách hàng,
+            cùng index với customer_data
+        """
+        if scoring is None:
+            scoring = self.score(customer_data)
+        
+        risk_level = pd.Series(scoring.tier, index=customer_data.index)
+        
+        return pd.DataFrame({
+            'probability_of_default': scoring.probability,
+            'risk_level': risk_level,
+            'recommendation': risk_level.map(self.recommendations)
+        }, index=customer_data.index)
 
 if __name__ == "__main__":
     # Ví dụ sử dụng
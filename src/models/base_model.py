@@ -4,26 +4,91 @@ import xgboost as xgb
 from sklearn.model_selection import train_test_split
 import yaml
 import pickle
+import json
 import os
+from dataclasses import dataclass
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-# Thử import shap, nếu không thành công thì bỏ qua
-try:
-    import shap
-    SHAP_AVAILABLE = True
-except ImportError:
-    print("Thư viện SHAP không khả dụng. Một số tính năng giải thích mô hình sẽ bị vô hiệu hóa.")
-    SHAP_AVAILABLE = False
 
+from ..features.bin_codes import BinCodedDataset
 from ..features.woe_iv import WoeIvTransformer
 from ..utils.metrics import calculate_metrics, plot_roc_curve, plot_ks_curve
+from ..utils.instrumentation import instrumentation
+
+# matplotlib, seaborn và shap chỉ cần khi đánh giá/vẽ biểu đồ nên được import
+# khi dùng; phục vụ API (kể cả các worker được fork) không phải nạp chúng
+def load_shap():
+    """
+    Import shap khi cần, trả về None nếu thư viện không khả dụng
+    """
+    try:
+        import shap
+        return shap
+    except ImportError:
+        print("Thư viện SHAP không khả dụng. Một số tính năng giải thích mô hình sẽ bị vô hiệu hóa.")
+        return None
+
+def to_number(name, value):
+    """
+    Chuyển giá trị của một đặc trưng sang float như pd.to_numeric (None là giá trị thiếu)
+    """
+    if value is None:
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Đặc trưng {name} cần giá trị số, nhận được {value!r}")
+
+@dataclass(frozen=True)
+class ScoringResult:
+    """
+    Kết quả chấm điểm bất biến của một lần dự đoán
+    
+    Attributes:
+    -----------
+    probability : ndarray
+        Xác suất sự kiện xấu (vỡ nợ, trễ hạn, từ bỏ, ...)
+    log_odds : ndarray
+        Log-odds tương ứng, log(p / (1 - p))
+    score : ndarray
+        Điểm tín dụng đã quy đổi (600-850)
+    tier : ndarray
+        Phân hạng rủi ro theo ngưỡng của từng mô hình
+    model_version : str, optional
+        Phiên bản mô hình đã tạo ra kết quả (xem ModelRegistry)
+    """
+    probability: np.ndarray
+    log_odds: np.ndarray
+    score: np.ndarray
+    tier: np.ndarray
+    model_version: str = None
+    
+    def __len__(self):
+        return len(self.probability)
+    
+    def __getitem__(self, key):
+        """
+        Lấy kết quả con theo vị trí (slice, mảng chỉ số hoặc mặt nạ boolean)
+        """
+        if isinstance(key, (int, np.integer)):
+            key = slice(key, key + 1 if key != -1 else None)
+        return ScoringResult(
+            probability=self.probability[key],
+            log_odds=self.log_odds[key],
+            score=self.score[key],
+            tier=self.tier[key],
+            model_version=self.model_version
+        )
 
 class BaseXGBoostModel:
     """
     Lớp cơ sở cho các mô hình XGBoost chấm điểm tín dụng
     """
+    # Ngưỡng xác suất (tăng dần) và nhãn phân hạng rủi ro; lớp con ghi đè.
+    # risk_tier_side='left' nghĩa là xác suất bằng ngưỡng thuộc hạng thấp hơn.
+    risk_thresholds = (0.1, 0.3)
+    risk_labels = ('Low', 'Medium', 'High')
+    risk_tier_side = 'left'
+    
     def __init__(self, model_type, config_path=None):
         """
         Khởi tạo mô hình
@@ -138,6 +203,18 @@ class BaseXGBoostModel:
         self.model = None
         self.woe_transformer = None
         self.feature_importances = None
+        
+        # Biểu diễn mã bin uint8 khi huấn luyện và chấm điểm lô lớn (xem BinCodedDataset)
+        self.bin_codes = self.config.get('feature_engineering', {}).get('bin_codes', {}) or {}
+        
+        # Phiên bản artifact đang tải (do ModelRegistry gán)
+        self.version = None
+        
+        # Bộ nhớ đệm dự đoán (tùy chọn, xem PredictionCache)
+        self.prediction_cache = None
+        
+        # Đường dự đoán nhanh cho một dòng, biên dịch khi cần (xem compile_fast_path)
+        self._fast_path = None
     
     def prepare_data(self, data):
         """
@@ -156,6 +233,10 @@ class BaseXGBoostModel:
         y = data[self.target]
         X = data.drop(self.target, axis=1)
         
+        # customer_id (khóa của dữ liệu đã xử lý) không phải đặc trưng
+        if 'customer_id' in X.columns:
+            X = X.drop(columns=['customer_id'])
+        
         # Chia tập train/test
         train_test_split_ratio = self.config['data']['train_test_split']
         random_state = self.config['data']['random_state']
@@ -180,13 +261,29 @@ class BaseXGBoostModel:
             
         Returns:
         --------
-        X_train_woe, X_test_woe : DataFrames
-            Dữ liệu đã chuyển đổi sang WOE
+        X_train_woe, X_test_woe : DataFrames hoặc BinCodedDataset
+            Dữ liệu đã chuyển đổi sang WOE; khi bật feature_engineering.bin_codes
+            là ma trận mã bin uint8 (WOE chỉ được khôi phục khi tạo DMatrix)
         """
         self.woe_transformer = WoeIvTransformer()
-        X_train_woe = self.woe_transformer.fit_transform(X_train, y_train)
+        if self.bin_codes.get('enabled', False):
+            self.woe_transformer.fit(X_train, y_train)
+            feature_names = [column for column in X_train.columns
+                             if column not in self.woe_transformer.screened_out]
+            if self.woe_transformer.can_encode(feature_names):
+                return (self.woe_transformer.transform_codes(X_train, feature_names),
+                        self.woe_transformer.transform_codes(X_test, feature_names))
+            # Có biến không fit được binning (giữ giá trị gốc): dùng DataFrame WOE
+            X_train_woe = self.woe_transformer.transform(X_train)
+        else:
+            X_train_woe = self.woe_transformer.fit_transform(X_train, y_train)
         X_test_woe = self.woe_transformer.transform(X_test)
         
+        # Bỏ các biến bị loại ở bước sàng lọc IV
+        if self.woe_transformer.screened_out:
+            X_train_woe = X_train_woe.drop(columns=self.woe_transformer.screened_out)
+            X_test_woe = X_test_woe.drop(columns=self.woe_transformer.screened_out)
+        
         return X_train_woe, X_test_woe
     
     def train(self, X_train_woe, y_train, X_test_woe=None, y_test=None):
@@ -195,22 +292,23 @@ class BaseXGBoostModel:
         
         Parameters:
         -----------
-        X_train_woe, y_train : DataFrame, Series
+        X_train_woe, y_train : DataFrame hoặc BinCodedDataset, Series
             Dữ liệu huấn luyện
-        X_test_woe, y_test : DataFrame, Series, optional
+        X_test_woe, y_test : DataFrame hoặc BinCodedDataset, Series, optional
             Dữ liệu kiểm tra
         
         Returns:
         --------
         self
         """
-        dtrain = xgb.DMatrix(X_train_woe, label=y_train)
+        dtrain = self._build_dmatrix(X_train_woe, y_train)
         
         eval_list = [(dtrain, 'train')]
         if X_test_woe is not None and y_test is not None:
-            dtest = xgb.DMatrix(X_test_woe, label=y_test)
+            dtest = self._build_dmatrix(X_test_woe, y_test)
             eval_list.append((dtest, 'test'))
         
+        self._fast_path = None
         self.model = xgb.train(
             self.xgb_params,
             dtrain,
@@ -228,7 +326,16 @@ class BaseXGBoostModel:
         
         return self
     
-    def predict(self, X):
+    @staticmethod
+    def _build_dmatrix(X_woe, label):
+        """
+        DMatrix từ DataFrame WOE hoặc từ mã bin (khôi phục WOE float32 đúng một lần)
+        """
+        if isinstance(X_woe, BinCodedDataset):
+            return xgb.DMatrix(X_woe.to_woe(), label=label, feature_names=X_woe.feature_names)
+        return xgb.DMatrix(X_woe, label=label)
+    
+    def predict(self, X, use_cache=True):
         """
         Dự đoán xác suất mặc định
         
@@ -236,6 +343,9 @@ class BaseXGBoostModel:
         -----------
         X : DataFrame
             Dữ liệu đặc trưng
+        use_cache : bool
+            Dùng prediction_cache (nếu đã gắn); chỉ các dòng chưa có trong
+            cache mới được tính WOE và dự đoán
             
         Returns:
         --------
@@ -245,24 +355,305 @@ class BaseXGBoostModel:
         if self.model is None:
             raise ValueError("Model hasn't been trained yet!")
         
-        # Tạo bản sao để tránh thay đổi dữ liệu gốc
-        X_copy = X.copy()
+        keys = self._cache_keys(X) if use_cache and self.prediction_cache is not None else None
+        if keys is None:
+            return self._predict_frame(X)
+        
+        proba, missing = self.prediction_cache.get_many(keys)
+        if missing.any():
+            idx = np.flatnonzero(missing)
+            computed = self._predict_frame(X.iloc[idx])
+            proba[idx] = computed
+            self.prediction_cache.put_many([keys[i] for i in idx], computed)
+        
+        return proba
+    
+    def _cache_keys(self, X):
+        """
+        Khóa cache cho từng dòng của X (None nếu không chuẩn hóa được thành số)
+        """
+        try:
+            matrix = X[self.model.feature_names].to_numpy(dtype=np.float64)
+        except (KeyError, ValueError, TypeError):
+            return None
+        return self.prediction_cache.make_keys(self.model_type, self.version, matrix)
+    
+    def _predict_frame(self, X):
+        """
+        Tính WOE và dự đoán XGBoost cho một DataFrame (không qua cache)
+        """
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='dtype_coercion'):
+            # Tạo bản sao để tránh thay đổi dữ liệu gốc
+            X_copy = X.copy()
+            
+            # Loại bỏ cột customer_id nếu có
+            if 'customer_id' in X_copy.columns:
+                X_copy = X_copy.drop(columns=['customer_id'])
+            
+            # Chuyển đổi kiểu dữ liệu cho tất cả các cột
+            for col in X_copy.columns:
+                if X_copy[col].dtype == 'object':
+                    try:
+                        X_copy[col] = pd.to_numeric(X_copy[col])
+                    except:
+                        X_copy[col] = X_copy[col].astype('category')
+        
+        # Tra WOE bằng bảng đã biên dịch, ghi thẳng vào ma trận float32 theo thứ tự của booster
+        feature_names = self.model.feature_names or list(X_copy.columns)
+        batch_rows = self.bin_codes.get('batch_rows', 65536)
+        if (self.bin_codes.get('enabled', False) and len(X_copy) > batch_rows
+                and self.woe_transformer.can_encode(feature_names)):
+            # Lô lớn: giữ mã bin uint8 và chỉ khôi phục WOE theo từng lát
+            with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='woe_transform'):
+                dataset = self.woe_transformer.transform_codes(X_copy, feature_names)
+            return self.predict_codes(dataset, batch_rows)
+        
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='woe_transform'):
+            X_woe = self.woe_transformer.transform_matrix(X_copy, feature_names)
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='booster_predict'):
+            return self.model.inplace_predict(X_woe)
+    
+    def predict_codes(self, dataset, batch_rows=None):
+        """
+        Dự đoán từ ma trận mã bin (BinCodedDataset), khôi phục WOE theo từng lát dòng
+        
+        Parameters:
+        -----------
+        dataset : BinCodedDataset
+            Mã bin theo đúng thứ tự đặc trưng của booster (WoeIvTransformer.transform_codes)
+        batch_rows : int, optional
+            Số dòng mỗi lát; mặc định theo feature_engineering.bin_codes.batch_rows
+            
+        Returns:
+        --------
+        ndarray
+            Xác suất mặc định
+        """
+        if self.model is None:
+            raise ValueError("Model hasn't been trained yet!")
+        if self.model.feature_names is not None and dataset.feature_names != list(self.model.feature_names):
+            dataset = dataset.select(self.model.feature_names)
+        if batch_rows is None:
+            batch_rows = self.bin_codes.get('batch_rows', 65536)
+        
+        proba = np.empty(len(dataset), dtype=np.float32)
+        for rows, X_woe in dataset.iter_woe(batch_rows):
+            with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='booster_predict'):
+                proba[rows] = self.model.inplace_predict(X_woe)
+        return proba
+    
+    def score(self, X, use_cache=True):
+        """
+        Chấm điểm dữ liệu trong một lần dự đoán duy nhất
+        
+        Parameters:
+        -----------
+        X : DataFrame
+            Dữ liệu đặc trưng
+        use_cache : bool
+            Xem predict
+            
+        Returns:
+        --------
+        ScoringResult
+            Xác suất, log-odds, điểm tín dụng và phân hạng rủi ro
+        """
+        return self.build_scoring_result(self.predict(X, use_cache=use_cache))
+    
+    def compile_fast_path(self):
+        """
+        Biên dịch đường dự đoán nhanh cho một dòng dữ liệu
+        
+        Lưu thứ tự đặc trưng của booster và bảng tra WOE của từng đặc trưng để
+        predict_one không cần tới pandas, WoeIvTransformer.transform hay DMatrix.
+        
+        Returns:
+        --------
+        self
+        """
+        if self.model is None:
+            raise ValueError("Model hasn't been trained yet!")
+        
+        feature_names = self.model.feature_names
+        if feature_names is None:
+            raise ValueError("Booster không lưu tên đặc trưng, không thể biên dịch đường dự đoán nhanh")
         
-        # Loại bỏ cột customer_id nếu có
-        if 'customer_id' in X_copy.columns:
-            X_copy = X_copy.drop(columns=['customer_id'])
+        tables = self.woe_transformer.compile_lookup_tables() if self.woe_transformer is not None else {}
+        self._fast_path = (list(feature_names), [tables.get(name) for name in feature_names])
         
-        # Chuyển đổi kiểu dữ liệu cho tất cả các cột
-        for col in X_copy.columns:
-            if X_copy[col].dtype == 'object':
-                try:
-                    X_copy[col] = pd.to_numeric(X_copy[col])
-                except:
-                    X_copy[col] = X_copy[col].astype('category')
+        return self
+    
+    def predict_one(self, features):
+        """
+        Dự đoán xác suất cho một khách hàng mà không dùng pandas
+        
+        Parameters:
+        -----------
+        features : dict hoặc array-like
+            Dict {tên đặc trưng: giá trị} (các khóa thừa như customer_id bị bỏ qua)
+            hoặc mảng giá trị theo đúng thứ tự đặc trưng của mô hình; giá trị của
+            biến số phải chuyển được sang số, nếu không sẽ gây ValueError
+            
+        Returns:
+        --------
+        float
+            Xác suất mặc định
+        """
+        if self._fast_path is None:
+            self.compile_fast_path()
+        feature_names, lookups = self._fast_path
         
-        X_woe = self.woe_transformer.transform(X_copy)
-        dmatrix = xgb.DMatrix(X_woe)
-        return self.model.predict(dmatrix)
+        if isinstance(features, dict):
+            values = [features[name] for name in feature_names]
+        else:
+            values = features
+            if len(values) != len(feature_names):
+                raise ValueError(f"Cần {len(feature_names)} đặc trưng, nhận được {len(values)}")
+        # Giá trị dạng chuỗi của biến số được chuyển sang số như đường DataFrame (pd.to_numeric)
+        values = [value if table is not None and table.dtype == 'categorical' else to_number(name, value)
+                  for name, value, table in zip(feature_names, values, lookups)]
+        
+        cache = self.prediction_cache
+        if cache is not None:
+            try:
+                keys = cache.make_keys(self.model_type, self.version, [values])
+            except (ValueError, TypeError):
+                keys = None
+            if keys is not None:
+                proba, missing = cache.get_many(keys)
+                if not missing[0]:
+                    return float(proba[0])
+        
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='woe_lookup'):
+            row = np.empty((1, len(feature_names)), dtype=np.float32)
+            for i, (value, table) in enumerate(zip(values, lookups)):
+                if table is not None:
+                    row[0, i] = table.lookup(value)
+                else:
+                    row[0, i] = value
+        
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='inplace_predict'):
+            proba = float(self.model.inplace_predict(row)[0])
+        if cache is not None and keys is not None:
+            cache.put_many(keys, [proba])
+        return proba
+    
+    def score_one(self, features):
+        """
+        Chấm điểm một khách hàng qua đường dự đoán nhanh
+        
+        Parameters:
+        -----------
+        features : dict hoặc array-like
+            Xem predict_one
+            
+        Returns:
+        --------
+        ScoringResult
+            Kết quả có độ dài 1
+        """
+        return self.build_scoring_result(np.array([self.predict_one(features)], dtype=np.float32))
+
+    def predict_matrix(self, matrix, use_cache=True):
+        """
+        Dự đoán xác suất từ ma trận giá trị theo thứ tự đặc trưng của booster
+
+        Không dùng pandas hay DMatrix: WOE được tra theo từng cột bằng bảng tra
+        đã biên dịch, ghi thẳng vào ma trận float32 rồi dự đoán bằng inplace_predict.
+        Giá trị gốc giữ ở float64 tới bước WOE để việc chia bin trùng với predict.
+
+        Parameters:
+        -----------
+        matrix : ndarray
+            Ma trận (n, số đặc trưng) theo thứ tự model.feature_names
+        use_cache : bool
+            Xem predict
+
+        Returns:
+        --------
+        ndarray
+            Xác suất mặc định (float32)
+        """
+        if self._fast_path is None:
+            self.compile_fast_path()
+        feature_names, lookups = self._fast_path
+
+        matrix = np.asarray(matrix, dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[1] != len(feature_names):
+            raise ValueError(f"Cần ma trận (n, {len(feature_names)}), nhận được {matrix.shape}")
+
+        cache = self.prediction_cache if use_cache else None
+        if cache is None:
+            return self._predict_matrix(matrix, lookups)
+
+        keys = cache.make_keys(self.model_type, self.version, matrix)
+        proba, missing = cache.get_many(keys)
+        if missing.any():
+            idx = np.flatnonzero(missing)
+            computed = self._predict_matrix(matrix[idx], lookups)
+            proba[idx] = computed
+            cache.put_many([keys[i] for i in idx], computed)
+        return proba
+
+    def _predict_matrix(self, matrix, lookups):
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='woe_lookup'):
+            woe = np.empty(matrix.shape, dtype=np.float32)
+            for i, table in enumerate(lookups):
+                woe[:, i] = table.lookup_array(matrix[:, i]) if table is not None else matrix[:, i]
+
+        with instrumentation.stage('model_stage_seconds', model=self.model_type, stage='inplace_predict'):
+            return self.model.inplace_predict(woe)
+
+    def score_matrix(self, matrix, use_cache=True):
+        """
+        Chấm điểm từ ma trận giá trị (xem predict_matrix)
+
+        Returns:
+        --------
+        ScoringResult
+        """
+        return self.build_scoring_result(self.predict_matrix(matrix, use_cache=use_cache))
+
+    def build_scoring_result(self, proba):
+        """
+        Tạo ScoringResult từ mảng xác suất đã dự đoán
+        
+        Parameters:
+        -----------
+        proba : array-like
+            Xác suất dự đoán
+            
+        Returns:
+        --------
+        ScoringResult
+        """
+        proba = np.asarray(proba)
+        proba64 = proba.astype(np.float64)
+        
+        with np.errstate(divide='ignore'):
+            log_odds = np.log(proba64) - np.log1p(-proba64)
+        
+        return ScoringResult(
+            probability=proba,
+            log_odds=log_odds,
+            score=self.scale_score(proba64),
+            tier=self.assign_tiers(proba64),
+            model_version=self.version
+        )
+    
+    def scale_score(self, proba):
+        """
+        Quy đổi xác suất thành điểm tín dụng (600-850)
+        """
+        proba = np.asarray(proba, dtype=np.float64)
+        return (600 + 250 * (1 - proba)).astype(int)
+    
+    def assign_tiers(self, proba):
+        """
+        Phân hạng rủi ro theo risk_thresholds và risk_labels của mô hình
+        """
+        idx = np.searchsorted(self.risk_thresholds, proba, side=self.risk_tier_side)
+        return np.asarray(self.risk_labels, dtype=object)[idx]
     
     def evaluate(self, X_test, y_test):
         """
@@ -278,6 +669,9 @@ class BaseXGBoostModel:
         dict
             Dictionary chứa các chỉ số hiệu suất
         """
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         y_pred_proba = self.predict(X_test)
         metrics = calculate_metrics(y_test, y_pred_proba)
         
@@ -299,10 +693,12 @@ class BaseXGBoostModel:
         plt.title('Feature Importance (Gain)')
         
         # Chỉ vẽ SHAP values nếu thư viện SHAP khả dụng
-        if SHAP_AVAILABLE:
+        shap = load_shap()
+        if shap is not None:
             plt.subplot(2, 2, 4)
             # SHAP values for top features
-            X_woe = self.woe_transformer.transform(X_test)
+            # Chỉ giữ các đặc trưng của booster (bỏ các cột đã bị sàng lọc IV loại)
+            X_woe = self.woe_transformer.transform(X_test)[self.model.feature_names]
             explainer = shap.TreeExplainer(self.model)
             shap_values = explainer.shap_values(X_woe)
             shap.summary_plot(shap_values, X_woe, plot_type='bar', show=False)
@@ -340,43 +736,58 @@ class BaseXGBoostModel:
         model_path = os.path.join(directory, f'{self.model_type}_xgb_model.json')
         self.model.save_model(model_path)
         
-        # Lưu WOE transformer
-        woe_path = os.path.join(directory, f'{self.model_type}_woe_transformer.pkl')
-        self.woe_transformer.save(woe_path)
+        # Lưu bảng tra WOE (manifest JSON + mảng .npy, không pickle)
+        woe_path = os.path.join(directory, f'{self.model_type}_woe.json')
+        self.woe_transformer.save_artifact(woe_path)
         
         # Lưu feature importance
-        importance_path = os.path.join(directory, f'{self.model_type}_feature_importance.pkl')
-        with open(importance_path, 'wb') as f:
-            pickle.dump(self.feature_importances, f)
+        importance_path = os.path.join(directory, f'{self.model_type}_feature_importance.json')
+        with open(importance_path, 'w') as f:
+            json.dump(self.feature_importances, f, indent=2)
             
         print(f"Model và các thành phần đã được lưu tại {directory}")
     
-    def load_model(self, directory=None):
+    def load_model(self, directory=None, mmap=None):
         """
         Tải mô hình
         
+        Ưu tiên artifact JSON/.npy; artifact .pkl cũ vẫn tải được (chuyển đổi
+        bằng python -m src.models.convert_artifacts).
+        
         Parameters:
         -----------
         directory : str, optional
             Thư mục chứa mô hình
+        mmap : bool, optional
+            Memory-map mảng WOE; mặc định theo model_artifacts.mmap trong config.yaml
         """
         if directory is None:
             directory = Path(__file__).parents[2] / 'models'
+        if mmap is None:
+            mmap = (self.config.get('model_artifacts', {}) or {}).get('mmap', False)
         
         # Tải mô hình XGBoost
         model_path = os.path.join(directory, f'{self.model_type}_xgb_model.json')
+        self._fast_path = None
         self.model = xgb.Booster()
         self.model.load_model(model_path)
         
-        # Tải WOE transformer
-        woe_path = os.path.join(directory, f'{self.model_type}_woe_transformer.pkl')
-        with open(woe_path, 'rb') as f:
-            self.woe_transformer = pickle.load(f)
+        # Tải bảng tra WOE
+        woe_path = os.path.join(directory, f'{self.model_type}_woe.json')
+        if os.path.exists(woe_path):
+            self.woe_transformer = WoeIvTransformer.load_artifact(woe_path, mmap=mmap)
+        else:
+            with open(os.path.join(directory, f'{self.model_type}_woe_transformer.pkl'), 'rb') as f:
+                self.woe_transformer = pickle.load(f)
         
         # Tải feature importance
-        importance_path = os.path.join(directory, f'{self.model_type}_feature_importance.pkl')
-        with open(importance_path, 'rb') as f:
-            self.feature_importances = pickle.load(f)
+        importance_path = os.path.join(directory, f'{self.model_type}_feature_importance.json')
+        if os.path.exists(importance_path):
+            with open(importance_path, 'r') as f:
+                self.feature_importances = json.load(f)
+        else:
+            with open(os.path.join(directory, f'{self.model_type}_feature_importance.pkl'), 'rb') as f:
+                self.feature_importances = pickle.load(f)
             
         print(f"Model và các thành phần đã được tải từ {directory}")
         
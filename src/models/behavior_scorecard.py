@@ -7,6 +7,20 @@ class BehaviorScorecard(BaseXGBoostModel):
     """
     Mô hình Behavior Scorecard cho khách hàng hiện tại
     """
+    # Very Low nếu xác suất < 0.05, Low < 0.15, Medium < 0.25, High < 0.4, còn lại Very High
+    risk_thresholds = (0.05, 0.15, 0.25, 0.4)
+    risk_labels = ('Very Low', 'Low', 'Medium', 'High', 'Very High')
+    risk_tier_side = 'right'
+    
+    # Hệ số điều chỉnh giới hạn và hành động theo mức rủi ro
+    limit_actions = {
+        'Very Low': (1.5, 'increase'),
+        'Low': (1.2, 'increase'),
+        'Medium': (1.0, 'maintain'),
+        'High': (0.8, 'decrease'),
+        'Very High': (0.5, 'decrease')
+    }
+    
     def __init__(self, config_path=None):
         super().__init__('behavior_scorecard', config_path)
     
@@ -47,7 +61,7 @@ class BehaviorScorecard(BaseXGBoostModel):
         
         return metrics
         
-    def recommend_credit_limit(self, customer_data, current_limit):
+    def recommend_credit_limit(self, customer_data, current_limit, scoring=None):
         """
         Đề xuất giới hạn tín dụng dựa trên mô hình hành vi
         
@@ -57,42 +71,94 @@ class BehaviorScorecard(BaseXGBoostModel):
             Dữ liệu của một khách hàng
         current_limit : float
             Giới hạn tín dụng hiện tại
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ customer_data
             
         Returns:
         --------
         dict
             Thông tin điều chỉnh giới hạn tín dụng
         """
-        proba = self.predict(customer_data)[0]
-        
-        if proba < 0.05:  # Rủi ro rất thấp
-            new_limit = current_limit * 1.5
-            change = "increase"
-        elif proba < 0.15:  # Rủi ro thấp
-            new_limit = current_limit * 1.2
-            change = "increase"
-        elif proba < 0.25:  # Rủi ro trung bình
-            new_limit = current_limit  # Giữ nguyên
-            change = "maintain"
-        elif proba < 0.4:  # Rủi ro cao
-            new_limit = current_limit * 0.8
-            change = "decrease"
-        else:  # Rủi ro rất cao
-            new_limit = current_limit * 0.5
-            change = "decrease"
+        if scoring is None:
+            scoring = self.score(customer_data)
+        
+        proba = scoring.probability[0]
+        risk_level = scoring.tier[0]
+        multiplier, change = self.limit_actions[risk_level]
         
         recommendation = {
             'probability_of_default': proba,
             'current_limit': current_limit,
-            'recommended_limit': new_limit,
+            'recommended_limit': current_limit * multiplier,
             'action': change,
-            'risk_level': 'Very Low' if proba < 0.05 else 
-                          'Low' if proba < 0.15 else 
-                          'Medium' if proba < 0.25 else 
-                          'High' if proba < 0.4 else 'Very High'
+            'risk_level': risk_level
         }
         
         return recommendation
+    
+    def recommend_credit_limits(self, customer_data, current_limits, scoring=None):
+        """
+        Đề xuất giới hạn tín dụng cho nhiều khách hàng trong một lần dự đoán
+        
+        Parameters:
+        -----------
+        customer_data : DataFrame
+            Dữ liệu của các khách hàng (mỗi dòng một khách hàng)
+        current_limits : array-like
+            Giới hạn tín dụng hiện tại của từng khách hàng
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ customer_data
+            
+        Returns:
+        --------
+        DataFrame
+            Thông tin điều chỉnh giới hạn tín dụng cho từng khách hàng,
+            cùng index với customer_data
+        """
+        if scoring is None:
+            scoring = self.score(customer_data)
+        
+        current_limits = np.asarray(current_limits, dtype=float)
+        risk_level = pd.Series(scoring.tier, index=customer_data.index)
+        multiplier = risk_level.map({k: v[0] for k, v in self.limit_actions.items()})
+        action = risk_level.map({k: v[1] for k, v in self.limit_actions.items()})
+        
+        return pd.DataFrame({
+            'probability_of_default': scoring.probability,
+            'current_limit': current_limits,
+            'recommended_limit': current_limits * multiplier.to_numpy(dtype=float),
+            'action': action,
+            'risk_level': risk_level
+        }, index=customer_data.index)
+
+    def limit_bounds(self, proba, current_limits, current_balances):
+        """
+        Khoảng hạn mức được phép cho từng khách hàng theo hệ số của hạng rủi ro
+        
+        Hạng được tăng hạn mức có thể tăng tới hệ số tối đa; hạng phải giảm có
+        thể giảm tới hệ số tối thiểu nhưng không thấp hơn dư nợ hiện tại; hạng
+        giữ nguyên không đổi. Hạn mức hiện tại luôn nằm trong khoảng.
+        
+        Parameters:
+        -----------
+        proba : ndarray
+            Xác suất vỡ nợ
+        current_limits : ndarray
+            Hạn mức hiện tại
+        current_balances : ndarray
+            Dư nợ hiện tại
+            
+        Returns:
+        --------
+        tuple
+            (hạn mức tối thiểu, hạn mức tối đa)
+        """
+        tiers = np.searchsorted(self.risk_thresholds, proba, side=self.risk_tier_side)
+        multipliers = np.asarray([self.limit_actions[label][0] for label in self.risk_labels])[tiers]
+        current_limits = np.asarray(current_limits, dtype=np.float64)
+        lower = np.minimum(np.maximum(np.minimum(multipliers, 1.0) * current_limits, current_balances), current_limits)
+        upper = np.maximum(multipliers, 1.0) * current_limits
+        return lower, upper
 
 if __name__ == "__main__":
     # Ví dụ sử dụng
@@ -7,6 +7,11 @@ class CollectionsScoring(BaseXGBoostModel):
     """
     Mô hình Collections Scoring để dự đoán khả năng tiếp tục trễ hạn
     """
+    # High nếu xác suất > 0.7, Medium nếu > 0.4, còn lại Low
+    risk_thresholds = (0.4, 0.7)
+    risk_labels = ('Low', 'Medium', 'High')
+    suggested_actions = {'Low': 'Email Reminder', 'Medium': 'Phone Call', 'High': 'Immediate Contact'}
+    
     def __init__(self, config_path=None):
         super().__init__('collections_scoring', config_path)
     
@@ -47,45 +52,142 @@ class CollectionsScoring(BaseXGBoostModel):
         
         return metrics
     
-    def prioritize_collections(self, delinquent_accounts, top_n=100):
+    def prioritize_collections(self, delinquent_accounts, top_n=100, scoring=None):
         """
         Ưu tiên các tài khoản để thu hồi nợ
         
+        Chỉ top_n tài khoản có điểm ưu tiên cao nhất được chọn (np.argpartition,
+        O(n)) và sắp xếp, không sắp xếp cả danh mục. DataFrame đầu vào không bị
+        thay đổi.
+        
         Parameters:
         -----------
         delinquent_accounts : DataFrame
             Dữ liệu của các tài khoản đang trễ hạn
         top_n : int, optional
             Số lượng tài khoản ưu tiên cao nhất cần trả về
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ delinquent_accounts
             
         Returns:
         --------
         DataFrame
-            Danh sách tài khoản được ưu tiên cho thu hồi nợ
+            Danh sách tài khoản được ưu tiên cho thu hồi nợ (điểm ưu tiên giảm
+            dần; bằng nhau thì giữ thứ tự đầu vào)
         """
-        # Dự đoán xác suất tiếp tục trễ hạn
-        delinquent_accounts['probability_further_delinquency'] = self.predict(delinquent_accounts)
+        if scoring is None:
+            scoring = self.score(delinquent_accounts)
         
-        # Tính điểm ưu tiên = xác suất * số tiền quá hạn
+        # Tính điểm ưu tiên = xác suất tiếp tục trễ hạn * số tiền quá hạn
+        proba = np.asarray(scoring.probability)
+        priority = proba.astype(np.float64)
         if 'outstanding_amount' in delinquent_accounts.columns:
-            delinquent_accounts['priority_score'] = (
-                delinquent_accounts['probability_further_delinquency'] * 
-                delinquent_accounts['outstanding_amount']
-            )
-        else:
-            delinquent_accounts['priority_score'] = delinquent_accounts['probability_further_delinquency']
-        
-        # Sắp xếp theo điểm ưu tiên giảm dần
-        prioritized = delinquent_accounts.sort_values('priority_score', ascending=False).head(top_n)
-        
-        # Thêm trạng thái hành động
-        prioritized['suggested_action'] = prioritized['probability_further_delinquency'].apply(
-            lambda p: 'Immediate Contact' if p > 0.7 else 
-                      'Phone Call' if p > 0.4 else
-                      'Email Reminder'
-        )
+            priority = priority * delinquent_accounts['outstanding_amount'].to_numpy(dtype=np.float64)
+        
+        positions = top_k_positions(priority, top_n)
+        prioritized = delinquent_accounts.iloc[positions].copy()
+        prioritized['probability_further_delinquency'] = proba[positions]
+        prioritized['priority_score'] = priority[positions]
+        prioritized['suggested_action'] = self.assign_actions(proba[positions])
         
         return prioritized
+    
+    def assign_actions(self, proba):
+        """
+        Hành động thu hồi nợ theo hạng rủi ro (bảng tra theo chỉ số, không duyệt từng dòng)
+        """
+        actions = np.asarray([self.suggested_actions[label] for label in self.risk_labels], dtype=object)
+        return actions[np.searchsorted(self.risk_thresholds, proba, side=self.risk_tier_side)]
+    
+    def prioritize_collections_stream(self, chunks, top_n=100, use_cache=False):
+        """
+        Ưu tiên thu hồi nợ cho cả danh mục, đọc theo từng chunk
+        
+        Mỗi chunk được chấm điểm và rút gọn còn top_n tài khoản, rồi gộp với
+        top_n đang giữ; bộ nhớ chỉ phụ thuộc kích thước chunk và top_n. Kết quả
+        giống prioritize_collections trên toàn bộ dữ liệu.
+        
+        Parameters:
+        -----------
+        chunks : iterable
+            Các DataFrame tài khoản (có thể có customer_id và cột thừa)
+        top_n : int
+            Số lượng tài khoản ưu tiên cao nhất cần trả về
+        use_cache : bool
+            Dùng bộ nhớ đệm dự đoán (mặc định tắt để danh mục lớn không đẩy
+            các hồ sơ đang được gửi lại ra khỏi cache)
+            
+        Returns:
+        --------
+        tuple
+            (DataFrame top_n tài khoản, index là vị trí dòng trong toàn danh mục;
+             tổng số tài khoản đã đọc)
+        """
+        feature_names = list(self.model.feature_names)
+        best = None
+        n_rows = 0
+        
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            missing = [name for name in feature_names if name not in chunk.columns]
+            if missing:
+                raise ValueError(f"Thiếu cột bắt buộc: {missing}")
+            
+            # Đánh index theo vị trí trong toàn danh mục để giữ thứ tự khi điểm bằng nhau
+            chunk = chunk.set_axis(pd.RangeIndex(n_rows, n_rows + len(chunk)), axis=0)
+            n_rows += len(chunk)
+            scoring = self.score(chunk[feature_names], use_cache=use_cache)
+            top = self.prioritize_collections(chunk, top_n=top_n, scoring=scoring)
+            
+            if best is not None:
+                top = pd.concat([best, top])
+                order = np.lexsort((top.index.to_numpy(), -top['priority_score'].to_numpy()))
+                top = top.iloc[order[:top_n]]
+            best = top
+        
+        if best is None:
+            return pd.DataFrame(), 0
+        return best, n_rows
+
+def top_k_positions(values, k):
+    """
+    Vị trí của k giá trị lớn nhất, sắp xếp giảm dần
+    
+    Dùng np.argpartition để chọn (O(n)) rồi chỉ sắp xếp k phần tử được chọn.
+    Giá trị bằng nhau giữ thứ tự xuất hiện; NaN xếp cuối.
+    
+    Parameters:
+    -----------
+    values : ndarray
+        Giá trị cần xếp hạng
+    k : int
+        Số phần tử cần lấy
+        
+    Returns:
+    --------
+    ndarray
+        Mảng vị trí (int64) có độ dài min(k, len(values))
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    k = max(min(int(k), n), 0)
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    key = np.where(np.isnan(values), -np.inf, values)
+    if k < n:
+        # Giá trị lớn thứ k; lấy mọi phần tử lớn hơn, phần còn lại lấy từ các
+        # phần tử bằng ngưỡng theo thứ tự xuất hiện
+        kth = -np.partition(-key, k - 1)[k - 1]
+        above = np.flatnonzero(key > kth)
+        ties = np.flatnonzero(key == kth)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(n)
+    
+    # candidates tăng dần theo vị trí trong từng nhóm giá trị nên sắp xếp ổn định giữ thứ tự xuất hiện
+    return candidates[np.argsort(-key[candidates], kind='stable')]
 
 if __name__ == "__main__":
     # Ví dụ sử dụng
@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import pickle
+import time
+from pathlib import Path
+
+WOE_PICKLE_SUFFIX = '_woe_transformer.pkl'
+IMPORTANCE_PICKLE_SUFFIX = '_feature_importance.pkl'
+
+def convert_directory(directory, remove_pickles=False, overwrite=False):
+    """
+    Chuyển artifact .pkl cũ trong một thư mục mô hình sang định dạng JSON/.npy
+
+    <model_type>_woe_transformer.pkl -> <model_type>_woe.json + <model_type>_woe.npy
+    <model_type>_feature_importance.pkl -> <model_type>_feature_importance.json
+
+    Việc unpickle transformer cũ cần optbinning (chỉ khi chuyển đổi); sau khi
+    chuyển, BaseXGBoostModel.load_model và ScorecardBuilder tải artifact mới.
+
+    Parameters:
+    -----------
+    directory : str
+        Thư mục chứa artifact (models/ hoặc models/<model_type>/<version>/)
+    remove_pickles : bool
+        Xóa tệp .pkl sau khi chuyển đổi thành công
+    overwrite : bool
+        Ghi đè artifact mới đã tồn tại
+
+    Returns:
+    --------
+    list
+        Các tệp đã ghi
+    """
+    directory = Path(directory)
+    written = []
+
+    for pickle_path in sorted(directory.glob(f'*{WOE_PICKLE_SUFFIX}')):
+        model_type = pickle_path.name[:-len(WOE_PICKLE_SUFFIX)]
+        artifact_path = directory / f'{model_type}_woe.json'
+        if artifact_path.exists() and not overwrite:
+            continue
+        with open(pickle_path, 'rb') as f:
+            transformer = pickle.load(f)
+        written.extend(transformer.save_artifact(artifact_path))
+        if remove_pickles:
+            os.remove(pickle_path)
+
+    for pickle_path in sorted(directory.glob(f'*{IMPORTANCE_PICKLE_SUFFIX}')):
+        model_type = pickle_path.name[:-len(IMPORTANCE_PICKLE_SUFFIX)]
+        json_path = directory / f'{model_type}_feature_importance.json'
+        if json_path.exists() and not overwrite:
+            continue
+        with open(pickle_path, 'rb') as f:
+            importances = pickle.load(f)
+        with open(json_path, 'w') as f:
+            json.dump({kind: {name: float(value) for name, value in values.items()}
+                       for kind, values in importances.items()}, f, indent=2)
+        written.append(json_path)
+        if remove_pickles:
+            os.remove(pickle_path)
+
+    return written
+
+def convert_all(root_dir=None, remove_pickles=False, overwrite=False):
+    """
+    Chuyển đổi artifact cũ trong models/ và mọi thư mục phiên bản models/<model_type>/<version>/
+    """
+    root_dir = Path(root_dir) if root_dir is not None else Path(__file__).parents[2] / 'models'
+    directories = [root_dir] + sorted(path.parent for path in root_dir.glob(f'*/*/*{WOE_PICKLE_SUFFIX}'))
+    written = []
+    for directory in directories:
+        written.extend(convert_directory(directory, remove_pickles=remove_pickles, overwrite=overwrite))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Chuyển artifact .pkl của mô hình sang JSON/.npy')
+    parser.add_argument('--models-dir', default=None, help='Thư mục gốc của artifact (mặc định models/)')
+    parser.add_argument('--remove-pickles', action='store_true', help='Xóa tệp .pkl sau khi chuyển đổi')
+    parser.add_argument('--overwrite', action='store_true', help='Ghi đè artifact mới đã tồn tại')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = convert_all(args.models_dir, remove_pickles=args.remove_pickles, overwrite=args.overwrite)
+    for path in written:
+        print(f"Đã ghi {path}")
+    print(f"Đã chuyển đổi {len(written)} tệp ({time.perf_counter() - start:.2f} giây)")
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,17 @@ class DesertionScoring(BaseXGBoostModel):
     """
     Mô hình Desertion Scoring để dự đoán khả năng khách hàng từ bỏ sau khi trả hết nợ
     """
+    # Low nếu xác suất <= 0.3, Medium nếu <= 0.6, còn lại High
+    risk_thresholds = (0.3, 0.6)
+    risk_labels = ('Low', 'Medium', 'High')
+    retention_strategies = {
+        'Low': 'Standard follow-up - Email renewal options',
+        'Medium': 'Proactive outreach - Special renewal offer',
+        'High': 'Priority retention - Personal call and premium incentives'
+    }
+    discount_thresholds = (0.3, 0.6)
+    discount_offers = ('5%', '10%', '15%')
+    
     def __init__(self, config_path=None):
         super().__init__('desertion_scoring', config_path)
     
@@ -47,45 +58,51 @@ class DesertionScoring(BaseXGBoostModel):
         
         return metrics
     
-    def create_retention_strategy(self, customer_data):
+    def create_retention_strategy(self, customer_data, scoring=None):
         """
         Tạo chiến lược giữ chân cho khách hàng có nguy cơ từ bỏ
         
         Parameters:
         -----------
         customer_data : DataFrame
-            Dữ liệu của khách hàng
+            Dữ liệu của khách hàng (không bị thay đổi)
+        scoring : ScoringResult, optional
+            Kết quả chấm điểm đã có; nếu None sẽ dự đoán từ customer_data
             
         Returns:
         --------
         DataFrame
-            Khách hàng với chiến lược giữ chân
+            Bản sao của customer_data kèm chiến lược giữ chân
         """
-        # Dự đoán xác suất từ bỏ
-        customer_data['desertion_probability'] = self.predict(customer_data)
+        if scoring is None:
+            scoring = self.score(customer_data)
         
-        # Phân loại theo mức độ rủi ro
-        customer_data['risk_tier'] = pd.cut(
-            customer_data['desertion_probability'],
-            bins=[0, 0.3, 0.6, 1.0],
-            labels=['Low', 'Medium', 'High']
-        )
+        strategy = customer_data.copy()
         
-        # Chiến lược dựa trên phân loại rủi ro
-        strategies = {
-            'Low': 'Standard follow-up - Email renewal options',
-            'Medium': 'Proactive outreach - Special renewal offer',
-            'High': 'Priority retention - Personal call and premium incentives'
-        }
+        # Xác suất từ bỏ và phân loại theo mức độ rủi ro
+        strategy['desertion_probability'] = scoring.probability
+        strategy['risk_tier'] = scoring.tier
         
-        customer_data['retention_strategy'] = customer_data['risk_tier'].map(strategies)
+        # Chiến lược theo hạng rủi ro và ưu đãi theo xác suất
+        strategy['retention_strategy'], strategy['discount_offer'] = self.assign_offers(scoring.probability)
         
-        # Thêm đề xuất ưu đãi dựa trên xác suất
-        customer_data['discount_offer'] = customer_data['desertion_probability'].apply(
-            lambda p: '5%' if p < 0.3 else '10%' if p < 0.6 else '15%'
-        )
+        return strategy
+    
+    def assign_offers(self, proba):
+        """
+        Chiến lược giữ chân và mức ưu đãi cho từng xác suất từ bỏ (bảng tra theo chỉ số)
         
-        return customer_data
+        Returns:
+        --------
+        tuple
+            (mảng chiến lược, mảng mức ưu đãi)
+        """
+        proba = np.asarray(proba)
+        tiers = np.searchsorted(self.risk_thresholds, proba, side=self.risk_tier_side)
+        strategies = np.asarray([self.retention_strategies[label] for label in self.risk_labels], dtype=object)
+        # Ưu đãi 5% nếu xác suất < 0.3, 10% nếu < 0.6, còn lại 15%
+        offers = np.asarray(self.discount_offers, dtype=object)
+        return strategies[tiers], offers[np.searchsorted(self.discount_thresholds, proba, side='right')]
 
 if __name__ == "__main__":
     # Ví dụ sử dụng
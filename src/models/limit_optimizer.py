@@ -0,0 +1,282 @@
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .parallel_scoring import load_model, map_chunks
+
+MODEL_TYPE = 'behavior_scorecard'
+
+# Tham số kinh tế và ngân sách mặc định (ghi đè trong mục credit_limit_optimizer của config.yaml)
+DEFAULT_PARAMS = {
+    'margin_rate': 0.18,      # Lãi/phí trên dư nợ sử dụng
+    'lgd': 0.85,              # Tỷ lệ tổn thất khi vỡ nợ
+    'ccf': 0.5,               # Tỷ lệ phần hạn mức chưa dùng bị rút thêm trước khi vỡ nợ
+    'exposure_budget': 1.05,  # Tổng hạn mức tối đa, tính theo tổng hạn mức hiện tại
+    'loss_budget': 1.0,       # Tổn thất kỳ vọng tối đa, tính theo tổn thất kỳ vọng hiện tại
+    'limit_step': 100,        # Hạn mức mới được làm tròn xuống theo bước này (0 = không làm tròn)
+}
+
+def load_optimizer_config():
+    """
+    Mục credit_limit_optimizer trong config.yaml
+    """
+    with open(Path(__file__).parents[2] / 'config.yaml', 'r') as file:
+        return (yaml.safe_load(file) or {}).get('credit_limit_optimizer', {}) or {}
+
+def score_chunk(model, chunk_id, chunk):
+    """
+    Chấm điểm một chunk và chỉ giữ các cột cần cho tối ưu hạn mức
+
+    Returns:
+    --------
+    dict
+        customer_id, probability, current_limit, current_balance, utilization (mảng numpy)
+    """
+    feature_names = list(model.model.feature_names)
+    missing = [name for name in feature_names if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Thiếu cột bắt buộc: {missing}")
+
+    scoring = model.score(chunk[feature_names], use_cache=False)
+    if 'customer_id' in chunk.columns:
+        customer_ids = chunk['customer_id'].to_numpy(dtype=object)
+    else:
+        customer_ids = chunk.index.to_numpy()
+    return {
+        'customer_id': customer_ids,
+        'probability': scoring.probability.astype(np.float64),
+        'current_limit': chunk['current_limit'].to_numpy(dtype=np.float64),
+        'current_balance': chunk['current_balance'].to_numpy(dtype=np.float64),
+        'utilization': np.clip(chunk['average_utilization'].to_numpy(dtype=np.float64), 0.0, 1.0)
+    }
+
+def account_economics(probability, utilization, margin_rate, lgd, ccf):
+    """
+    Biên lợi nhuận kỳ vọng và tổn thất kỳ vọng trên mỗi đơn vị hạn mức
+
+    Dư nợ sử dụng = utilization * hạn mức; dư nợ khi vỡ nợ (EAD) cộng thêm
+    ccf phần hạn mức chưa dùng. Biên lợi nhuận đã trừ tổn thất kỳ vọng.
+
+    Returns:
+    --------
+    tuple
+        (biên lợi nhuận, tổn thất kỳ vọng) trên một đơn vị hạn mức
+    """
+    ead = utilization + ccf * (1.0 - utilization)
+    loss = probability * lgd * ead
+    margin = (1.0 - probability) * margin_rate * utilization - loss
+    return margin, loss
+
+def allocate_limits(margin, loss, lower, upper, exposure_budget, loss_budget, limit_step=0,
+                    tol=1e-6, max_iter=60):
+    """
+    Phân bổ hạn mức: tối đa hóa biên lợi nhuận với trần tổng hạn mức và tổn thất kỳ vọng
+
+    Bài toán tuyến tính có chặn theo từng khách hàng được giải bằng nới lỏng
+    Lagrange: với nhân tử mu của ràng buộc tổn thất, mỗi đơn vị hạn mức thêm
+    của khách hàng i có giá trị margin_i - mu * loss_i; phần hạn mức còn lại
+    được phân tham lam theo giá trị giảm dần cho tới hết ngân sách hạn mức.
+    mu được tìm bằng chia đôi (tổn thất giảm dần theo mu); khi ràng buộc tổn
+    thất chặt, hai lời giải ở hai đầu khoảng chia đôi cuối cùng được trộn để
+    dùng vừa đúng ngân sách tổn thất. Mỗi lần lặp chỉ là một lần sắp xếp nên
+    chạy được với hàng triệu tài khoản.
+
+    Parameters:
+    -----------
+    margin, loss : ndarray
+        Biên lợi nhuận và tổn thất kỳ vọng trên mỗi đơn vị hạn mức
+    lower, upper : ndarray
+        Khoảng hạn mức được phép của từng khách hàng
+    exposure_budget : float
+        Tổng hạn mức tối đa
+    loss_budget : float
+        Tổng tổn thất kỳ vọng tối đa
+    limit_step : float
+        Phần hạn mức tăng thêm được làm tròn xuống theo bước này
+
+    Returns:
+    --------
+    tuple
+        (hạn mức đề xuất, dict thông tin lời giải: trạng thái và các nhân tử)
+    """
+    limits = lower.astype(np.float64).copy()
+    room_exposure = exposure_budget - limits.sum()
+    room_loss = loss_budget - (loss * limits).sum()
+    if room_exposure < 0 or room_loss < 0:
+        # Ngay cả khi mọi khách hàng ở mức tối thiểu vẫn vượt ngân sách
+        return limits, {'status': 'infeasible', 'loss_multiplier': None, 'exposure_multiplier': None}
+
+    headroom = upper - limits
+
+    def fill(mu):
+        value = margin - mu * loss
+        candidates = np.flatnonzero((value > 0) & (headroom > 0))
+        order = candidates[np.argsort(-value[candidates], kind='stable')]
+        filled = np.cumsum(headroom[order])
+        k = int(np.searchsorted(filled, room_exposure, side='right'))
+        extra = np.zeros_like(headroom)
+        extra[order[:k]] = headroom[order[:k]]
+        if k < len(order):
+            # Tài khoản biên nhận phần ngân sách còn lại; giá trị của nó là giá bóng của ngân sách hạn mức
+            extra[order[k]] = room_exposure - (filled[k - 1] if k else 0.0)
+            return extra, float(value[order[k]])
+        return extra, 0.0
+
+    mu = 0.0
+    extra, lam = fill(mu)
+    if (loss * extra).sum() > room_loss:
+        # Với mu >= max(margin / loss) không tài khoản có tổn thất nào còn giá trị dương nên luôn khả thi
+        positive = loss > 0
+        lo, hi = 0.0, float(np.max(margin[positive] / loss[positive]))
+        extra_lo = extra
+        extra, lam = fill(hi)
+        for _ in range(max_iter):
+            mid = (lo + hi) / 2
+            extra_mid, lam_mid = fill(mid)
+            if (loss * extra_mid).sum() > room_loss:
+                lo, extra_lo = mid, extra_mid
+            else:
+                hi, extra, lam = mid, extra_mid, lam_mid
+            if hi - lo <= tol * max(hi, 1.0):
+                break
+        mu = hi
+
+        # Tại mu tối ưu lời giải của Lagrangian không duy nhất: trộn hai lời giải
+        # hai phía (lo vượt, hi chưa dùng hết ngân sách tổn thất) sao cho dùng vừa
+        # đúng ngân sách tổn thất; cả hai đều thỏa ngân sách hạn mức nên tổ hợp lồi
+        # cũng vậy
+        loss_lo, loss_hi = (loss * extra_lo).sum(), (loss * extra).sum()
+        if loss_lo > loss_hi:
+            theta = (room_loss - loss_hi) / (loss_lo - loss_hi)
+            extra = extra + theta * (extra_lo - extra)
+
+    if limit_step:
+        # Tài khoản được cấp đủ khoảng (ví dụ giữ lại hạn mức hiện tại) không bị làm tròn
+        extra = np.where(extra >= headroom, headroom, np.floor(extra / limit_step) * limit_step)
+    limits += extra
+    return limits, {'status': 'optimal', 'loss_multiplier': mu, 'exposure_multiplier': lam}
+
+def optimize_portfolio(input_path, output_dir=None, chunk_size=100000, workers=None, params=None, version=None):
+    """
+    Tối ưu hạn mức tín dụng cho toàn bộ danh mục khách hàng hiện tại
+
+    Tệp đầu vào được đọc một lần theo chunk và chấm điểm song song trên nhiều
+    tiến trình; chỉ giữ lại vài mảng số cho mỗi tài khoản. Sau đó bài toán phân
+    bổ (xem allocate_limits) được giải trên toàn danh mục và kết quả được ghi ra
+    recommendations.csv cùng summary.json.
+
+    Parameters:
+    -----------
+    input_path : str
+        Tệp CSV khách hàng (customer_id và các đặc trưng của mô hình behavior)
+    output_dir : str, optional
+        Thư mục kết quả (mặc định results/limit_optimization/<thời điểm>)
+    chunk_size : int
+        Số dòng mỗi chunk
+    workers : int, optional
+        Số tiến trình worker (None hoặc 0 = số lõi CPU; 1 = chạy trong tiến trình hiện tại)
+    params : dict, optional
+        Ghi đè DEFAULT_PARAMS
+    version : str, optional
+        Phiên bản mô hình (mặc định phiên bản đang hoạt động)
+
+    Returns:
+    --------
+    dict
+        Tóm tắt (cũng được ghi vào summary.json)
+    """
+    start = time.perf_counter()
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    if output_dir is None:
+        output_dir = Path(__file__).parents[2] / 'results/limit_optimization' / f"{datetime.now():%Y%m%d_%H%M%S}"
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    model = load_model(MODEL_TYPE, version)
+    parts = list(map_chunks(score_chunk, model, pd.read_csv(input_path, chunksize=chunk_size), workers))
+    if not parts:
+        raise ValueError(f"Tệp {input_path} không có dữ liệu")
+    accounts = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    del parts
+    scoring_s = time.perf_counter() - start
+
+    current = accounts['current_limit']
+    margin, loss = account_economics(accounts['probability'], accounts['utilization'],
+                                     params['margin_rate'], params['lgd'], params['ccf'])
+    lower, upper = model.limit_bounds(accounts['probability'], current, accounts['current_balance'])
+    exposure_budget = params['exposure_budget'] * current.sum()
+    loss_budget = params['loss_budget'] * (loss * current).sum()
+    limits, solution = allocate_limits(margin, loss, lower, upper, exposure_budget, loss_budget,
+                                       limit_step=params['limit_step'])
+
+    actions = np.asarray(['decrease', 'maintain', 'increase'], dtype=object)[np.sign(limits - current).astype(int) + 1]
+    tiers = model.assign_tiers(accounts['probability'])
+    recommendations = pd.DataFrame({
+        'customer_id': accounts['customer_id'],
+        'probability_of_default': accounts['probability'],
+        'risk_level': tiers,
+        'current_balance': accounts['current_balance'],
+        'current_limit': current,
+        'recommended_limit': limits,
+        'action': actions,
+        'expected_margin': margin * limits,
+        'expected_loss': loss * limits
+    })
+    recommendations.to_csv(output_dir / 'recommendations.csv', index=False, chunksize=chunk_size)
+
+    def totals(values):
+        return {'exposure': float(values.sum()), 'expected_loss': float((loss * values).sum()),
+                'expected_margin': float((margin * values).sum())}
+
+    action_names, action_counts = np.unique(actions.astype(str), return_counts=True)
+    summary = {
+        'model_type': MODEL_TYPE,
+        'model_version': model.version,
+        'input': str(input_path),
+        'accounts': int(len(current)),
+        'params': params,
+        'budgets': {'exposure': float(exposure_budget), 'expected_loss': float(loss_budget)},
+        'current': totals(current),
+        'recommended': totals(limits),
+        'solution': solution,
+        'actions': dict(zip(action_names.tolist(), action_counts.tolist())),
+        'workers': workers,
+        'scoring_s': round(scoring_s, 3),
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'created_at': datetime.now().isoformat(timespec='seconds')
+    }
+    with open(output_dir / 'summary.json', 'w') as file:
+        json.dump(summary, file, indent=2, ensure_ascii=False)
+    return summary
+
+def main():
+    config = load_optimizer_config()
+    parser = argparse.ArgumentParser(description='Tối ưu hạn mức tín dụng toàn danh mục')
+    parser.add_argument('--input', default=config.get('input', 'data/raw/behavior_data.csv'),
+                        help='Tệp CSV khách hàng')
+    parser.add_argument('--output-dir', default=None,
+                        help='Thư mục kết quả (mặc định results/limit_optimization/<thời điểm>)')
+    parser.add_argument('--chunk-size', type=int, default=config.get('chunk_size', 100000))
+    parser.add_argument('--workers', type=int, default=config.get('workers'),
+                        help='Số tiến trình worker (0 = số lõi CPU, 1 = chạy trong tiến trình hiện tại; mặc định số lõi CPU)')
+    for name, value in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=config.get(name, value))
+    parser.add_argument('--version', default=None, help='Phiên bản mô hình (mặc định phiên bản đang hoạt động)')
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) for name in DEFAULT_PARAMS}
+    summary = optimize_portfolio(args.input, args.output_dir, chunk_size=args.chunk_size,
+                                 workers=args.workers, params=params, version=args.version)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import collections
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# Mô hình của tiến trình worker (tải một lần trong initializer)
+_worker_model = None
+
+def load_model(model_type, version=None):
+    """
+    Tải một mô hình từ registry (phiên bản chỉ định hoặc phiên bản đang hoạt động)
+    """
+    # Import muộn để các module chỉ cần map_ordered (prebinning WOE) không phải tải registry
+    from .registry import LEGACY_VERSION, ModelRegistry
+
+    registry = ModelRegistry(model_types=[model_type])
+    if version is None:
+        version = registry.read_manifest(model_type).get('active_version') or LEGACY_VERSION
+    return registry.load_version(model_type, version)
+
+def _init_worker(model_type, version):
+    global _worker_model
+    _worker_model = load_model(model_type, version)
+    # Mỗi worker chỉ dùng một luồng XGBoost để các tiến trình không tranh CPU
+    _worker_model.model.set_param({'nthread': 1})
+
+def _call_in_worker(func, indexed_chunk):
+    chunk_id, chunk = indexed_chunk
+    return func(_worker_model, chunk_id, chunk)
+
+def map_ordered(func, items, workers=None, initializer=None, initargs=()):
+    """
+    Áp dụng func(item) cho từng phần tử trên nhiều tiến trình
+
+    Chỉ có tối đa 2 phần tử mỗi worker đang xử lý nên bộ nhớ không phụ thuộc kích
+    thước đầu vào; kết quả được trả về theo thứ tự phần tử.
+
+    Parameters:
+    -----------
+    func : callable
+        Hàm cấp module (pickle được; dùng functools.partial để truyền thêm tham số)
+    items : iterable
+        Các phần tử đầu vào (đọc dần, không nạp hết vào bộ nhớ)
+    workers : int, optional
+        Số tiến trình worker (None hoặc 0 = số lõi CPU; 1 = chạy trong tiến trình hiện tại)
+    initializer : callable, optional
+        Hàm chạy một lần khi mỗi worker khởi động
+    initargs : tuple
+        Tham số của initializer
+
+    Yields:
+    -------
+    Kết quả của func cho từng phần tử
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for item in items:
+            yield func(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = collections.deque()
+        for item in items:
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+
+def map_chunks(func, model, chunks, workers=None):
+    """
+    Áp dụng func(model, chunk_id, chunk) cho từng chunk trên nhiều tiến trình
+
+    Mỗi worker tải cùng phiên bản với model một lần khi khởi động; các chunk được
+    phân phối qua map_ordered nên kết quả được trả về theo thứ tự chunk.
+
+    Parameters:
+    -----------
+    func : callable
+        Hàm cấp module (pickle được; dùng functools.partial để truyền thêm tham số)
+    model : BaseXGBoostModel
+        Mô hình đã tải trong tiến trình hiện tại (dùng luôn khi workers = 1)
+    chunks : iterable
+        Các DataFrame đầu vào
+    workers : int, optional
+        Số tiến trình worker (None hoặc 0 = số lõi CPU; 1 = chạy trong tiến trình hiện tại)
+
+    Yields:
+    -------
+    Kết quả của func cho từng chunk
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk_id, chunk in enumerate(chunks):
+            yield func(model, chunk_id, chunk)
+        return
+
+    yield from map_ordered(partial(_call_in_worker, func), enumerate(chunks), workers,
+                           _init_worker, (model.model_type, model.version))
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+class PredictionCache:
+    """
+    Bộ nhớ đệm xác suất dự đoán theo vector đặc trưng
+
+    Khóa gồm loại mô hình, phiên bản mô hình và giá trị băm chuẩn hóa của vector
+    đặc trưng (theo thứ tự đặc trưng của booster), nên cùng một hồ sơ gửi lại
+    nhiều lần chỉ phải tính WOE và dự đoán XGBoost một lần. Số phần tử bị giới
+    hạn (loại bỏ phần tử ít dùng nhất - LRU) và mỗi phần tử hết hạn sau ttl_seconds.
+    """
+    def __init__(self, max_size=100000, ttl_seconds=900.0):
+        """
+        Parameters:
+        -----------
+        max_size : int
+            Số phần tử tối đa
+        ttl_seconds : float
+            Thời gian sống của một phần tử (giây); None hoặc 0 = không hết hạn
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+
+        self._lock = threading.Lock()
+        # khóa -> (xác suất, thời điểm hết hạn)
+        self._entries = OrderedDict()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def make_keys(model_type, model_version, matrix):
+        """
+        Tạo khóa cho từng dòng của ma trận đặc trưng
+
+        Giá trị được chuẩn hóa về float64 (35 và 35.0 cho cùng khóa, -0.0 thành
+        0.0, mọi NaN như nhau) trước khi băm.
+
+        Parameters:
+        -----------
+        model_type : str
+            Loại mô hình
+        model_version : str
+            Phiên bản mô hình
+        matrix : array-like
+            Ma trận (n, số đặc trưng) theo thứ tự đặc trưng của mô hình
+
+        Returns:
+        --------
+        list
+            Danh sách khóa, mỗi dòng một khóa
+        """
+        matrix = np.array(matrix, dtype=np.float64, ndmin=2) + 0.0
+        matrix[np.isnan(matrix)] = np.nan
+        matrix = np.ascontiguousarray(matrix)
+        return [(model_type, model_version, hashlib.blake2b(row.tobytes(), digest_size=16).digest())
+                for row in matrix]
+
+    def get_many(self, keys):
+        """
+        Tra cứu nhiều khóa
+
+        Returns:
+        --------
+        tuple
+            (mảng xác suất float32, mặt nạ boolean các dòng không có trong cache)
+        """
+        values = np.zeros(len(keys), dtype=np.float32)
+        missing = np.ones(len(keys), dtype=bool)
+        now = time.monotonic()
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[1] is not None and entry[1] < now:
+                    del self._entries[key]
+                    self._expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                values[i] = entry[0]
+                missing[i] = False
+
+            n_hits = len(keys) - int(missing.sum())
+            self._hits += n_hits
+            self._misses += len(keys) - n_hits
+
+        return values, missing
+
+    def put_many(self, keys, values):
+        """
+        Lưu xác suất cho nhiều khóa, loại bỏ phần tử ít dùng nhất khi đầy
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            for key, value in zip(keys, values):
+                self._entries[key] = (float(value), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, model_type=None):
+        """
+        Xóa các phần tử của một loại mô hình (hoặc toàn bộ nếu model_type=None)
+        """
+        with self._lock:
+            if model_type is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                stale = [key for key in self._entries if key[0] == model_type]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+            self._invalidations += removed
+        return removed
+
+    def stats(self):
+        """
+        Bộ đếm hit/miss/eviction và kích thước hiện tại
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations
+            }
@@ -0,0 +1,385 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .application_scorecard import ApplicationScorecard
+from .behavior_scorecard import BehaviorScorecard
+from .collections_scoring import CollectionsScoring
+from .desertion_scoring import DesertionScoring
+
+MODEL_CLASSES = {
+    'application_scorecard': ApplicationScorecard,
+    'behavior_scorecard': BehaviorScorecard,
+    'collections_scoring': CollectionsScoring,
+    'desertion_scoring': DesertionScoring,
+}
+
+# Phiên bản của các artifact cũ lưu phẳng trong thư mục models/
+LEGACY_VERSION = 'legacy'
+
+class ModelRegistry:
+    """
+    Quản lý các phiên bản mô hình đã lưu và phiên bản đang phục vụ
+
+    Mỗi phiên bản nằm trong models/<model_type>/<version>/ (cùng các tệp mà
+    BaseXGBoostModel.save_model tạo ra), kèm models/<model_type>/manifest.json
+    ghi danh sách phiên bản và phiên bản đang hoạt động. Phiên bản mới được tải
+    và chạy thử ở luồng nền rồi mới hoán đổi; phiên bản trước vẫn được giữ trong
+    bộ nhớ để rollback tức thì.
+    """
+    def __init__(self, root_dir=None, config_path=None, model_types=None):
+        """
+        Parameters:
+        -----------
+        root_dir : str, optional
+            Thư mục gốc chứa artifact (mặc định models/)
+        config_path : str, optional
+            Đường dẫn đến file cấu hình truyền cho các mô hình
+        model_types : list, optional
+            Các loại mô hình được quản lý (mặc định cả bốn mô hình)
+        """
+        self.root_dir = Path(root_dir) if root_dir is not None else Path(__file__).parents[2] / 'models'
+        self.config_path = config_path
+        self.model_types = list(model_types or MODEL_CLASSES)
+
+        # Số luồng XGBoost của mọi mô hình được tải (None = mặc định của xgboost), xem set_nthread
+        self.nthread = None
+
+        self._lock = threading.Lock()
+        self._active = {}
+        self._previous = {}
+        self._loading = {}
+        self._errors = {}
+        self._listeners = []
+        self._watcher = None
+
+    # ------------------------------------------------------------------
+    # Manifest và artifact
+    # ------------------------------------------------------------------
+    def _manifest_path(self, model_type):
+        return self.root_dir / model_type / 'manifest.json'
+
+    def read_manifest(self, model_type):
+        """
+        Đọc manifest của một loại mô hình (trả về manifest rỗng nếu chưa có)
+        """
+        path = self._manifest_path(model_type)
+        if not path.exists():
+            return {'model_type': model_type, 'active_version': None, 'versions': []}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self, model_type, manifest):
+        path = self._manifest_path(model_type)
+        os.makedirs(path.parent, exist_ok=True)
+        # Ghi ra tệp tạm rồi đổi tên để các tiến trình khác không đọc phải tệp dở dang
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _version_dir(self, model_type, version):
+        if version == LEGACY_VERSION:
+            return self.root_dir
+        return self.root_dir / model_type / version
+
+    def list_versions(self, model_type):
+        """
+        Danh sách phiên bản đã lưu của một loại mô hình
+        """
+        versions = [entry['version'] for entry in self.read_manifest(model_type)['versions']]
+        legacy_model = self.root_dir / f'{model_type}_xgb_model.json'
+        if legacy_model.exists():
+            versions.insert(0, LEGACY_VERSION)
+        return versions
+
+    def publish(self, model, version=None, metrics=None, set_active=True):
+        """
+        Lưu một mô hình đã huấn luyện thành phiên bản mới
+
+        Parameters:
+        -----------
+        model : BaseXGBoostModel
+            Mô hình đã huấn luyện
+        version : str, optional
+            Tên phiên bản (mặc định theo thời gian, ví dụ 20250101-120000)
+        metrics : dict, optional
+            Metrics đánh giá lưu kèm trong manifest
+        set_active : bool
+            Ghi phiên bản này làm phiên bản hoạt động trong manifest. Tiến trình
+            API đang chạy sẽ nhận phiên bản mới qua watch() hoặc activate().
+
+        Returns:
+        --------
+        str
+            Tên phiên bản đã lưu
+        """
+        model_type = model.model_type
+        manifest = self.read_manifest(model_type)
+        existing = {entry['version'] for entry in manifest['versions']}
+
+        if version is None:
+            version = datetime.now().strftime('%Y%m%d-%H%M%S')
+            base, suffix = version, 1
+            while version in existing:
+                version = f'{base}-{suffix}'
+                suffix += 1
+        elif version in existing or version == LEGACY_VERSION:
+            raise ValueError(f"Phiên bản {version} của {model_type} đã tồn tại")
+
+        model.save_model(self._version_dir(model_type, version))
+
+        manifest['versions'].append({
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'metrics': {k: float(v) for k, v in (metrics or {}).items()
+                        if isinstance(v, (int, float, np.integer, np.floating))}
+        })
+        if set_active:
+            manifest['active_version'] = version
+        self._write_manifest(model_type, manifest)
+
+        model.version = version
+        return version
+
+    # ------------------------------------------------------------------
+    # Tải, chạy thử và hoán đổi
+    # ------------------------------------------------------------------
+    def load_version(self, model_type, version):
+        """
+        Tải và chạy thử (warm up) một phiên bản, chưa đưa vào phục vụ
+
+        Returns:
+        --------
+        BaseXGBoostModel
+        """
+        if version not in self.list_versions(model_type):
+            raise ValueError(f"Không tìm thấy phiên bản {version} của {model_type}")
+
+        model = MODEL_CLASSES[model_type](self.config_path)
+        model.load_model(self._version_dir(model_type, version))
+        model.version = version
+        if self.nthread is not None:
+            model.model.set_param({'nthread': self.nthread})
+        self.warm_up(model)
+        return model
+
+    def set_nthread(self, nthread):
+        """
+        Đặt số luồng XGBoost cho các mô hình đang giữ và mọi phiên bản tải sau này
+        (kể cả phiên bản được hoán đổi nóng trong worker)
+        """
+        with self._lock:
+            self.nthread = nthread
+            models = list(self._active.values()) + list(self._previous.values())
+        for model in models:
+            model.model.set_param({'nthread': nthread})
+
+    @staticmethod
+    def warm_up(model):
+        """
+        Chạy thử mô hình trên một dòng giả để biên dịch đường dự đoán nhanh và
+        khởi tạo bộ nhớ đệm của booster trước khi nhận yêu cầu thật
+        """
+        feature_names = model.model.feature_names
+        model.compile_fast_path()
+        model.predict_one(np.zeros(len(feature_names)))
+        model.score(pd.DataFrame(np.zeros((2, len(feature_names))), columns=feature_names))
+
+    def _swap(self, model_type, model):
+        """
+        Đưa mô hình vào phục vụ; phiên bản đang chạy trở thành phiên bản trước
+        """
+        with self._lock:
+            current = self._active.get(model_type)
+            if current is not None and current is not model:
+                self._previous[model_type] = current
+            self._active[model_type] = model
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(model_type, model)
+
+    def activate(self, model_type, version, background=True, persist=True):
+        """
+        Chuyển sang phục vụ một phiên bản
+
+        Nếu phiên bản trùng với phiên bản trước (còn trong bộ nhớ) thì hoán đổi
+        ngay; nếu không thì tải và chạy thử (ở luồng nền nếu background=True)
+        rồi mới hoán đổi. Các yêu cầu đang xử lý vẫn giữ tham chiếu tới mô hình
+        cũ nên không bị gián đoạn.
+
+        Parameters:
+        -----------
+        model_type : str
+            Loại mô hình
+        version : str
+            Phiên bản cần phục vụ
+        background : bool
+            Tải ở luồng nền và trả về ngay
+        persist : bool
+            Ghi phiên bản vào manifest (sau khi hoán đổi thành công) để các tiến
+            trình khác cùng chuyển theo
+
+        Returns:
+        --------
+        str
+            'active', 'swapped' hoặc 'loading'
+        """
+        # Kiểm tra và đánh dấu đang tải trong cùng một lần giữ khóa để hai lần
+        # activate đồng thời không cùng tải một loại mô hình
+        with self._lock:
+            if model_type in self._loading:
+                return 'loading'
+            current = self._active.get(model_type)
+            previous = self._previous.get(model_type)
+            if current is not None and current.version == version:
+                action = 'active'
+            elif previous is not None and previous.version == version:
+                action = 'swap'
+            else:
+                if version not in self.list_versions(model_type):
+                    raise ValueError(f"Không tìm thấy phiên bản {version} của {model_type}")
+                action = 'load'
+                self._loading[model_type] = version
+
+        if action == 'active':
+            if persist:
+                self._persist_active(model_type, version)
+            return 'active'
+        if action == 'swap':
+            self._swap(model_type, previous)
+            if persist:
+                self._persist_active(model_type, version)
+            return 'swapped'
+
+        def load_and_swap():
+            # Manifest chỉ được ghi sau khi tải, chạy thử và hoán đổi thành công;
+            # phiên bản lỗi không bao giờ trở thành active_version
+            try:
+                self._swap(model_type, self.load_version(model_type, version))
+                self._errors.pop(model_type, None)
+                if persist:
+                    self._persist_active(model_type, version)
+            except Exception as e:
+                self._errors[model_type] = f"{version}: {e}"
+                print(f"Error loading {model_type} version {version}: {e}")
+            finally:
+                with self._lock:
+                    self._loading.pop(model_type, None)
+
+        if background:
+            threading.Thread(target=load_and_swap, name=f'load-{model_type}', daemon=True).start()
+            return 'loading'
+
+        load_and_swap()
+        if model_type in self._errors:
+            raise RuntimeError(self._errors[model_type])
+        return 'swapped'
+
+    def _persist_active(self, model_type, version):
+        """
+        Ghi phiên bản đang phục vụ vào manifest (để các tiến trình khác cùng chuyển theo)
+        """
+        manifest = self.read_manifest(model_type)
+        if manifest.get('active_version') != version:
+            manifest['active_version'] = version
+            self._write_manifest(model_type, manifest)
+
+    def rollback(self, model_type):
+        """
+        Quay lại phiên bản trước (đang nằm sẵn trong bộ nhớ)
+
+        Returns:
+        --------
+        str
+            Phiên bản đang phục vụ sau khi rollback
+        """
+        with self._lock:
+            previous = self._previous.get(model_type)
+        if previous is None:
+            raise ValueError(f"{model_type} không có phiên bản trước để rollback")
+
+        self.activate(model_type, previous.version, background=False)
+        return previous.version
+
+    def load_active(self):
+        """
+        Tải phiên bản hoạt động của mọi mô hình (đồng bộ, dùng khi khởi động)
+
+        Dùng active_version trong manifest nếu có, nếu không dùng artifact cũ
+        trong thư mục models/.
+        """
+        for model_type in self.model_types:
+            version = self.read_manifest(model_type).get('active_version') or LEGACY_VERSION
+            self._swap(model_type, self.load_version(model_type, version))
+        return self
+
+    def get(self, model_type):
+        """
+        Mô hình đang phục vụ của một loại (None nếu chưa tải)
+        """
+        return self._active.get(model_type)
+
+    def add_listener(self, callback):
+        """
+        Đăng ký callback(model_type, model) được gọi sau mỗi lần hoán đổi
+        """
+        self._listeners.append(callback)
+
+    # ------------------------------------------------------------------
+    # Đồng bộ giữa các tiến trình
+    # ------------------------------------------------------------------
+    def sync_with_manifest(self):
+        """
+        Chuyển sang active_version trong manifest nếu khác phiên bản đang phục vụ
+        """
+        for model_type in self.model_types:
+            version = self.read_manifest(model_type).get('active_version')
+            current = self.get(model_type)
+            if version and (current is None or current.version != version):
+                self.activate(model_type, version, background=True, persist=False)
+
+    def watch(self, interval=5.0):
+        """
+        Theo dõi manifest ở luồng nền để các tiến trình API cùng chuyển phiên bản
+        """
+        if self._watcher is not None or not interval:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.sync_with_manifest()
+                except Exception as e:
+                    print(f"Error syncing model registry: {e}")
+
+        self._watcher = threading.Thread(target=loop, name='registry-watch', daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        """
+        Trạng thái của từng loại mô hình: phiên bản đang phục vụ, phiên bản trước,
+        phiên bản đang tải và các phiên bản có sẵn
+        """
+        with self._lock:
+            status = {
+                model_type: {
+                    'active_version': getattr(self._active.get(model_type), 'version', None),
+                    'previous_version': getattr(self._previous.get(model_type), 'version', None),
+                    'loading_version': self._loading.get(model_type),
+                    'last_error': self._errors.get(model_type)
+                }
+                for model_type in self.model_types
+            }
+
+        for model_type in self.model_types:
+            status[model_type]['available_versions'] = self.list_versions(model_type)
+        return status
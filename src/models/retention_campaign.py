@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from .parallel_scoring import load_model, map_chunks
+
+MODEL_TYPE = 'desertion_scoring'
+
+# Cột xuất ra tệp chiến dịch (ngoài customer_id và các đặc trưng đầu vào)
+CAMPAIGN_COLUMNS = ['desertion_probability', 'risk_tier', 'retention_strategy', 'discount_offer']
+
+def load_campaign_config():
+    """
+    Mục retention_campaign trong config.yaml
+    """
+    with open(Path(__file__).parents[2] / 'config.yaml', 'r') as file:
+        return (yaml.safe_load(file) or {}).get('retention_campaign', {}) or {}
+
+def process_chunk(output_dir, max_months_to_maturity, model, chunk_id, chunk):
+    """
+    Chọn khách hàng sắp đáo hạn, chấm điểm và ghi tệp chiến dịch theo hạng rủi ro
+
+    Parameters:
+    -----------
+    output_dir : str
+        Thư mục chiến dịch; mỗi hạng ghi vào risk_tier=<hạng>/
+    max_months_to_maturity : int, optional
+        Chỉ chọn khoản vay còn tối đa chừng này tháng tới hạn (None = tất cả)
+    model : DesertionScoring
+        Mô hình đã tải
+    chunk_id : int
+        Số thứ tự chunk (dùng đặt tên tệp part-<chunk_id>.csv)
+    chunk : DataFrame
+        Dữ liệu khách hàng
+
+    Returns:
+    --------
+    dict
+        Số dòng đọc, số dòng được chọn, số khách hàng theo hạng và theo mức ưu đãi
+    """
+    rows_read = len(chunk)
+    if max_months_to_maturity is not None:
+        chunk = chunk[chunk['months_to_maturity'].to_numpy() <= max_months_to_maturity]
+
+    counts = {'rows_read': rows_read, 'rows_selected': len(chunk), 'tiers': {}, 'offers': {}}
+    if len(chunk) == 0:
+        return counts
+
+    feature_names = list(model.model.feature_names)
+    missing = [name for name in feature_names if name not in chunk.columns]
+    if missing:
+        raise ValueError(f"Thiếu cột bắt buộc: {missing}")
+
+    scoring = model.score(chunk[feature_names], use_cache=False)
+    strategy = model.create_retention_strategy(chunk, scoring=scoring)
+    columns = [col for col in strategy.columns if col not in CAMPAIGN_COLUMNS] + CAMPAIGN_COLUMNS
+    strategy = strategy[columns]
+
+    # Tách theo hạng bằng một lần sắp xếp chỉ số hạng thay vì lọc lặp lại từng hạng
+    tier_idx = np.searchsorted(model.risk_thresholds, scoring.probability, side=model.risk_tier_side)
+    order = np.argsort(tier_idx, kind='stable')
+    bounds = np.searchsorted(tier_idx[order], np.arange(len(model.risk_labels) + 1))
+    for i, label in enumerate(model.risk_labels):
+        rows = order[bounds[i]:bounds[i + 1]]
+        if not len(rows):
+            continue
+        tier_dir = Path(output_dir) / f'risk_tier={label}'
+        tier_dir.mkdir(parents=True, exist_ok=True)
+        strategy.iloc[rows].to_csv(tier_dir / f'part-{chunk_id:05d}.csv', index=False)
+        counts['tiers'][label] = int(len(rows))
+
+    offers, offer_counts = np.unique(strategy['discount_offer'].to_numpy(dtype=str), return_counts=True)
+    counts['offers'] = dict(zip(offers.tolist(), offer_counts.tolist()))
+    return counts
+
+def merge_counts(total, counts):
+    total['rows_read'] += counts['rows_read']
+    total['rows_selected'] += counts['rows_selected']
+    for key in ('tiers', 'offers'):
+        for name, value in counts[key].items():
+            total[key][name] = total[key].get(name, 0) + value
+
+def run_campaign(input_path, output_dir=None, chunk_size=100000, workers=None,
+                 max_months_to_maturity=None, version=None):
+    """
+    Chạy chiến dịch giữ chân trên toàn bộ danh mục khoản vay sắp đáo hạn
+
+    Tệp đầu vào được đọc theo chunk; mỗi chunk được lọc, chấm điểm, gán chiến
+    lược/ưu đãi (vector hóa) và ghi ra risk_tier=<hạng>/part-<chunk>.csv trong
+    một tiến trình worker. Số chunk đang xử lý được giới hạn (2 chunk mỗi
+    worker) nên bộ nhớ không phụ thuộc kích thước tệp.
+
+    Parameters:
+    -----------
+    input_path : str
+        Tệp CSV khách hàng (customer_id và các đặc trưng của mô hình desertion)
+    output_dir : str, optional
+        Thư mục kết quả (mặc định results/campaigns/retention_<thời điểm>)
+    chunk_size : int
+        Số dòng mỗi chunk
+    workers : int, optional
+        Số tiến trình worker (None hoặc 0 = số lõi CPU; 1 = chạy trong tiến trình hiện tại)
+    max_months_to_maturity : int, optional
+        Chỉ chọn khoản vay còn tối đa chừng này tháng tới hạn
+    version : str, optional
+        Phiên bản mô hình (mặc định phiên bản đang hoạt động)
+
+    Returns:
+    --------
+    dict
+        Tóm tắt chiến dịch (cũng được ghi vào summary.json trong output_dir)
+    """
+    start = time.perf_counter()
+    if output_dir is None:
+        output_dir = Path(__file__).parents[2] / 'results/campaigns' / f"retention_{datetime.now():%Y%m%d_%H%M%S}"
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Xóa tệp của lần chạy trước trong cùng thư mục
+    for tier_dir in output_dir.glob('risk_tier=*'):
+        shutil.rmtree(tier_dir)
+
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    model = load_model(MODEL_TYPE, version)
+    chunks = pd.read_csv(input_path, chunksize=chunk_size)
+    total = {'rows_read': 0, 'rows_selected': 0, 'tiers': {}, 'offers': {}}
+    n_chunks = 0
+    for counts in map_chunks(partial(process_chunk, str(output_dir), max_months_to_maturity), model, chunks, workers):
+        merge_counts(total, counts)
+        n_chunks += 1
+
+    summary = {
+        'model_type': MODEL_TYPE,
+        'model_version': model.version,
+        'input': str(input_path),
+        'max_months_to_maturity': max_months_to_maturity,
+        'chunks': n_chunks,
+        'workers': workers,
+        **total,
+        'elapsed_s': round(time.perf_counter() - start, 3),
+        'created_at': datetime.now().isoformat(timespec='seconds')
+    }
+    with open(output_dir / 'summary.json', 'w') as file:
+        json.dump(summary, file, indent=2, ensure_ascii=False)
+    return summary
+
+def main():
+    config = load_campaign_config()
+    parser = argparse.ArgumentParser(description='Chiến dịch giữ chân khách hàng sắp đáo hạn')
+    parser.add_argument('--input', default=config.get('input', 'data/raw/desertion_data.csv'),
+                        help='Tệp CSV khách hàng')
+    parser.add_argument('--output-dir', default=None,
+                        help='Thư mục kết quả (mặc định results/campaigns/retention_<thời điểm>)')
+    parser.add_argument('--chunk-size', type=int, default=config.get('chunk_size', 100000))
+    parser.add_argument('--workers', type=int, default=config.get('workers'),
+                        help='Số tiến trình worker (0 = số lõi CPU, 1 = chạy trong tiến trình hiện tại; mặc định số lõi CPU)')
+    parser.add_argument('--max-months-to-maturity', type=int, default=config.get('max_months_to_maturity'),
+                        help='Chỉ chọn khoản vay còn tối đa chừng này tháng tới hạn')
+    parser.add_argument('--version', default=None, help='Phiên bản mô hình (mặc định phiên bản đang hoạt động)')
+    args = parser.parse_args()
+
+    summary = run_campaign(args.input, args.output_dir, chunk_size=args.chunk_size, workers=args.workers,
+                           max_months_to_maturity=args.max_months_to_maturity, version=args.version)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
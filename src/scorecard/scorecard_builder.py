@@ -53,15 +53,23 @@ class ScorecardBuilder:
         """
         model_dir = Path(__file__).parents[2] / 'models'
         
-        # Tải WOE transformer
-        woe_path = os.path.join(model_dir, f'{self.model_type}_woe_transformer.pkl')
-        with open(woe_path, 'rb') as f:
-            self.woe_transformer = pickle.load(f)
+        # Tải bảng tra WOE (artifact JSON/.npy; .pkl cũ nếu chưa chuyển đổi)
+        woe_path = os.path.join(model_dir, f'{self.model_type}_woe.json')
+        if os.path.exists(woe_path):
+            from ..features.woe_iv import WoeIvTransformer
+            self.woe_transformer = WoeIvTransformer.load_artifact(woe_path)
+        else:
+            with open(os.path.join(model_dir, f'{self.model_type}_woe_transformer.pkl'), 'rb') as f:
+                self.woe_transformer = pickle.load(f)
         
         # Tải feature importance
-        importance_path = os.path.join(model_dir, f'{self.model_type}_feature_importance.pkl')
-        with open(importance_path, 'rb') as f:
-            self.feature_importances = pickle.load(f)
+        importance_path = os.path.join(model_dir, f'{self.model_type}_feature_importance.json')
+        if os.path.exists(importance_path):
+            with open(importance_path, 'r') as f:
+                self.feature_importances = json.load(f)
+        else:
+            with open(os.path.join(model_dir, f'{self.model_type}_feature_importance.pkl'), 'rb') as f:
+                self.feature_importances = pickle.load(f)
     
     def build_scorecard_from_model(self, model, feature_bins=None):
         """
@@ -0,0 +1,315 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from bisect import bisect_left
+
+# Biên trên của các bucket (giây), từ 50 micro giây tới 5 giây
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Mô tả các nhóm metric (dòng # HELP của Prometheus)
+METRIC_HELP = {
+    'model_stage_seconds': 'Thời gian từng giai đoạn dự đoán trong mô hình',
+    'woe_feature_seconds': 'Thời gian chuyển WOE của từng đặc trưng',
+    'endpoint_stage_seconds': 'Thời gian từng giai đoạn xử lý trong endpoint',
+    'http_request_duration_seconds': 'Tổng thời gian xử lý request HTTP',
+    'admission_queue_wait_seconds': 'Thời gian chờ trong hàng đợi kiểm soát nạp',
+}
+
+class Histogram:
+    """
+    Histogram với các bucket cố định (tương thích định dạng Prometheus)
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self):
+        """
+        Số quan sát tích lũy theo từng bucket (kể cả +Inf), tổng và số lượng
+        """
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, total, count
+
+class _NullTimer:
+    """
+    Context manager không làm gì, dùng khi instrumentation bị tắt
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_TIMER = _NullTimer()
+
+class _StageTimer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class Instrumentation:
+    """
+    Thu thập histogram thời gian theo giai đoạn và xuất ở định dạng text của Prometheus
+
+    Khi enabled=False, stage() trả về một context manager rỗng dùng chung nên chi
+    phí trên đường xử lý chỉ là một lần kiểm tra cờ.
+    """
+    def __init__(self, enabled=False, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, buckets=None):
+        """
+        Bật/tắt và đổi bucket (xóa các histogram đã có nếu đổi bucket)
+        """
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if buckets is not None and tuple(buckets) != self.buckets:
+            with self._lock:
+                self.buckets = tuple(buckets)
+                self._histograms = {}
+        return self
+
+    def histogram(self, metric, **labels):
+        """
+        Histogram của một metric với bộ nhãn cho trước (tạo mới nếu chưa có)
+        """
+        key = (metric, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(self.buckets))
+        return histogram
+
+    def stage(self, metric, **labels):
+        """
+        Đo thời gian một khối lệnh
+
+        Ví dụ: with instrumentation.stage('model_stage_seconds', model=..., stage='woe_transform'):
+        """
+        if not self.enabled:
+            return NULL_TIMER
+        return _StageTimer(self.histogram(metric, **labels))
+
+    def observe(self, metric, seconds, **labels):
+        if self.enabled:
+            self.histogram(metric, **labels).observe(seconds)
+
+    def add_collector(self, collector):
+        """
+        Đăng ký hàm trả về các metric bổ sung khi xuất /metrics
+
+        collector() trả về danh sách (tên, kiểu, mô tả, [(nhãn dict, giá trị), ...])
+        """
+        self._collectors.append(collector)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def render_prometheus(self):
+        """
+        Xuất mọi histogram và metric của các collector ở định dạng text của Prometheus
+        """
+        lines = []
+
+        families = {}
+        for (metric, labels), histogram in list(self._histograms.items()):
+            families.setdefault(metric, []).append((labels, histogram))
+
+        for metric in sorted(families):
+            lines.append(f'# HELP {metric} {METRIC_HELP.get(metric, metric)}')
+            lines.append(f'# TYPE {metric} histogram')
+            for labels, histogram in sorted(families[metric], key=lambda item: item[0]):
+                cumulative, total, count = histogram.snapshot()
+                bounds = [format_float(b) for b in histogram.buckets] + ['+Inf']
+                for bound, value in zip(bounds, cumulative):
+                    lines.append(f'{metric}_bucket{format_labels(labels + (("le", bound),))} {value}')
+                lines.append(f'{metric}_sum{format_labels(labels)} {format_float(total)}')
+                lines.append(f'{metric}_count{format_labels(labels)} {count}')
+
+        for collector in self._collectors:
+            try:
+                metrics = collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, metric_type, help_text, samples in metrics:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    lines.append(f'{name}{format_labels(tuple(sorted(labels.items())))} {format_float(value)}')
+
+        return '\n'.join(lines) + '\n'
+
+def format_float(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+# Đối tượng dùng chung trong tiến trình (tắt mặc định, API bật theo config.yaml)
+instrumentation = Instrumentation()
+
+# ----------------------------------------------------------------------
+# Theo dõi theo request (API)
+# ----------------------------------------------------------------------
+class RequestTrace:
+    """
+    Mốc thời gian của một request: nhận request, vào handler, ra khỏi handler
+    """
+    __slots__ = ('scope', 'start', 'handler_start', 'handler_end', '_endpoint')
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.start = time.perf_counter()
+        self.handler_start = None
+        self.handler_end = None
+        self._endpoint = None
+
+    @property
+    def endpoint(self):
+        """
+        Mẫu đường dẫn của route (ví dụ /bulk/{model_name}/) để số nhãn không tăng theo tham số
+        """
+        if self._endpoint is None:
+            endpoint_fn = self.scope.get('endpoint')
+            app = self.scope.get('app')
+            path = None
+            if endpoint_fn is not None and app is not None:
+                for route in getattr(app, 'routes', []):
+                    if getattr(route, 'endpoint', None) is endpoint_fn:
+                        path = route.path
+                        break
+            if path is None:
+                return 'unmatched'
+            self._endpoint = path
+        return self._endpoint
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+def endpoint_stage(stage):
+    """
+    Đo thời gian một giai đoạn trong handler, gắn nhãn theo endpoint của request hiện tại
+    """
+    trace = current_trace.get()
+    if trace is None or not instrumentation.enabled:
+        return NULL_TIMER
+    return instrumentation.stage('endpoint_stage_seconds', endpoint=trace.endpoint, stage=stage)
+
+def _begin_handler():
+    trace = current_trace.get()
+    if trace is not None and trace.handler_start is None:
+        trace.handler_start = time.perf_counter()
+        # Đọc body, parse JSON, kiểm tra pydantic (và chờ threadpool với handler đồng bộ)
+        instrumentation.observe('endpoint_stage_seconds', trace.handler_start - trace.start,
+                                endpoint=trace.endpoint, stage='parse_validate')
+    return trace
+
+def _end_handler(trace):
+    if trace is not None:
+        trace.handler_end = time.perf_counter()
+
+def instrumented(handler):
+    """
+    Decorator cho handler FastAPI: ghi giai đoạn parse_validate (trước handler) và
+    đánh dấu thời điểm kết thúc handler để middleware đo giai đoạn response_encode
+    """
+    if asyncio.iscoroutinefunction(handler):
+        @functools.wraps(handler)
+        async def async_wrapper(*args, **kwargs):
+            trace = _begin_handler()
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                _end_handler(trace)
+        return async_wrapper
+
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        trace = _begin_handler()
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            _end_handler(trace)
+    return wrapper
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware đo tổng thời gian request và thời gian mã hóa response
+
+    Viết ở dạng ASGI thuần (không dùng BaseHTTPMiddleware) để không thêm task
+    hay bộ đệm cho response; khi instrumentation tắt chỉ chuyển tiếp request.
+    """
+    def __init__(self, app, instrumentation=instrumentation):
+        self.app = app
+        self.instrumentation = instrumentation
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.instrumentation.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope)
+        token = current_trace.set(trace)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                if trace.handler_end is not None:
+                    # Chuyển kết quả handler thành response (jsonable_encoder, JSON)
+                    self.instrumentation.observe('endpoint_stage_seconds',
+                                                 time.perf_counter() - trace.handler_end,
+                                                 endpoint=trace.endpoint, stage='response_encode')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_trace.reset(token)
+            self.instrumentation.observe('http_request_duration_seconds', time.perf_counter() - trace.start,
+                                         endpoint=trace.endpoint, method=scope.get('method', ''),
+                                         status=str(status[0]))
@@ -2,8 +2,6 @@ import numpy as np
 import pandas as pd
 from sklearn.metrics import roc_auc_score, roc_curve, precision_recall_curve
 from sklearn.metrics import confusion_matrix, classification_report, accuracy_score
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 def calculate_metrics(y_true, y_pred_proba, threshold=0.5):
     """
@@ -74,6 +72,8 @@ def plot_roc_curve(y_true, y_pred_proba):
     y_pred_proba : array-like
         Xác suất dự đoán
     """
+    import matplotlib.pyplot as plt
+    
     fpr, tpr, thresholds = roc_curve(y_true, y_pred_proba)
     auc = roc_auc_score(y_true, y_pred_proba)
     gini = 2 * auc - 1
@@ -97,6 +97,8 @@ def plot_ks_curve(y_true, y_pred_proba):
     y_pred_proba : array-like
         Xác suất dự đoán
     """
+    import matplotlib.pyplot as plt
+    
     # Tính toán các tỷ lệ
     fpr, tpr, thresholds = roc_curve(y_true, y_pred_proba)
     
@@ -195,6 +197,9 @@ def plot_score_distribution(scores, target, bins=50, figsize=(12, 6)):
     figsize : tuple, optional
         Kích thước của biểu đồ
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    
     plt.figure(figsize=figsize)
     
     # Tạo DataFrame
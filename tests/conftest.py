@@ -0,0 +1,69 @@
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+ROOT = Path(__file__).parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+def make_credit_frame(n=2000, seed=0, n_noise=1):
+    """
+    Dữ liệu tín dụng nhỏ sinh ngẫu nhiên: hai biến số và một biến phân loại có
+    thông tin, cùng n_noise biến nhiễu (IV gần 0, bị sàng lọc IV loại)
+    """
+    rng = np.random.default_rng(seed)
+    income = rng.lognormal(10, 0.5, n)
+    utilization = rng.uniform(0, 1, n)
+    region = rng.choice(['north', 'south', 'east', 'west'], n)
+    logit = -2 + 2.5 * utilization - 0.8 * (np.log(income) - 10) + np.where(region == 'south', 0.8, 0.0)
+    X = pd.DataFrame({'income': income, 'utilization': utilization, 'region': region})
+    for i in range(n_noise):
+        X[f'noise_{i}'] = rng.normal(size=n)
+    y = pd.Series((rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int), name='default_flag')
+    return X, y
+
+def write_small_config(directory):
+    """
+    Ghi bản sao config.yaml với mô hình nhỏ (ít cây) để huấn luyện nhanh trong test
+    """
+    with open(ROOT / 'config.yaml') as f:
+        config = yaml.safe_load(f)
+    config = copy.deepcopy(config)
+    for model_config in config['models'].values():
+        model_config['xgb_params']['n_estimators'] = 10
+    path = Path(directory) / 'config.yaml'
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+@pytest.fixture
+def config_path(tmp_path):
+    return write_small_config(tmp_path)
+
+def fit_model(model, data):
+    """
+    Huấn luyện model (BaseXGBoostModel) trên DataFrame có cột mục tiêu
+
+    Returns:
+    --------
+    tuple
+        (mô hình, X_test, y_test)
+    """
+    X_train, X_test, y_train, y_test = model.prepare_data(data)
+    X_train_woe, X_test_woe = model.transform_features(X_train, X_test, y_train)
+    model.train(X_train_woe, y_train, X_test_woe, y_test)
+    return model, X_test, y_test
+
+def train_model(config_path, n=4000, seed=0, n_noise=1):
+    """
+    Huấn luyện một ApplicationScorecard nhỏ trên make_credit_frame
+    """
+    from src.models.application_scorecard import ApplicationScorecard
+
+    X, y = make_credit_frame(n, seed, n_noise)
+    return fit_model(ApplicationScorecard(config_path), X.assign(default_flag=y))
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+import yaml
+
+from conftest import ROOT
+from api.admission import AdmissionController, AdmissionMiddleware, AdmissionRejected, ConcurrencyLimiter
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def http_scope(path, content_length=None):
+    headers = [(b'content-type', b'application/json')]
+    if content_length is not None:
+        headers.append((b'content-length', str(content_length).encode()))
+    return {'type': 'http', 'path': path, 'method': 'POST', 'headers': headers}
+
+async def call(app, scope, chunks):
+    """
+    Gọi một ứng dụng ASGI với body theo từng đoạn, trả về các message đã gửi
+    """
+    queue = list(chunks)
+    sent = []
+
+    async def receive():
+        if queue:
+            body = queue.pop(0)
+            return {'type': 'http.request', 'body': body, 'more_body': bool(queue)}
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+async def read_all_then_respond(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect' or not message.get('more_body'):
+            break
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+async def respond_while_reading(scope, receive, send):
+    # Giống /bulk/: bắt đầu stream kết quả trước khi đọc hết body
+    await receive()
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        await send({'type': 'http.response.body', 'body': b'row\n', 'more_body': True})
+        if not message.get('more_body'):
+            break
+    await send({'type': 'http.response.body', 'body': b''})
+
+def limits(**overrides):
+    return {'enabled': True, 'classes': {'batch': dict({'max_body_bytes': 10}, **overrides)}}
+
+def statuses(sent):
+    return [message['status'] for message in sent if message['type'] == 'http.response.start']
+
+def test_content_length_over_limit_is_rejected_before_reading():
+    app = AdmissionMiddleware(read_all_then_respond, AdmissionController(limits()))
+
+    sent = run(call(app, http_scope('/batch/application-score/', 100), [b'x' * 100]))
+
+    assert statuses(sent) == [413]
+
+def test_streamed_body_over_limit_is_rejected_once():
+    controller = AdmissionController(limits())
+    app = AdmissionMiddleware(read_all_then_respond, controller)
+
+    sent = run(call(app, http_scope('/batch/application-score/'), [b'x' * 6, b'x' * 6]))
+
+    assert statuses(sent) == [413]
+    assert controller.rejected_body['batch'] == 1
+
+def test_overflow_after_response_started_sends_one_start():
+    app = AdmissionMiddleware(respond_while_reading, AdmissionController(limits()))
+
+    sent = run(call(app, http_scope('/batch/application-score/'), [b'x' * 6, b'x' * 6, b'x' * 6]))
+
+    assert statuses(sent) == [200]
+    assert sent[-1] == {'type': 'http.response.body', 'body': b''}
+
+def test_unclassified_paths_are_not_limited():
+    app = AdmissionMiddleware(read_all_then_respond, AdmissionController(limits()))
+
+    sent = run(call(app, http_scope('/metrics', 100), [b'x' * 100]))
+
+    assert statuses(sent) == [200]
+
+def test_queue_full_and_queue_timeout():
+    limiter = ConcurrencyLimiter('batch', max_concurrency=1, max_queue=1, queue_timeout_ms=50, retry_after_s=5)
+
+    async def main():
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as timeout:
+            await waiting
+        limiter.release()
+        return full.value, timeout.value
+
+    full, timeout = run(main())
+    assert (full.status_code, full.reason) == (429, 'queue_full')
+    assert (timeout.status_code, timeout.reason) == (503, 'queue_timeout')
+    assert limiter.in_flight == 0 and limiter.queue_depth == 0
+
+def test_queued_request_gets_the_released_slot():
+    limiter = ConcurrencyLimiter('batch', max_concurrency=1, max_queue=4, queue_timeout_ms=1000, retry_after_s=5)
+
+    async def main():
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.01)
+        limiter.release()
+        await waiting
+        return limiter.in_flight
+
+    assert run(main()) == 1
+    assert limiter.admitted == 2 and limiter.queued == 1
+
+def test_configured_queues_can_hold_requests():
+    with open(ROOT / 'config.yaml') as f:
+        config = yaml.safe_load(f)['api']['admission']
+    controller = AdmissionController(config)
+
+    # Hàng đợi chỉ có ý nghĩa khi yêu cầu được phép chờ
+    for name, limits in controller.classes.items():
+        assert limits['max_queue'] == 0 or limits['queue_timeout_ms'] > 0, name
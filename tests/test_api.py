@@ -0,0 +1,235 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from api.request_examples import APPLICATION_EXAMPLE, BEHAVIOR_EXAMPLE
+from conftest import ROOT
+from src.data.feature_store import FeatureStore
+
+
+@pytest.fixture(scope='module')
+def main():
+    # Import muộn: api.main tải các mô hình trong models/ khi import
+    from api import main
+    return main
+
+
+@pytest.fixture(scope='module')
+def client(main):
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope='module')
+def applications():
+    return pd.read_csv(ROOT / 'data/raw/application_data.csv').head(40).drop(columns=['default_flag'])
+
+
+def columnar_body(frame, **extra):
+    return {'customer_ids': frame['customer_id'].tolist(),
+            'columns': {column: frame[column].tolist() for column in frame.columns if column != 'customer_id'},
+            **extra}
+
+
+def upload(frame, name='portfolio.csv'):
+    return {'file': (name, frame.to_csv(index=False).encode(), 'text/csv')}
+
+
+@pytest.mark.parametrize('path, example, result_key, varied', [
+    ('application-score', APPLICATION_EXAMPLE, 'risk_profile', {'age': 22, 'income': 9000}),
+    ('behavior-score', BEHAVIOR_EXAMPLE, 'credit_recommendation', {'payment_ratio': 0.1, 'number_of_late_payments': 6})
+])
+def test_batch_scores_match_single_endpoint(client, path, example, result_key, varied):
+    # Lô có một dòng trùng lặp: mỗi kết quả phải giống endpoint một khách hàng và giữ thứ tự
+    customers = [example, dict(example, customer_id='X2', **varied), dict(example, customer_id='X3')]
+    response = client.post(f'/batch/{path}/', json={'customers': customers})
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert [result['customer_id'] for result in results] == [example['customer_id'], 'X2', 'X3']
+
+    for customer, result in zip(customers, results):
+        single = client.post(f'/{path}/', json=customer).json()[result_key]
+        batch = result[result_key]
+        assert batch['probability_of_default'] == pytest.approx(single['probability_of_default'], rel=1e-6)
+        assert batch['credit_score'] == single['credit_score']
+        assert batch['risk_level'] == single['risk_level']
+    assert results[0][result_key] == results[2][result_key]
+
+
+def test_batching_stats_count_requests(client):
+    before = client.get('/batching/stats').json()['application']['requests']
+    client.post('/application-score/', json=APPLICATION_EXAMPLE)
+    stats = client.get('/batching/stats').json()['application']
+    assert stats['requests'] == before + 1
+    assert stats['queue_depth'] == 0 and stats['in_flight_batches'] == 0
+
+
+def test_bulk_streams_scores_in_file_order(client, main, applications):
+    response = client.post('/bulk/application/', files=upload(applications))
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line['customer_id'] for line in lines] == applications['customer_id'].tolist()
+
+    expected = main.get_model('application').score(applications.drop(columns=['customer_id']), use_cache=False)
+    np.testing.assert_allclose([line['probability'] for line in lines], expected.probability, rtol=1e-6)
+    assert [line['credit_score'] for line in lines] == expected.score.tolist()
+
+    as_csv = client.post('/bulk/application/?output_format=csv&gzip=true', files=upload(applications))
+    assert as_csv.status_code == 200
+    frame = pd.read_csv(io.BytesIO(gzip.decompress(as_csv.content)))
+    assert frame['customer_id'].tolist() == applications['customer_id'].tolist()
+
+
+def test_bulk_errors(client, applications):
+    assert client.post('/bulk/unknown/', files=upload(applications)).status_code == 404
+    assert client.post('/bulk/application/?output_format=xml', files=upload(applications)).status_code == 400
+    broken = applications.drop(columns=['income'])
+    assert client.post('/bulk/application/', files=upload(broken)).status_code == 400
+
+
+def test_models_endpoint_and_version_header(client):
+    models = client.get('/models/').json()
+    assert set(models) == {'application', 'behavior', 'collections', 'desertion'}
+    for path, body, name in (('/application-score/', APPLICATION_EXAMPLE, 'application'),
+                             ('/behavior-score/', BEHAVIOR_EXAMPLE, 'behavior')):
+        response = client.post(path, json=body)
+        assert response.status_code == 200
+        assert response.headers['X-Model-Version'] == response.json()['model_version']
+        assert response.json()['model_version'] == models[name]['active_version']
+    assert client.post('/models/unknown/rollback').status_code == 404
+
+
+def test_prediction_cache_serves_repeated_requests(client, main, monkeypatch):
+    from src.models.prediction_cache import PredictionCache
+    cache = PredictionCache(max_size=100, ttl_seconds=60)
+    monkeypatch.setattr(main, 'prediction_cache', cache)
+    monkeypatch.setattr(main.get_model('application'), 'prediction_cache', cache)
+
+    first = client.post('/application-score/', json=APPLICATION_EXAMPLE).json()
+    second = client.post('/application-score/', json=APPLICATION_EXAMPLE).json()
+    assert first == second
+    stats = client.get('/cache/stats').json()
+    assert stats['enabled'] and stats['misses'] == 1 and stats['hits'] == 1
+
+
+def test_score_by_id_uses_feature_store(client, main, applications, tmp_path, monkeypatch):
+    store = FeatureStore('application', root_dir=tmp_path)
+    store.append_snapshot(applications)
+    monkeypatch.setitem(main.feature_stores, 'application', store.load())
+
+    ids = applications['customer_id'].iloc[[3, 0]].tolist()
+    response = client.post('/score-by-id/application/', json={'customer_ids': ids + ['NOPE']})
+    assert response.status_code == 200
+    payload = response.json()
+    assert [result['customer_id'] for result in payload['results']] == ids
+    assert payload['not_found'] == ['NOPE']
+
+    expected = main.get_model('application').score(applications.iloc[[3, 0]].drop(columns=['customer_id']),
+                                                   use_cache=False)
+    np.testing.assert_allclose([result['probability'] for result in payload['results']],
+                               expected.probability, rtol=1e-6)
+
+    monkeypatch.delitem(main.feature_stores, 'application')
+    assert client.post('/score-by-id/application/', json={'customer_ids': ids}).status_code == 503
+
+
+def test_metrics_expose_stage_histograms(client):
+    client.post('/application-score/', json=APPLICATION_EXAMPLE)
+    metrics = client.get('/metrics')
+    assert metrics.status_code == 200
+    assert metrics.headers['content-type'].startswith('text/plain')
+    for stage in ('scoring', 'domain'):
+        assert f'endpoint_stage_seconds_count{{endpoint="/application-score/",stage="{stage}"}}' in metrics.text
+    assert 'model_stage_seconds' in metrics.text
+
+
+def test_customer_360_matches_single_model_endpoints(client):
+    from api.request_examples import CUSTOMER_360_EXAMPLE
+    response = client.post('/customer-360/', json=CUSTOMER_360_EXAMPLE)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['customer_id'] == CUSTOMER_360_EXAMPLE['customer_id']
+    # Bản ghi gộp không có income, employment_length...: application bị bỏ qua
+    assert payload['skipped_models'] == ['application'] and payload['application'] is None
+    assert set(payload['model_versions']) == {'behavior', 'collections', 'desertion'}
+
+    behavior = client.post('/behavior-score/', json={
+        field: CUSTOMER_360_EXAMPLE[field] for field in BEHAVIOR_EXAMPLE}).json()['credit_recommendation']
+    assert payload['behavior'] == behavior
+
+    only_behavior = client.post('/customer-360/?models=behavior', json=CUSTOMER_360_EXAMPLE).json()
+    assert list(only_behavior['model_versions']) == ['behavior']
+    assert only_behavior['behavior'] == behavior
+
+    second = dict(CUSTOMER_360_EXAMPLE, customer_id='X2', payment_ratio=0.1)
+    batch = client.post('/batch/customer-360/', json={'customers': [second, CUSTOMER_360_EXAMPLE]}).json()
+    assert [profile['customer_id'] for profile in batch['results']] == ['X2', CUSTOMER_360_EXAMPLE['customer_id']]
+    assert batch['results'][1]['behavior'] == behavior
+
+
+def test_admission_rejects_oversized_requests(client):
+    before = client.get('/admission/stats').json()['classes']
+    limit = before['batch']['max_batch_size']
+    columns = {field: [value] * (limit + 1) for field, value in APPLICATION_EXAMPLE.items() if field != 'customer_id'}
+    assert client.post('/columnar/application/', json={'columns': columns}).status_code == 413
+
+    padding = 'x' * before['online']['max_body_bytes']
+    assert client.post('/application-score/', json=dict(APPLICATION_EXAMPLE, customer_id=padding)).status_code == 413
+
+    after = client.get('/admission/stats').json()['classes']
+    assert after['batch']['rejected_batch_too_large'] == before['batch']['rejected_batch_too_large'] + 1
+    assert after['online']['rejected_body_too_large'] == before['online']['rejected_body_too_large'] + 1
+
+
+def test_columnar_matches_bulk_scores(client, applications):
+    columnar = client.post('/columnar/application/', json=columnar_body(applications))
+    bulk = client.post('/bulk/application/', files=upload(applications))
+
+    assert columnar.status_code == 200 and bulk.status_code == 200
+    assert bulk.headers['content-type'].startswith('application/x-ndjson')
+    lines = [json.loads(line) for line in bulk.text.splitlines()]
+    payload = columnar.json()
+    assert payload['customer_ids'] == [line['customer_id'] for line in lines]
+    np.testing.assert_allclose(payload['probability'], [line['probability'] for line in lines], rtol=1e-6)
+    assert payload['credit_score'] == [line['credit_score'] for line in lines]
+
+
+def test_columnar_rejects_or_skips_invalid_rows(client, applications):
+    frame = applications.head(5).copy()
+    frame['age'] = frame['age'].astype(object)
+    frame.loc[1, 'age'] = 10
+    frame.loc[3, 'age'] = 'abc'
+
+    rejected = client.post('/columnar/application/', json=columnar_body(frame))
+    assert rejected.status_code == 422
+    assert [error['loc'] for error in rejected.json()['detail']] == [
+        ['body', 'columns', 'age', 1], ['body', 'columns', 'age', 3]]
+
+    skipped = client.post('/columnar/application/', json=columnar_body(frame, on_error='skip'))
+    assert skipped.status_code == 200
+    payload = skipped.json()
+    assert payload['rows'] == [0, 2, 4] and payload['n_errors'] == 2
+    assert payload['customer_ids'] == frame['customer_id'].iloc[[0, 2, 4]].tolist()
+
+    mismatch = client.post('/columnar/application/', json={**columnar_body(frame), 'customer_ids': ['X']})
+    assert mismatch.status_code == 422
+
+
+def test_bulk_collections_keeps_top_n(client, main):
+    frame = pd.read_csv(ROOT / 'data/raw/collections_data.csv').head(60)
+    response = client.post('/bulk/collections/prioritize/?top_n=5&chunk_size=16', files=upload(frame))
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload['total_accounts'] == 60
+    accounts = payload['prioritized_accounts']
+    scores = [account['priority_score'] for account in accounts]
+    assert len(scores) == 5 and scores == sorted(scores, reverse=True)
+
+    # Cùng top 5 như ưu tiên trên cả tệp trong bộ nhớ
+    expected = main.get_model('collections').prioritize_collections(frame.drop(columns=['customer_id']), top_n=5)
+    np.testing.assert_allclose(scores, expected['priority_score'], rtol=1e-6)
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+from api.batching import MicroBatcher
+
+def echo_scores(records, delay=0.0):
+    time.sleep(delay)
+    return [record['x'] for record in records]
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_lone_request_is_not_delayed():
+    batcher = MicroBatcher('test', echo_scores, max_wait_ms=2000)
+
+    async def main():
+        start = time.perf_counter()
+        result = await batcher.submit([{'x': 1}])
+        return result, time.perf_counter() - start
+
+    result, elapsed = run(main())
+    assert result == [1]
+    assert elapsed < 0.5
+
+def test_requests_queued_while_busy_form_one_batch():
+    batcher = MicroBatcher('test', lambda records: echo_scores(records, 0.1), max_wait_ms=2000)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit([{'x': 0}]))
+        await asyncio.sleep(0.02)
+        rest = [asyncio.ensure_future(batcher.submit([{'x': i}, {'x': -i}])) for i in range(1, 6)]
+        start = time.perf_counter()
+        results = await asyncio.gather(first, *rest)
+        return results, time.perf_counter() - start
+
+    results, elapsed = run(main())
+    assert results == [[0]] + [[i, -i] for i in range(1, 6)]
+    # Lô thứ hai được gửi ngay khi lô đầu xong, không đợi max_wait_ms
+    assert elapsed < 1.0
+    stats = batcher.stats()
+    assert stats['batches'] == 2 and stats['max_batch_size_seen'] == 10
+
+def test_full_batch_is_sent_without_waiting():
+    release = threading.Event()
+    batcher = MicroBatcher('test', lambda records: (release.wait(5), echo_scores(records))[1],
+                           max_batch_size=4, max_wait_ms=5000)
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit([{'x': 0}]))
+        await asyncio.sleep(0.02)
+        full = asyncio.ensure_future(batcher.submit([{'x': i} for i in range(4)]))
+        await asyncio.sleep(0.05)
+        in_flight = batcher.stats()['in_flight_batches']
+        release.set()
+        return in_flight, await first, await full
+
+    in_flight, first, full = run(main())
+    assert in_flight == 2
+    assert first == [0] and full == [0, 1, 2, 3]
+
+def test_errors_propagate_to_every_request():
+    def fail(records):
+        raise RuntimeError('boom')
+
+    batcher = MicroBatcher('test', fail)
+
+    async def main():
+        return await asyncio.gather(batcher.submit([{'x': 1}]), batcher.submit([{'x': 2}]),
+                                    return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in run(main()))
+
+def test_cancelled_request_does_not_break_the_batch():
+    batcher = MicroBatcher('test', lambda records: echo_scores(records, 0.1))
+
+    async def main():
+        first = asyncio.ensure_future(batcher.submit([{'x': 1}]))
+        await asyncio.sleep(0.02)
+        cancelled = asyncio.ensure_future(batcher.submit([{'x': 2}]))
+        kept = asyncio.ensure_future(batcher.submit([{'x': 3}]))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await first, await kept, cancelled.cancelled()
+
+    assert run(main()) == ([1], [3], True)
+
+def test_cancelled_batch_cancels_waiting_requests():
+    batcher = MicroBatcher('test', echo_scores)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        done.cancel()
+        waiting = loop.create_future()
+        batcher._in_flight = 1
+        batcher._dispatch(done, [([{'x': 1}], waiting, 0.0)], loop)
+        return waiting
+
+    waiting = run(main())
+    assert waiting.cancelled()
+    assert batcher.stats()['in_flight_batches'] == 0
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+
+from api import columnar
+
+
+class LoanData(BaseModel):
+    customer_id: str
+    age: int = Field(..., ge=18, le=100)
+    income: float = Field(..., ge=0)
+    debt_to_income: float = Field(..., gt=0, lt=5)
+    homeowner: int = Field(..., ge=0, le=1)
+
+
+FEATURES = ['income', 'age', 'debt_to_income', 'homeowner']
+
+COLUMNS = {
+    'age': [35, 17, '42', 'abc', None, 64.9, 101],
+    'income': [50000, 1.5e5, -1, '60000', 3000, None, 0],
+    'debt_to_income': [0.25, 0, 0.3, 5, 'x', 0.1, 4.99],
+    'homeowner': [1, 0, 2, 1, 0, True, 0]
+}
+
+
+def pydantic_errors(columns):
+    """Lỗi của pydantic khi dựng từng dòng, cùng dạng với lỗi của columnar"""
+    errors = []
+    for row in range(len(columns['age'])):
+        record = {name: values[row] for name, values in columns.items()}
+        try:
+            LoanData(customer_id=f'C{row}', **record)
+        except ValidationError as e:
+            errors += [{'loc': ['body', 'columns', item['loc'][0], row], 'msg': item['msg'], 'type': item['type']}
+                       for item in e.errors()]
+    return sorted(errors, key=lambda item: (item['loc'][3], item['loc'][2]))
+
+
+def test_errors_match_pydantic():
+    matrix, valid, errors, n_errors = columnar.validate_columns(COLUMNS, LoanData, FEATURES)
+    expected = pydantic_errors(COLUMNS)
+    assert errors == expected
+    assert n_errors == len(expected)
+    assert valid.tolist() == [row not in {e['loc'][3] for e in expected} for row in range(len(valid))]
+
+
+def test_matrix_follows_feature_order():
+    columns = {name: values[:1] for name, values in COLUMNS.items()}
+    matrix, valid, errors, _ = columnar.validate_columns(columns, LoanData, FEATURES)
+    assert valid.all() and not errors
+    np.testing.assert_array_equal(matrix, [[50000, 35, 0.25, 1]])
+
+
+def test_integer_values_are_truncated_like_pydantic():
+    columns = {name: values[5:6] for name, values in COLUMNS.items()}
+    columns['income'] = [1000]
+    matrix, valid, _, _ = columnar.validate_columns(columns, LoanData, FEATURES)
+    assert valid.all()
+    assert matrix[0, FEATURES.index('age')] == LoanData(customer_id='C', income=1000, age=64.9,
+                                                        debt_to_income=0.1, homeowner=True).age
+
+
+def test_max_errors_keeps_the_total_count():
+    columns = {name: values * 50 for name, values in COLUMNS.items()}
+    _, _, errors, n_errors = columnar.validate_columns(columns, LoanData, FEATURES, max_errors=10)
+    assert len(errors) == 10
+    assert n_errors == len(pydantic_errors(columns))
+
+
+@pytest.mark.parametrize('columns', [
+    {name: values for name, values in COLUMNS.items() if name != 'income'},
+    {**COLUMNS, 'age': COLUMNS['age'][:3]}
+])
+def test_structural_errors_reject_the_request(columns):
+    with pytest.raises(columnar.ColumnarValidationError) as info:
+        columnar.validate_columns(columns, LoanData, FEATURES)
+    assert info.value.errors
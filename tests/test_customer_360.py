@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from conftest import fit_model
+from api import customer_360
+from src.data.sample_generator import generate_behavior_data, generate_collections_data
+from src.models.behavior_scorecard import BehaviorScorecard
+from src.models.collections_scoring import CollectionsScoring
+
+@pytest.fixture(scope='module')
+def executor():
+    with ThreadPoolExecutor(2) as executor:
+        yield executor
+
+@pytest.fixture
+def models_without_business_columns(config_path):
+    """
+    Mô hình behavior/collections có booster không dùng current_limit/outstanding_amount
+    """
+    behavior = generate_behavior_data(3000).drop(columns=['customer_id', 'current_limit'])
+    collections = generate_collections_data(3000).drop(columns=['customer_id', 'outstanding_amount'])
+    return {
+        'behavior': fit_model(BehaviorScorecard(config_path), behavior)[0],
+        'collections': fit_model(CollectionsScoring(config_path), collections)[0],
+    }
+
+def test_route_features_keeps_business_columns(models_without_business_columns):
+    model = models_without_business_columns['behavior']
+    frame = generate_behavior_data(20).drop(columns=['customer_id', 'default_flag'])
+    frame.loc[3, 'current_limit'] = np.nan
+
+    eligible, features = customer_360.route_features(frame, model, ('current_limit',))
+
+    assert 'current_limit' not in model.model.feature_names
+    assert list(features.columns) == list(model.model.feature_names) + ['current_limit']
+    assert 3 not in eligible and len(eligible) == 19
+
+def test_profiles_use_business_columns(models_without_business_columns, executor):
+    behavior = generate_behavior_data(50).drop(columns=['default_flag'])
+    collections = generate_collections_data(50).drop(columns=['customer_id', 'further_delinquency'])
+    frame = behavior.join(collections)
+    customer_ids = frame.pop('customer_id').tolist()
+    models = models_without_business_columns
+
+    profiles, versions = customer_360.build_profiles(customer_ids, frame, models, executor)
+
+    limits = models['behavior'].recommend_credit_limits(frame, frame['current_limit'].to_numpy())
+    prioritized = models['collections'].prioritize_collections(frame, top_n=len(frame)).sort_index()
+    assert [p['behavior']['recommended_limit'] for p in profiles] == pytest.approx(limits['recommended_limit'].tolist())
+    assert [p['collections']['priority_score'] for p in profiles] == pytest.approx(prioritized['priority_score'].tolist())
+    assert all(p['skipped_models'] == [] for p in profiles)
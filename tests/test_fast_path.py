@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from conftest import train_model, write_small_config
+
+
+@pytest.fixture(scope='module')
+def fitted(tmp_path_factory):
+    model, X_test, _ = train_model(write_small_config(tmp_path_factory.mktemp('config')))
+    return model, X_test
+
+
+def test_predict_one_matches_frame_path(fitted):
+    model, X_test = fitted
+    rows = X_test.head(20)
+    expected = model.predict(rows, use_cache=False)
+    actual = [model.predict_one(record) for record in rows.to_dict('records')]
+    np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+
+def test_predict_one_coerces_numeric_strings(fitted):
+    model, X_test = fitted
+    record = X_test.iloc[0].to_dict()
+    as_strings = {**record, 'income': str(record['income']), 'utilization': str(record['utilization'])}
+    assert model.predict_one(as_strings) == pytest.approx(model.predict_one(record))
+
+    # Đặc trưng không có bảng tra WOE cũng được chuyển sang số
+    feature_names, lookups = model._fast_path
+    index = feature_names.index('utilization')
+    model._fast_path = (feature_names, lookups[:index] + [None] + lookups[index + 1:])
+    try:
+        assert model.predict_one(as_strings) == pytest.approx(model.predict_one(record))
+    finally:
+        model._fast_path = (feature_names, lookups)
+
+
+def test_predict_one_rejects_non_numeric_value(fitted):
+    model, X_test = fitted
+    record = {**X_test.iloc[0].to_dict(), 'income': 'n/a'}
+    with pytest.raises(ValueError, match='income'):
+        model.predict_one(record)
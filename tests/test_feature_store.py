@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data.feature_store import FeatureStore
+from src.data.preprocessor import DataPreprocessor
+
+@pytest.fixture
+def data_config(tmp_path, config_path):
+    """
+    config.yaml trỏ data/raw, data/processed và feature store vào thư mục tạm
+    """
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+    for key in ('raw_data_path', 'processed_data_path', 'feature_store_path'):
+        config['data'][key] = str(tmp_path / key)
+        (tmp_path / key).mkdir()
+    config['feature_engineering'].pop('max_features', None)
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return config_path, config
+
+def write_raw(config, n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    raw = pd.DataFrame({
+        'customer_id': [f'CUS{i:06d}' for i in range(n)],
+        'current_balance': rng.normal(5000, 2000, n),
+        'payment_ratio': rng.uniform(0, 1, n),
+        'default_flag': rng.integers(0, 2, n),
+    })
+    raw.to_csv(f"{config['data']['raw_data_path']}/behavior_data.csv", index=False)
+    return raw
+
+def test_preprocessing_keeps_customer_id_aligned(data_config):
+    config_path, config = data_config
+    config['data']['max_samples'] = 200
+    with open(config_path, 'w') as f:
+        yaml.safe_dump(config, f)
+    raw = write_raw(config)
+
+    processed = DataPreprocessor(config_path).prepare_data_generic('behavior_data.csv', 'default_flag')
+
+    # Dữ liệu bị lấy mẫu (xáo trộn) nhưng mỗi dòng vẫn đi kèm đúng customer_id
+    assert len(processed) == 200
+    expected = raw.set_index('customer_id').loc[processed['customer_id'], 'default_flag'].to_numpy()
+    np.testing.assert_array_equal(processed['default_flag'].to_numpy(), expected)
+
+    frame, _ = FeatureStore('behavior', config_path=config_path).read_processed()
+    assert list(frame['customer_id']) == list(processed['customer_id'])
+
+def test_positional_ids_require_same_row_order(data_config):
+    config_path, config = data_config
+    raw = write_raw(config)
+    processed_path = f"{config['data']['processed_data_path']}/processed_behavior_data.csv"
+    raw.drop(columns=['customer_id']).to_csv(processed_path, index=False)
+    store = FeatureStore('behavior', config_path=config_path)
+
+    # Tệp cũ không có customer_id, cùng số dòng và không lấy mẫu: ghép theo vị trí
+    frame, _ = store.read_processed()
+    assert list(frame['customer_id']) == list(raw['customer_id'])
+
+    # Tiền xử lý có lấy mẫu: không chắc cùng thứ tự dòng
+    store.config['data']['max_samples'] = 100
+    with pytest.raises(ValueError):
+        store.read_processed()
+
+    # Số dòng khác tệp thô
+    store.config['data']['max_samples'] = None
+    raw.drop(columns=['customer_id']).head(400).to_csv(processed_path, index=False)
+    with pytest.raises(ValueError):
+        store.read_processed()
+
+def test_lookup_after_build(data_config):
+    config_path, config = data_config
+    write_raw(config)
+    DataPreprocessor(config_path).prepare_data_generic('behavior_data.csv', 'default_flag')
+    store = FeatureStore('behavior', config_path=config_path)
+    frame, source = store.read_processed()
+    store.append_snapshot(frame, source=source)
+
+    found, missing = store.load().lookup(['CUS000007', 'nope', 'CUS000003'], ['payment_ratio'])
+
+    assert list(found['customer_id']) == ['CUS000007', 'CUS000003']
+    assert missing == ['nope']
+    expected = frame.set_index('customer_id').loc[['CUS000007', 'CUS000003'], 'payment_ratio'].to_numpy()
+    np.testing.assert_allclose(found['payment_ratio'], expected)
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from scipy.optimize import linprog
+
+from src.models.limit_optimizer import account_economics, allocate_limits
+
+def make_portfolio(n, seed, exposure_factor, loss_factor):
+    """
+    Danh mục ngẫu nhiên: biên/tổn thất trên mỗi đơn vị hạn mức, khoảng hạn mức và ngân sách
+    theo hệ số của tổng hạn mức và tổng tổn thất kỳ vọng hiện tại
+    """
+    rng = np.random.default_rng(seed)
+    margin, loss = account_economics(rng.beta(1, 12, n), rng.uniform(0.05, 0.95, n), 0.18, 0.85, 0.5)
+    current = rng.uniform(1000, 20000, n)
+    lower = current * rng.uniform(0.5, 1.0, n)
+    upper = current * rng.uniform(1.0, 1.5, n)
+    return margin, loss, lower, upper, exposure_factor * current.sum(), loss_factor * (loss * current).sum()
+
+def linprog_optimum(margin, loss, lower, upper, exposure_budget, loss_budget):
+    result = linprog(-margin, A_ub=np.vstack([np.ones(len(margin)), loss]), b_ub=[exposure_budget, loss_budget],
+                     bounds=np.column_stack([lower, upper]), method='highs')
+    assert result.status == 0
+    return -result.fun
+
+@pytest.mark.parametrize('n', [50, 300, 3000])
+@pytest.mark.parametrize('exposure_factor, loss_factor', [
+    (1.05, 1.2),   # chỉ ngân sách hạn mức chặt
+    (1.05, 0.85),  # ngân sách tổn thất chặt
+    (0.95, 0.85),  # cả hai đều chặt
+    (1.3, 0.95),
+])
+def test_matches_linprog(n, exposure_factor, loss_factor):
+    margin, loss, lower, upper, exposure_budget, loss_budget = make_portfolio(n, n, exposure_factor, loss_factor)
+
+    limits, solution = allocate_limits(margin, loss, lower, upper, exposure_budget, loss_budget)
+
+    optimum = linprog_optimum(margin, loss, lower, upper, exposure_budget, loss_budget)
+    assert solution['status'] == 'optimal'
+    assert margin @ limits == pytest.approx(optimum, rel=1e-9)
+    assert limits.sum() <= exposure_budget * (1 + 1e-12)
+    assert loss @ limits <= loss_budget * (1 + 1e-12)
+    assert np.all(limits >= lower) and np.all(limits <= upper * (1 + 1e-12))
+
+def test_binding_loss_budget_is_used_exactly():
+    margin, loss, lower, upper, exposure_budget, loss_budget = make_portfolio(300, 1, 1.05, 0.85)
+
+    limits, solution = allocate_limits(margin, loss, lower, upper, exposure_budget, loss_budget)
+
+    assert solution['loss_multiplier'] > 0
+    assert loss @ limits == pytest.approx(loss_budget, rel=1e-12)
+
+def test_limit_step_rounds_down_within_budgets():
+    margin, loss, lower, upper, exposure_budget, loss_budget = make_portfolio(300, 2, 1.05, 0.85)
+
+    limits, _ = allocate_limits(margin, loss, lower, upper, exposure_budget, loss_budget, limit_step=100)
+
+    increase = limits - lower
+    rounded = np.isclose(increase % 100, 0) | np.isclose(limits, upper)
+    assert rounded.all()
+    assert limits.sum() <= exposure_budget and loss @ limits <= loss_budget
+
+def test_infeasible_when_lower_bounds_exceed_budget():
+    margin, loss, lower, upper, _, loss_budget = make_portfolio(50, 3, 1.0, 1.0)
+
+    limits, solution = allocate_limits(margin, loss, lower, upper, 0.5 * lower.sum(), loss_budget)
+
+    assert solution['status'] == 'infeasible'
+    np.testing.assert_array_equal(limits, lower)
@@ -0,0 +1,52 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from src.models import parallel_scoring
+
+
+class FakeExecutor:
+    """Executor chạy ngay trong tiến trình, ghi lại số worker được yêu cầu"""
+    created = []
+
+    def __init__(self, max_workers, initializer, initargs):
+        FakeExecutor.created.append(max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+def tag_chunk(model, chunk_id, chunk):
+    return chunk_id, chunk
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(parallel_scoring.os, 'cpu_count', lambda: 4)
+    monkeypatch.setattr(parallel_scoring, 'ProcessPoolExecutor', FakeExecutor)
+    monkeypatch.setattr(parallel_scoring, '_worker_model', object())
+    FakeExecutor.created.clear()
+    return SimpleNamespace(model_type='behavior', version='v1')
+
+
+@pytest.mark.parametrize('workers', [0, None])
+def test_zero_workers_means_all_cores(model, workers):
+    # Cùng nghĩa với --workers 0 của API: dùng tất cả các lõi CPU
+    results = list(parallel_scoring.map_chunks(tag_chunk, model, ['a', 'b', 'c'], workers))
+    assert results == [(0, 'a'), (1, 'b'), (2, 'c')]
+    assert FakeExecutor.created == [4]
+
+
+def test_one_worker_runs_in_process(model):
+    results = list(parallel_scoring.map_chunks(tag_chunk, model, ['a', 'b'], 1))
+    assert results == [(0, 'a'), (1, 'b')]
+    assert FakeExecutor.created == []
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from src.features.prebinning import CategoricalHistogram, ordered_fractions
+from src.features.woe_iv import WoeIvTransformer
+
+
+def categorical_frame(n_categories, n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    categories = np.array([f"c{i}" for i in range(n_categories)], dtype=object)
+    x = rng.choice(categories, n, p=rng.dirichlet(np.ones(n_categories)))
+    rates = dict(zip(categories, rng.uniform(0.02, 0.4, n_categories)))
+    y = (rng.random(n) < np.vectorize(rates.get)(x)).astype(int)
+    x = x.astype(object)
+    x[rng.random(n) < 0.03] = None
+    return pd.DataFrame({'region': x, 'target': y})
+
+
+def test_ordered_fractions_are_distinct_and_increasing():
+    numerators, denominators = ordered_fractions(500)
+    values = numerators / denominators
+    assert np.all(np.diff(values) > 0)
+    assert np.all((numerators > 0) & (numerators < denominators))
+    # Mẫu số lớn nhất cỡ căn bậc hai của số phân số
+    assert denominators.max() <= 50
+
+
+def test_categorical_sample_grows_subquadratically():
+    data = categorical_frame(200, n=50000)
+    histogram = CategoricalHistogram().update(data['region'].to_numpy(), data['target'].to_numpy().astype(float))
+    x, y, weight = histogram.weighted_sample()
+    assert len(x) < 200 * 30
+    assert weight.sum() == len(data)
+    assert weight[y == 1].sum() == data['target'].sum()
+
+
+def test_streaming_categorical_matches_in_memory():
+    data = categorical_frame(40)
+    in_memory = WoeIvTransformer().fit(data[['region']], data['target'], prescreen=False)
+    streaming = WoeIvTransformer().fit_streaming(
+        lambda: (data.iloc[start:start + 3000] for start in range(0, len(data), 3000)),
+        'target', n_jobs=1, prescreen=False)
+
+    assert ([sorted(group) for group in streaming.binnings['region'].splits]
+            == [sorted(group) for group in in_memory.binnings['region'].splits])
+    assert np.isclose(streaming.iv_values['region'], in_memory.iv_values['region'])
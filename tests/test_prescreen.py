@@ -0,0 +1,42 @@
+import types
+
+import matplotlib
+import numpy as np
+import xgboost as xgb
+
+from conftest import train_model
+from src.models import base_model
+
+matplotlib.use('Agg')
+
+class ContributionExplainer:
+    """
+    Thay shap.TreeExplainer: tính đóng góp SHAP bằng chính booster (pred_contribs),
+    cùng kiểm tra số cột như shap
+    """
+    def __init__(self, booster):
+        self.booster = booster
+
+    def shap_values(self, X):
+        return self.booster.predict(xgb.DMatrix(X), pred_contribs=True)[:, :-1]
+
+def fake_shap():
+    return types.SimpleNamespace(TreeExplainer=ContributionExplainer,
+                                 summary_plot=lambda *args, **kwargs: None)
+
+def test_screened_columns_are_not_model_features(config_path):
+    model, _, _ = train_model(config_path, n=10000, n_noise=3)
+
+    assert model.woe_transformer.screened_out
+    assert not set(model.woe_transformer.screened_out) & set(model.model.feature_names)
+    assert 'utilization' in model.model.feature_names
+
+def test_evaluate_shap_with_screened_out_columns(config_path, monkeypatch):
+    model, X_test, y_test = train_model(config_path, n=10000, n_noise=3)
+    assert model.woe_transformer.screened_out
+    monkeypatch.setattr(base_model, 'load_shap', fake_shap)
+    monkeypatch.setattr('matplotlib.pyplot.savefig', lambda *args, **kwargs: None)
+
+    metrics = model.evaluate(X_test, y_test)
+
+    assert np.isfinite(metrics['AUC'])
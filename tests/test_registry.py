@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+
+import pytest
+
+from conftest import train_model
+from src.models.registry import ModelRegistry
+
+MODEL_TYPE = 'application_scorecard'
+
+@pytest.fixture
+def registry(tmp_path, config_path):
+    """
+    Registry trong thư mục tạm với hai phiên bản v1, v2 (v2 đang hoạt động)
+    """
+    registry = ModelRegistry(tmp_path / 'models', config_path, model_types=[MODEL_TYPE])
+    for seed, version in enumerate(['v1', 'v2']):
+        model, _, _ = train_model(config_path, n=2000, seed=seed)
+        registry.publish(model, version)
+    return registry.load_active()
+
+def active_in_manifest(registry):
+    return registry.read_manifest(MODEL_TYPE)['active_version']
+
+def wait_loaded(registry, timeout=30):
+    deadline = time.time() + timeout
+    while registry.status()[MODEL_TYPE]['loading_version'] is not None:
+        assert time.time() < deadline
+        time.sleep(0.05)
+
+def test_activate_and_rollback(registry):
+    assert registry.get(MODEL_TYPE).version == 'v2'
+
+    assert registry.activate(MODEL_TYPE, 'v1', background=False) == 'swapped'
+    assert registry.get(MODEL_TYPE).version == 'v1'
+    assert active_in_manifest(registry) == 'v1'
+
+    assert registry.rollback(MODEL_TYPE) == 'v2'
+    assert registry.get(MODEL_TYPE).version == 'v2'
+    assert registry.status()[MODEL_TYPE]['previous_version'] == 'v1'
+    assert active_in_manifest(registry) == 'v2'
+
+    assert registry.activate(MODEL_TYPE, 'v2') == 'active'
+
+def test_background_activate_persists_after_swap(registry):
+    assert registry.activate(MODEL_TYPE, 'v1') == 'loading'
+    wait_loaded(registry)
+
+    assert registry.get(MODEL_TYPE).version == 'v1'
+    assert active_in_manifest(registry) == 'v1'
+
+def test_unknown_version_raises(registry):
+    with pytest.raises(ValueError):
+        registry.activate(MODEL_TYPE, 'missing')
+
+@pytest.mark.parametrize('background', [True, False])
+def test_failed_load_keeps_manifest(registry, background):
+    # Artifact của v1 bị hỏng: tải thất bại, v2 vẫn phục vụ và vẫn là active_version
+    model_path = registry.root_dir / MODEL_TYPE / 'v1' / f'{MODEL_TYPE}_xgb_model.json'
+    model_path.write_text('{}')
+
+    if background:
+        registry.activate(MODEL_TYPE, 'v1')
+        wait_loaded(registry)
+    else:
+        with pytest.raises(RuntimeError):
+            registry.activate(MODEL_TYPE, 'v1', background=False)
+
+    assert registry.get(MODEL_TYPE).version == 'v2'
+    assert active_in_manifest(registry) == 'v2'
+    assert registry.status()[MODEL_TYPE]['last_error'].startswith('v1')
+    with open(registry.root_dir / MODEL_TYPE / 'manifest.json') as f:
+        assert json.load(f)['active_version'] == 'v2'
+
+def test_concurrent_activate_loads_once(registry, monkeypatch):
+    loads = []
+    load_version = registry.load_version
+    list_versions = registry.list_versions
+
+    def slow_list(model_type):
+        time.sleep(0.01)
+        return list_versions(model_type)
+
+    def slow_load(model_type, version):
+        loads.append(version)
+        time.sleep(0.2)
+        return load_version(model_type, version)
+
+    monkeypatch.setattr(registry, 'load_version', slow_load)
+    monkeypatch.setattr(registry, 'list_versions', slow_list)
+    statuses = []
+    threads = [threading.Thread(target=lambda: statuses.append(registry.activate(MODEL_TYPE, 'v1')))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wait_loaded(registry)
+
+    assert loads == ['v1']
+    assert statuses == ['loading'] * 8
+    assert registry.get(MODEL_TYPE).version == 'v1'
+
+def test_nthread_applies_to_hot_swapped_versions(registry):
+    def nthread(model):
+        return json.loads(model.model.save_config())['learner']['generic_param']['nthread']
+
+    registry.set_nthread(1)
+    assert nthread(registry.get(MODEL_TYPE)) == '1'
+
+    registry.activate(MODEL_TYPE, 'v1', background=False)
+
+    assert nthread(registry.get(MODEL_TYPE)) == '1'
@@ -0,0 +1,42 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from api.serialization import dumps, frame_to_records
+
+
+def legacy_records(df):
+    """Cách chuyển đổi cũ của api/main.py (iterrows, numpy int/float thành float)"""
+    result = []
+    for _, row in df.iterrows():
+        result.append({col: float(val) if isinstance(val, (np.floating, np.integer)) else val
+                       for col, val in row.items()})
+    return result
+
+
+def prioritized_frame():
+    return pd.DataFrame({
+        'days_past_due': np.array([107, 45], dtype=np.int64),
+        'outstanding_amount': [8031.5, 2500.0],
+        'probability_further_delinquency': np.array([0.73, 0.21], dtype=np.float32),
+        'suggested_action': ['Immediate Contact', 'Reminder'],
+        'customer_id': ['CUS000003', 'CUS000004']
+    })
+
+
+def test_records_match_legacy_json():
+    df = prioritized_frame()
+    assert dumps(frame_to_records(df)) == dumps(legacy_records(df))
+
+
+def test_integer_columns_stay_json_integers():
+    df = prioritized_frame().assign(segment=pd.Categorical(['high', 'low']),
+                                    rank=pd.array([1, None], dtype='Int64'))
+    df.loc[1, 'outstanding_amount'] = np.nan
+    records = json.loads(dumps(frame_to_records(df)))
+
+    assert records[0]['days_past_due'] == 107 and isinstance(records[0]['days_past_due'], int)
+    assert isinstance(records[0]['outstanding_amount'], float)
+    assert records[1]['outstanding_amount'] is None and records[1]['rank'] is None
+    assert records[0]['segment'] == 'high'
@@ -0,0 +1,79 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from conftest import ROOT
+from web.app import InProcessBackend, app as web_app
+
+release = threading.Event()
+
+api = FastAPI()
+
+@api.get('/stream')
+def stream():
+    def chunks():
+        yield b'first,'
+        release.wait(10)
+        yield b'second'
+    return StreamingResponse(chunks(), media_type='text/plain', headers={'X-Model-Version': 'v1'})
+
+@api.post('/echo')
+async def echo(request: Request):
+    return {'params': dict(request.query_params), 'body': (await request.body()).decode()}
+
+@api.get('/slow')
+def slow():
+    time.sleep(2)
+    return {}
+
+@pytest.fixture
+def backend():
+    backend = InProcessBackend((1, 1), app=api)
+    with web_app.test_request_context():
+        yield backend
+    backend.close()
+
+def test_forwards_body_params_and_headers(backend):
+    response = backend.forward('POST', 'echo', [('limit', '5')], b'{"a": 1}', {'Content-Type': 'application/json'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'params': {'limit': '5'}, 'body': '{"a": 1}'}
+
+def test_streams_before_the_app_finishes(backend):
+    release.clear()
+    response = backend.forward('GET', 'stream', [], None, {})
+    body = iter(response.response)
+
+    # Đoạn đầu tới tay Flask khi ứng dụng còn đang chờ, không đợi toàn bộ response
+    assert next(body) == b'first,'
+    release.set()
+    assert b''.join(body) == b'second'
+    assert response.headers['X-Model-Version'] == 'v1'
+    response.close()
+
+def test_timeout_maps_to_504(backend):
+    response, status = backend.forward('GET', 'slow', [], None, {})
+
+    assert status == 504
+
+def test_interpreter_exits_after_in_process_requests():
+    script = (
+        "from fastapi import FastAPI, Request\n"
+        "from web.app import InProcessBackend, app as web_app\n"
+        "api = FastAPI()\n"
+        "@api.post('/echo')\n"
+        "async def echo(request: Request):\n"
+        "    return {'body': (await request.body()).decode()}\n"
+        "backend = InProcessBackend((1, 5), app=api)\n"
+        "with web_app.test_request_context():\n"
+        "    print(backend.forward('POST', 'echo', [], b'x', {}).get_json()['body'])\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().endswith('x')
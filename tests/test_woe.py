@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_credit_frame
+from src.features.woe_iv import WoeIvTransformer
+
+
+def perturb(X, seed=1):
+    """Thêm giá trị thiếu, giá trị ngoài khoảng khi fit và category chưa gặp"""
+    rng = np.random.default_rng(seed)
+    X = X.copy()
+    rows = rng.choice(len(X), size=len(X) // 20, replace=False)
+    for column in X.columns:
+        if pd.api.types.is_numeric_dtype(X[column]):
+            values = X[column].to_numpy(dtype=np.float64).copy()
+            values[rows[::3]] = np.nan
+            values[rows[1::3]] = values.max() * 10
+            values[rows[2::3]] = values.min() - 10
+        else:
+            values = X[column].to_numpy(dtype=object).copy()
+            values[rows[::2]] = None
+            values[rows[1::2]] = 'UNSEEN'
+        X[column] = values
+    return X
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_credit_frame(n=6000, seed=3)
+    X.loc[X.sample(frac=0.03, random_state=0).index, 'income'] = np.nan
+    return X, y
+
+
+@pytest.fixture(scope='module')
+def transformer(data):
+    X, y = data
+    return WoeIvTransformer().fit(X, y, prescreen=False)
+
+
+def test_compiled_tables_match_optbinning(data, transformer):
+    X_test = perturb(data[0])
+    for column, binning in transformer.binnings.items():
+        values = X_test[column].to_numpy()
+        expected = binning.transform(values, metric='woe')
+        table = transformer.lookup_tables[column]
+        np.testing.assert_allclose(table.lookup_array(values), expected, rtol=0, atol=1e-12)
+        # Đường một giá trị (predict_one) dùng cùng bảng tra
+        np.testing.assert_allclose([table.lookup(value) for value in values[:300]], expected[:300], atol=1e-12)
+
+
+def test_matrix_matches_dataframe_transform(data, transformer):
+    X_test = perturb(data[0])
+    columns = list(X_test.columns)
+    matrix = transformer.transform_matrix(X_test, columns)
+    assert matrix.dtype == np.float32
+    np.testing.assert_array_equal(matrix, transformer.transform(X_test)[columns].to_numpy(dtype=np.float32))
+
+
+def test_artifact_round_trip(data, transformer, tmp_path):
+    X_test = perturb(data[0])
+    columns = list(X_test.columns)
+    matrix = transformer.transform_matrix(X_test, columns)
+    transformer.save_artifact(tmp_path / 'woe.json')
+    for mmap in (False, True):
+        loaded = WoeIvTransformer.load_artifact(tmp_path / 'woe.json', mmap=mmap)
+        np.testing.assert_array_equal(loaded.transform_matrix(X_test, columns), matrix)
+        pd.testing.assert_frame_equal(loaded.get_iv_table(), transformer.get_iv_table())
+
+
+def test_streaming_fit_matches_in_memory(data, transformer, tmp_path):
+    X, y = data
+    path = tmp_path / 'train.csv'
+    X.assign(default_flag=y).to_csv(path, index=False)
+    streaming = WoeIvTransformer().fit_streaming(path, 'default_flag', chunk_size=1000, n_jobs=1, prescreen=False)
+
+    assert set(streaming.binnings) == set(transformer.binnings)
+    for column, iv in transformer.iv_values.items():
+        assert streaming.iv_values[column] == pytest.approx(iv, rel=0.05, abs=0.005)
+        values = X[column].to_numpy()
+        difference = np.abs(streaming.lookup_tables[column].lookup_array(values)
+                            - transformer.lookup_tables[column].lookup_array(values))
+        # Điểm chia của biến số chỉ chính xác tới độ mịn của bin (n_prebins)
+        assert difference.mean() < 0.06
+    # Biến phân loại: cùng nhóm category như fit trong bộ nhớ
+    assert ([sorted(group) for group in streaming.binnings['region'].splits]
+            == [sorted(group) for group in transformer.binnings['region'].splits])
+
+
+def test_bin_codes_decode_to_matrix(data, transformer):
+    X_test = perturb(data[0])
+    columns = list(X_test.columns)
+    codes = transformer.transform_codes(X_test, columns)
+    np.testing.assert_array_equal(codes.to_woe(), transformer.transform_matrix(X_test, columns))
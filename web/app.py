@@ -1,15 +1,201 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request, stream_with_context
 import requests
+from requests.adapters import HTTPAdapter
+import atexit
 import json
 import os
+import sys
 from pathlib import Path
+from urllib.parse import urlencode
+
+import yaml
 
 app = Flask(__name__, 
             static_folder='static',
             template_folder='templates')
 
-# API endpoint base URL - update this based on your FastAPI service
-API_BASE_URL = "http://localhost:8000"
+def load_web_config():
+    """Read the `web` section of config.yaml"""
+    with open(Path(__file__).parents[1] / 'config.yaml', 'r') as file:
+        return (yaml.safe_load(file) or {}).get('web', {}) or {}
+
+web_config = load_web_config()
+proxy_config = web_config.get('proxy', {}) or {}
+
+# API endpoint base URL - set web.api_base_url in config.yaml or the API_BASE_URL env var
+API_BASE_URL = os.environ.get('API_BASE_URL', web_config.get('api_base_url', "http://localhost:8000")).rstrip('/')
+
+# 'http': forward to the FastAPI service over a pooled connection
+# 'inprocess': run the scoring app inside this process (no extra HTTP hop)
+PROXY_MODE = os.environ.get('WEB_PROXY_MODE', proxy_config.get('mode', 'http'))
+PROXY_TIMEOUT = (proxy_config.get('connect_timeout_s', 3.05), proxy_config.get('read_timeout_s', 60))
+STREAM_CHUNK_SIZE = proxy_config.get('stream_chunk_size', 64 * 1024)
+
+# Hop-by-hop headers are not forwarded in either direction
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailers', 'transfer-encoding', 'upgrade', 'host'
+}
+
+class HTTPBackend:
+    """Forward requests to the FastAPI service over a persistent connection pool"""
+
+    def __init__(self, base_url, timeout, pool_size=32):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def forward(self, method, endpoint, params, body, headers):
+        try:
+            upstream = self.session.request(method, f"{self.base_url}/{endpoint}", params=params,
+                                            data=body, headers=headers, timeout=self.timeout,
+                                            stream=True)
+        except requests.Timeout:
+            return jsonify({"detail": "API backend timed out"}), 504
+        except requests.ConnectionError:
+            return jsonify({"detail": "API backend is unavailable"}), 502
+
+        # Stream the raw (still encoded) bytes through without parsing the JSON
+        response = Response(
+            stream_with_context(upstream.raw.stream(STREAM_CHUNK_SIZE, decode_content=False)),
+            status=upstream.status_code,
+            headers=response_headers(upstream.headers)
+        )
+        response.call_on_close(upstream.close)
+        return response
+
+class InProcessBackend:
+    """Call the FastAPI scoring app directly inside the Flask process
+
+    Requests are run as ASGI calls on a single shared event-loop thread (no HTTP
+    hop). Response body messages are handed to the Flask thread through a bounded
+    queue as the app sends them, so large responses stream instead of being
+    buffered in memory.
+    """
+
+    def __init__(self, timeout, app=None, buffer_size=16):
+        import anyio.from_thread
+
+        if app is None:
+            sys.path.append(str(Path(__file__).parents[1]))
+            from api.main import app
+
+        self.app = app
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+        # One event loop thread shared by every Flask request thread
+        self._portal_context = anyio.from_thread.start_blocking_portal()
+        self.portal = self._portal_context.__enter__()
+        # Run the API startup hooks (e.g. the model registry watcher)
+        self.portal.call(app.router.startup)
+        # Stop the event loop thread at exit, otherwise the interpreter waits for it forever
+        atexit.register(self.close)
+
+    def close(self):
+        """Run the API shutdown hooks and stop the event loop thread"""
+        if self.portal is None:
+            return
+        portal, self.portal = self.portal, None
+        try:
+            portal.call(self.app.router.shutdown)
+        finally:
+            self._portal_context.__exit__(None, None, None)
+
+    async def _run_app(self, scope, body, send_stream):
+        import anyio
+
+        received = False
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+            # The request is cancelled when the Flask side closes the response
+            await anyio.sleep_forever()
+
+        async with send_stream:
+            await self.app(scope, receive, send_stream.send)
+
+    async def _receive(self, receive_stream):
+        import anyio
+
+        with anyio.fail_after(self.timeout[1]):
+            return await receive_stream.receive()
+
+    def _finish(self, task, receive_stream):
+        if self.portal is None:
+            return
+        if not task.done():
+            task.cancel()
+        self.portal.call(receive_stream.close)
+
+    def forward(self, method, endpoint, params, body, headers):
+        import anyio
+
+        body = body or b''
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method,
+            'scheme': 'http',
+            'path': f"/{endpoint}",
+            'raw_path': f"/{endpoint}".encode(),
+            'root_path': '',
+            'query_string': urlencode(params).encode('latin-1'),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers.items()] + [(b'content-length', str(len(body)).encode())],
+            'client': ('127.0.0.1', 0),
+            'server': ('api', 80),
+        }
+        send_stream, receive_stream = anyio.create_memory_object_stream(self.buffer_size)
+        task = self.portal.start_task_soon(self._run_app, scope, body, send_stream)
+
+        try:
+            start = self.portal.call(self._receive, receive_stream)
+        except TimeoutError:
+            self._finish(task, receive_stream)
+            return jsonify({"detail": "API backend timed out"}), 504
+        except anyio.EndOfStream:
+            self._finish(task, receive_stream)
+            return jsonify({"detail": "API backend failed"}), 502
+
+        def stream_body():
+            try:
+                while True:
+                    message = self.portal.call(self._receive, receive_stream)
+                    if message['type'] != 'http.response.body':
+                        continue
+                    if message.get('body'):
+                        yield message['body']
+                    if not message.get('more_body', False):
+                        break
+            except (TimeoutError, anyio.EndOfStream):
+                # The app stopped mid-response; the client sees a truncated body
+                pass
+            finally:
+                self._finish(task, receive_stream)
+
+        headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in start.get('headers', [])]
+        response = Response(stream_body(), status=start['status'], headers=response_headers(headers))
+        response.call_on_close(lambda: self._finish(task, receive_stream))
+        return response
+
+def response_headers(headers):
+    """Drop hop-by-hop headers (a mapping or a list of (name, value) pairs)"""
+    items = headers.items() if hasattr(headers, 'items') else headers
+    return [(name, value) for name, value in items if name.lower() not in HOP_BY_HOP_HEADERS]
+
+def create_backend():
+    if PROXY_MODE == 'inprocess':
+        return InProcessBackend(PROXY_TIMEOUT)
+    return HTTPBackend(API_BASE_URL, PROXY_TIMEOUT, proxy_config.get('pool_size', 32))
+
+backend = create_backend()
 
 @app.route('/')
 def home():
@@ -42,16 +228,13 @@ def batch():
 @app.route('/api/proxy/<path:endpoint>', methods=['GET', 'POST'])
 def proxy_api(endpoint):
     """Proxy requests to the FastAPI backend"""
-    url = f"{API_BASE_URL}/{endpoint}"
-    
-    # Forward the request to the API
-    if request.method == 'GET':
-        response = requests.get(url, params=request.args)
-    else:  # POST
-        response = requests.post(url, json=request.json)
+    # Forward the request body and query string unchanged
+    headers = {'Content-Type': request.content_type} if request.content_type else {}
+    params = list(request.args.items(multi=True))
+    body = request.get_data() if request.method == 'POST' else None
     
     # Return the API response
-    return jsonify(response.json()), response.status_code
+    return backend.forward(request.method, endpoint, params, body, headers)
 
 if __name__ == '__main__':
     # Create directories if they don't exist
@@ -60,4 +243,5 @@ if __name__ == '__main__':
     os.makedirs(Path(__file__).parent / 'static' / 'js', exist_ok=True)
     os.makedirs(Path(__file__).parent / 'static' / 'img', exist_ok=True)
     
-    app.run(debug=True, port=5000)
+    # The reloader would load the scoring models twice in in-process mode
+    app.run(debug=True, port=web_config.get('port', 5000), use_reloader=PROXY_MODE != 'inprocess')